@@ -0,0 +1,141 @@
+"""Micro-benchmark of the per-case overhead on the execution hot path.
+
+Reports, per case:
+- retained bytes of a prepared work item (case spec + messages),
+- time and allocated bytes of building a run entry,
+- end-to-end executor time against an instant fake client.
+
+Run with: uv run python dev/bench/case_overhead.py
+"""
+
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from rich.console import Console
+
+from tls.models.benchmark import EvaluationBlock
+from tls.models.report import RunEntry
+from tls.protocols.llm import Completion, Message
+from tls.services.executor import CaseResult, Executor
+from tls.services.scheduler import WorkItem
+
+CASES = 20_000
+
+
+class InstantClient:
+    """Client answering immediately."""
+
+    async def chat(self, model: str, messages: list[Message]) -> str:
+        return "ok"
+
+    async def complete(
+        self, model: str, messages: list[Message], *args: object
+    ) -> Completion:
+        return Completion(content="ok")
+
+
+class NullReporter:
+    """Reporter discarding entries."""
+
+    async def init_run(
+        self, category: str | None, model: str, block_ids: list[str]
+    ) -> Path:
+        return Path("/null")
+
+    async def write_entry(self, run_dir: Path, entry: RunEntry) -> None:
+        pass
+
+    async def finalize_run(self, run_dir: Path) -> None:
+        pass
+
+
+def make_block() -> EvaluationBlock:
+    return EvaluationBlock.model_validate(
+        {
+            "metadata": {"id": "bench"},
+            "prompts": {"system": "You are a careful assistant. " * 8},
+            "dataset": [
+                {"id": f"case-{i}", "input": f"Question number {i}?", "expected": "42"}
+                for i in range(CASES)
+            ],
+        }
+    )
+
+
+def prepare_items(executor: Executor, block: EvaluationBlock) -> list[WorkItem]:
+    """Prepare one work item per case, as the executor does."""
+    return [
+        WorkItem(
+            seq=i,
+            block=block,
+            block_pos=0,
+            case_index=i,
+            case=case,
+            messages=executor._build_messages(block, case),
+        )
+        for i, case in enumerate(block.dataset)
+    ]
+
+
+def work_item_cost(executor: Executor, block: EvaluationBlock) -> tuple[float, float]:
+    """Microseconds and retained bytes per prepared work item."""
+    started = time.perf_counter()
+    prepare_items(executor, block)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = prepare_items(executor, block)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return elapsed / CASES * 1e6, (after - before) / CASES
+
+
+def entry_cost(executor: Executor, block: EvaluationBlock) -> tuple[float, float]:
+    """Microseconds and retained bytes per run entry."""
+    items = prepare_items(executor, block)
+    result = CaseResult(latency=0.1, completion=Completion(content="ok"))
+
+    started = time.perf_counter()
+    entries = [executor._build_entry("m", item, result) for item in items]
+    elapsed = time.perf_counter() - started
+    entries.clear()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entries = [executor._build_entry("m", item, result) for item in items]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed / CASES * 1e6, (after - before) / CASES
+
+
+def end_to_end(block_path: Path) -> float:
+    """Microseconds per case through the executor."""
+    executor = Executor(
+        InstantClient(), NullReporter(), console=Console(quiet=True), progress="none"
+    )
+    started = time.perf_counter()
+    asyncio.run(executor.execute(blocks_dir=block_path, models=["m"]))
+    return (time.perf_counter() - started) / CASES * 1e6
+
+
+def main() -> None:
+    block = make_block()
+    executor = Executor(InstantClient(), NullReporter(), console=Console(quiet=True))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.json"
+        path.write_text(json.dumps(block.model_dump(mode="json", exclude_none=True)))
+        item_us, item_bytes = work_item_cost(executor, block)
+        print(f"work item:  {item_us:7.2f} us/case, {item_bytes:5.0f} B/case")
+        entry_us, entry_bytes = entry_cost(executor, block)
+        print(f"run entry:  {entry_us:7.2f} us/case, {entry_bytes:5.0f} B/case")
+        print(f"end-to-end: {end_to_end(path):7.2f} us/case")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 """Mock LLM client for testing."""
 
-from tls.protocols.llm import Message
+from typing import Any
+
+from tls.models.benchmark import OutputLimits, SamplingParams
+from tls.protocols.llm import Completion, CompletionBatch, Embeddings, Message
+from tls.services.llm_client import cap_output
 
 
 class MockLlmClient:
@@ -9,7 +13,65 @@ class MockLlmClient:
     def __init__(self, response: str = "Mock response") -> None:
         """Initialize with a fixed response."""
         self.response = response
+        self.batch_sizes: list[int] = []
+        self.requests: list[list[Message]] = []
+        self.sampling: list[SamplingParams | None] = []
+        self.embedding_batches: list[list[str]] = []
+        self.response_formats: list[dict[str, Any] | None] = []
 
     async def chat(self, model: str, messages: list[Message]) -> str:
         """Return the configured mock response."""
         return self.response
+
+    async def complete(
+        self,
+        model: str,
+        messages: list[Message],
+        sampling: SamplingParams | None = None,
+        n: int = 1,
+        limits: OutputLimits | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> Completion:
+        """Return the configured mock response with rough token counts."""
+        self.requests.append(messages)
+        self.response_formats.append(response_format)
+        self.sampling.append(sampling)
+        prompt_tokens = sum(len(m.content.split()) for m in messages)
+        content, truncated = cap_output(self.response, None, limits)
+        return Completion(
+            content=content,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=len(content.split()) * n,
+            samples=[content] * n if n > 1 else [],
+            truncated=truncated,
+        )
+
+    async def complete_batch(
+        self,
+        model: str,
+        conversations: list[list[Message]],
+        sampling: SamplingParams | None = None,
+        limits: OutputLimits | None = None,
+    ) -> CompletionBatch:
+        """Return one mock completion per conversation, with usage per batch."""
+        self.batch_sizes.append(len(conversations))
+        completions = [
+            await self.complete(model, messages, sampling, limits=limits)
+            for messages in conversations
+        ]
+        batch = CompletionBatch(
+            completions=completions,
+            prompt_tokens=sum(c.prompt_tokens or 0 for c in completions),
+            completion_tokens=sum(c.completion_tokens or 0 for c in completions),
+        )
+        for completion in completions:
+            completion.prompt_tokens = completion.completion_tokens = None
+        return batch
+
+    async def embed(self, model: str, inputs: list[str]) -> Embeddings:
+        """Return a small deterministic vector per input."""
+        self.embedding_batches.append(inputs)
+        return Embeddings(
+            vectors=[[float(len(text)), 1.0, 0.0, 0.0] for text in inputs],
+            prompt_tokens=sum(len(text.split()) for text in inputs),
+        )
@@ -28,3 +28,6 @@ class InMemoryReporter:
         """Store entry in memory."""
         if entry.block_id in self.entries:
             self.entries[entry.block_id].append(entry)
+
+    async def finalize_run(self, run_dir: Path) -> None:
+        """Nothing to flush for the in-memory reporter."""
@@ -7,12 +7,17 @@ from tls.models import (
     BlockMetadata,
     BlockPrompts,
     Config,
+    EndpointKind,
     EvaluationBlock,
     GradingCriteria,
+    OutputLimits,
     ProjectConfig,
     RunEntry,
+    SamplingParams,
     TargetConfig,
     TestCase,
+    TurnRecord,
+    UnconstrainedRun,
     sanitize_model_name,
 )
 
@@ -23,14 +28,19 @@ __all__ = [
     "BlockPrompts",
     "Config",
     "ConfigError",
+    "EndpointKind",
     "EvaluationBlock",
     "GradingCriteria",
+    "OutputLimits",
     "NetworkError",
     "ProjectConfig",
     "RunEntry",
+    "SamplingParams",
     "TargetConfig",
     "TestCase",
     "TlsError",
+    "TurnRecord",
+    "UnconstrainedRun",
     "ValidationError",
     "create_context",
     "sanitize_model_name",
@@ -1,6 +1,8 @@
 """Commands module for tls CLI."""
 
+from tls.commands.compare import compare
+from tls.commands.history import history
 from tls.commands.init import init
 from tls.commands.run import run
 
-__all__ = ["init", "run"]
+__all__ = ["compare", "history", "init", "run"]
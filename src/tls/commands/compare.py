@@ -0,0 +1,123 @@
+"""Compare command implementation."""
+
+from pathlib import Path
+
+import typer
+from rich.table import Table
+
+from tls.context import AppContext
+from tls.errors import TlsError
+from tls.services.comparer import compare_runs, load_run
+
+
+def compare(
+    ctx: typer.Context,
+    run_a: Path = typer.Argument(..., help="Baseline run directory."),
+    run_b: Path = typer.Argument(..., help="Candidate run directory."),
+    threshold: float = typer.Option(
+        0.1,
+        "--threshold",
+        help="Relative median latency increase flagged as a regression.",
+    ),
+    alpha: float = typer.Option(
+        0.05,
+        "--alpha",
+        help="Significance level for the paired latency test.",
+    ),
+    show: int = typer.Option(
+        10,
+        "--show",
+        "-n",
+        help="Maximum number of changed cases to list.",
+    ),
+) -> None:
+    """
+    Compare two benchmark runs.
+
+    Aligns entries by block and case ID, then reports output changes,
+    score deltas and latency/throughput regressions.
+    """
+    app_ctx: AppContext = ctx.obj
+    console = app_ctx.console
+
+    try:
+        report = compare_runs(load_run(run_a), load_run(run_b))
+    except TlsError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    except Exception as e:
+        console.print(f"[red]Unexpected error:[/red] {e}")
+        raise typer.Exit(1)
+
+    console.print("[bold]Run Comparison[/bold]")
+    console.print(f"  A: [dim]{run_a}[/dim] ({report.run_a.model})")
+    console.print(f"  B: [dim]{run_b}[/dim] ({report.run_b.model})")
+    console.print(f"  Matched cases: {report.matched}")
+    if report.only_a:
+        console.print(f"  [yellow]Only in A: {len(report.only_a)}[/yellow]")
+    if report.only_b:
+        console.print(f"  [yellow]Only in B: {len(report.only_b)}[/yellow]")
+    console.print(f"  Changed outputs: {len(report.changed_outputs)}")
+    if report.new_failures:
+        console.print(f"  [red]New failures: {len(report.new_failures)}[/red]")
+    if report.fixed_failures:
+        console.print(f"  [green]Fixed failures: {len(report.fixed_failures)}[/green]")
+
+    delta = report.score_delta_estimate()
+    if delta is not None:
+        console.print(
+            f"  Mean score delta: {delta.mean:+.4f} "
+            f"({delta.low:+.4f} to {delta.high:+.4f}, 95% CI) "
+            f"over {delta.count} cases"
+        )
+        block_deltas = report.block_score_deltas()
+        if len(block_deltas) > 1:
+            table = Table(title="Score delta per block")
+            table.add_column("Block")
+            table.add_column("Cases", justify="right")
+            table.add_column("Mean", justify="right")
+            table.add_column("95% CI", justify="right")
+            for block_id, estimate in sorted(block_deltas.items()):
+                table.add_row(
+                    block_id,
+                    str(estimate.count),
+                    f"{estimate.mean:+.4f}",
+                    f"{estimate.low:+.4f} to {estimate.high:+.4f}",
+                )
+            console.print(table)
+
+    if report.latency is not None:
+        latency = report.latency
+        table = Table(title="Latency (paired, successful cases)")
+        table.add_column("Metric")
+        table.add_column("A", justify="right")
+        table.add_column("B", justify="right")
+        table.add_row(
+            "median (s)", f"{latency.median_a:.3f}", f"{latency.median_b:.3f}"
+        )
+        table.add_row("p90 (s)", f"{latency.p90_a:.3f}", f"{latency.p90_b:.3f}")
+        table.add_row("p99 (s)", f"{latency.p99_a:.3f}", f"{latency.p99_b:.3f}")
+        if report.throughput_a is not None and report.throughput_b is not None:
+            table.add_row(
+                "tokens/s",
+                f"{report.throughput_a:.1f}",
+                f"{report.throughput_b:.1f}",
+            )
+        console.print(table)
+        console.print(
+            f"  Median change: {latency.median_change:+.1%} "
+            f"(Wilcoxon z={latency.z_score:.2f}, p={latency.p_value:.4f}, "
+            f"n={latency.pairs})"
+        )
+        if report.is_latency_regression(threshold, alpha):
+            console.print("  [red]Latency regression detected[/red]")
+
+    if report.changed_outputs and show > 0:
+        console.print("\n[bold]Changed outputs[/bold]")
+        for block_id, key in report.changed_outputs[:show]:
+            delta = report.score_deltas.get((block_id, key))
+            suffix = f" (score {delta:+.3f})" if delta is not None else ""
+            console.print(f"  {block_id} / {key}{suffix}")
+        remaining = len(report.changed_outputs) - show
+        if remaining > 0:
+            console.print(f"  [dim]... and {remaining} more[/dim]")
@@ -0,0 +1,101 @@
+"""History command implementation."""
+
+from pathlib import Path
+
+import typer
+from rich.table import Table
+
+from tls.context import AppContext
+from tls.services.history import HISTORY_FILENAME, HistoryStore
+
+
+def _fmt(value: float | None, spec: str) -> str:
+    """Format an optional metric value."""
+    return "-" if value is None else format(value, spec)
+
+
+def history(
+    ctx: typer.Context,
+    model: str = typer.Option(
+        None,
+        "--model",
+        "-m",
+        help="Only show runs of this model.",
+    ),
+    block_id: str = typer.Option(
+        None,
+        "--block",
+        "-b",
+        help="Restrict metrics to a single block ID.",
+    ),
+    limit: int = typer.Option(
+        20,
+        "--limit",
+        "-n",
+        help="Number of most recent runs to show.",
+    ),
+) -> None:
+    """
+    Show metrics of previous runs.
+
+    Reads the history store written by every run and shows per-run
+    success rate, score and latency percentiles, with a per-model
+    aggregate across the listed runs.
+    """
+    app_ctx: AppContext = ctx.obj
+    console = app_ctx.console
+
+    history_path = Path.cwd() / "reports" / HISTORY_FILENAME
+    if not history_path.exists():
+        console.print("[red]Error:[/red] No run history found. Run 'tls run' first.")
+        raise typer.Exit(1)
+
+    store = HistoryStore(history_path)
+    try:
+        runs = store.query_runs(model=model, block_id=block_id, limit=limit)
+    finally:
+        store.close()
+
+    if not runs:
+        console.print("No matching runs.")
+        return
+
+    table = Table(title="Run History")
+    table.add_column("Started")
+    table.add_column("Model", style="cyan")
+    table.add_column("Cases", justify="right")
+    table.add_column("Success", justify="right")
+    table.add_column("Score", justify="right")
+    table.add_column("p50 (s)", justify="right")
+    table.add_column("p90 (s)", justify="right")
+    table.add_column("tok/s", justify="right")
+    for run in runs:
+        table.add_row(
+            run.started_at[:19],
+            run.model,
+            str(run.total_cases),
+            _fmt(run.success_rate, ".1%"),
+            _fmt(run.mean_score, ".3f"),
+            _fmt(run.p50_latency, ".3f"),
+            _fmt(run.p90_latency, ".3f"),
+            _fmt(run.tokens_per_second, ".1f"),
+        )
+    console.print(table)
+
+    # Aggregate per model across the listed runs
+    by_model: dict[str, list[float]] = {}
+    for run in runs:
+        if run.p90_latency is not None:
+            by_model.setdefault(run.model, []).append(run.p90_latency)
+    for name, p90s in by_model.items():
+        rates = [
+            r.success_rate
+            for r in runs
+            if r.model == name and r.success_rate is not None
+        ]
+        mean_rate = sum(rates) / len(rates) if rates else None
+        console.print(
+            f"  [cyan]{name}[/cyan]: {len(p90s)} runs, "
+            f"mean p90 {sum(p90s) / len(p90s):.3f}s, "
+            f"mean success {_fmt(mean_rate, '.1%')}"
+        )
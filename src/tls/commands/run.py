@@ -1,16 +1,27 @@
 """Run command implementation."""
 
 import asyncio
+from collections.abc import Callable
 from pathlib import Path
 
 import typer
+from rich.console import Console
 
 from tls.config.settings import load_config
 from tls.context import AppContext
 from tls.errors import ConfigError, TlsError
-from tls.services.executor import Executor
+from tls.protocols.reporter import ReporterProtocol
+from tls.services.executor import EndpointStats, Executor, RunSummary, SchemaStats
+from tls.services.history import HISTORY_FILENAME, HistoryReporter, HistoryStore
 from tls.services.llm_client import LlmClient
+from tls.services.metrics import MetricsServer, RunMetrics
+from tls.services.planner import CHARS_PER_TOKEN, RunPlan, plan_run
+from tls.services.registry import create_reporter
 from tls.services.reporter import FileSystemReporter
+from tls.services.retry import RetryResult, retry_failed_cases
+from tls.services.statistics import MeanEstimate
+from tls.services.tracer import Tracer
+from tls.services.watcher import BlockWatcher, RunUpdate, update_runs
 
 
 def run(
@@ -45,6 +56,87 @@ def run(
         "-t",
         help="Request timeout in seconds. Defaults to config value.",
     ),
+    batch_size: int = typer.Option(
+        None,
+        "--batch-size",
+        help="Prompts per batched completions request. Defaults to config value.",
+    ),
+    ordering: str = typer.Option(
+        None,
+        "--order",
+        help="Dispatch order: 'dataset' or 'prefix' (prefix-cache friendly). "
+        "Defaults to config value.",
+    ),
+    concurrency: str = typer.Option(
+        None,
+        "--concurrency",
+        "-c",
+        help="Requests in flight per model, or 'auto' for an adaptive limit. "
+        "Defaults to config value.",
+    ),
+    warmup: int = typer.Option(
+        None,
+        "--warmup",
+        help="Throwaway requests per model before measured cases. "
+        "Defaults to config value.",
+    ),
+    dedup: bool = typer.Option(
+        None,
+        "--dedup/--no-dedup",
+        help="Send identical requests once per model and share the result. "
+        "Defaults to config value.",
+    ),
+    compression: str = typer.Option(
+        None,
+        "--compress",
+        help="Stream-compress entries and Markdown reports: 'none', 'gzip' or "
+        "'zstd'. Defaults to config value.",
+    ),
+    scoring_workers: int = typer.Option(
+        None,
+        "--scoring-workers",
+        help="Processes scoring outputs of blocks with a scorer; 0 scores in "
+        "the main process. Defaults to one per CPU.",
+    ),
+    plan: bool = typer.Option(
+        False,
+        "--plan",
+        help="Show the cases, requests, estimated tokens and projected duration "
+        "of the run without sending any request.",
+    ),
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        "-w",
+        help="Keep running: whenever benchmark files change, run only new or "
+        "modified cases and merge them into each model's latest run. Updates "
+        "reach the run directory and history; other reporter backends only "
+        "receive full runs.",
+    ),
+    retry_failed: Path = typer.Option(
+        None,
+        "--retry-failed",
+        help="Re-run only the failed cases of this run directory and update "
+        "its reports and history in place. Other reporter backends are not "
+        "updated.",
+    ),
+    quiet: bool = typer.Option(
+        False,
+        "--quiet",
+        "-q",
+        "--no-progress",
+        help="Disable the progress display (e.g. in CI).",
+    ),
+    metrics_port: int = typer.Option(
+        None,
+        "--metrics-port",
+        help="Serve live Prometheus metrics on 127.0.0.1:PORT/metrics during the run.",
+    ),
+    trace: Path = typer.Option(
+        None,
+        "--trace",
+        help="Write per-phase timing spans to this file (Chrome trace JSON).",
+    ),
 ) -> None:
     """
     Run benchmark evaluations.
@@ -64,6 +156,12 @@ def run(
         effective_blocks_dir = blocks_dir or project_root / config.project.blocks_dir
         effective_models = list(model) if model else config.target.models
         effective_timeout = timeout or config.target.timeout
+        effective_batch_size = batch_size or config.target.batch_size
+        effective_ordering = ordering or config.target.ordering
+        effective_concurrency = concurrency or config.target.concurrency
+        effective_warmup = warmup if warmup is not None else config.target.warmup
+        effective_dedup = dedup if dedup is not None else config.target.dedup
+        effective_compression = compression or config.reports.compression
 
         if not effective_models:
             raise ConfigError(
@@ -71,30 +169,129 @@ def run(
             )
 
         # Create services
+        tracer = Tracer(enabled=trace is not None)
         client = LlmClient(
             base_url=config.target.endpoint,
             api_key=config.target.api_key,
             timeout=effective_timeout,
+            tracer=tracer,
         )
 
+        metrics = RunMetrics(endpoint=config.target.endpoint)
+
+        def make_executor(reporter: ReporterProtocol) -> Executor:
+            return Executor(
+                client=client,
+                reporter=reporter,
+                console=console,
+                metrics=metrics,
+                tracer=tracer,
+                batch_size=effective_batch_size,
+                ordering=effective_ordering,
+                sampling=config.sampling,
+                native_n=config.target.supports_n,
+                limits=config.limits,
+                concurrency=effective_concurrency,
+                max_concurrency=config.target.max_concurrency,
+                warmup=effective_warmup,
+                dedup=effective_dedup,
+                response_format=config.target.supports_response_format,
+                scoring_workers=scoring_workers,
+                progress="none" if quiet else "auto",
+            )
+
         reports_dir = project_root / "reports"
-        reporter = FileSystemReporter(reports_dir=reports_dir)
+        history_path = reports_dir / HISTORY_FILENAME
+        if plan:
+            planner = make_executor(FileSystemReporter(reports_dir))
+            blocks, _ = planner.select_blocks(effective_blocks_dir, file, case_id)
+            store = HistoryStore(history_path) if history_path.exists() else None
+            try:
+                run_plan = plan_run(
+                    blocks,
+                    effective_models,
+                    store,
+                    native_n=config.target.supports_n,
+                )
+            finally:
+                if store is not None:
+                    store.close()
+            _print_plan(console, run_plan)
+            return
+
+        if watch and case_id:
+            raise ConfigError("--watch cannot be combined with --id")
 
-        executor = Executor(
-            client=client,
-            reporter=reporter,
-            console=console,
+        reports = config.reports.model_copy(
+            update={"compression": effective_compression}
         )
+        backends = create_reporter(reports_dir, reports)
+        history_store = HistoryStore(history_path)
+        reporter = HistoryReporter(backends, history_store)
+
+        if watch:
+            try:
+                asyncio.run(
+                    _watch(
+                        console,
+                        make_executor,
+                        reporter,
+                        history_store,
+                        reports_dir,
+                        effective_blocks_dir,
+                        effective_models,
+                        file,
+                    )
+                )
+            except KeyboardInterrupt:
+                console.print("Stopped watching.")
+            finally:
+                history_store.close()
+            return
+
+        if retry_failed is not None:
+            try:
+                retry = asyncio.run(
+                    retry_failed_cases(
+                        make_executor,
+                        # History records runs by their absolute directory
+                        retry_failed.absolute(),
+                        effective_blocks_dir,
+                        history_store,
+                    )
+                )
+            finally:
+                history_store.close()
+            _print_retry(console, retry)
+            return
+
+        executor = make_executor(reporter)
+
+        server = None
+        if metrics_port is not None:
+            server = MetricsServer(metrics, port=metrics_port)
+            console.print(
+                f"[dim]Serving metrics on http://{server.host}:{metrics_port}/metrics[/dim]"
+            )
 
         # Run the benchmarks
-        summary = asyncio.run(
-            executor.execute(
-                blocks_dir=effective_blocks_dir,
-                models=effective_models,
-                target_file=file,
-                target_id=case_id,
+        try:
+            summary = asyncio.run(
+                _execute(
+                    executor,
+                    server,
+                    blocks_dir=effective_blocks_dir,
+                    models=effective_models,
+                    target_file=file,
+                    target_id=case_id,
+                )
             )
-        )
+        finally:
+            history_store.close()
+            # Failed and interrupted runs are the ones worth a trace
+            if trace is not None:
+                tracer.write(trace)
+                console.print(f"[dim]Trace written to {trace}[/dim]")
 
         # Print summary
         console.print()
@@ -109,6 +306,82 @@ def run(
             console.print(f"\n  Model: [cyan]{model_summary.model}[/cyan]")
             if model_summary.run_dir:
                 console.print(f"    Report: [dim]{model_summary.run_dir}[/dim]")
+            if model_summary.warmup_latencies:
+                timings = ", ".join(
+                    f"{latency:.2f}s" for latency in model_summary.warmup_latencies
+                )
+                console.print(f"    Warmup: {timings} [dim](excluded from stats)[/dim]")
+                cold_start = model_summary.cold_start_seconds
+                if cold_start is not None:
+                    console.print(
+                        f"    [yellow]Cold start detected: ~{cold_start:.2f}s "
+                        "model load[/yellow]"
+                    )
+                if model_summary.warmup_errors:
+                    console.print(
+                        f"    [yellow]Warmup errors: "
+                        f"{model_summary.warmup_errors[0]}[/yellow]"
+                    )
+            history = model_summary.concurrency_history
+            if len(history) > 1:
+                peak = max(limit for _, limit in history)
+                console.print(
+                    f"    Concurrency: final {history[-1][1]}, peak {peak}, "
+                    f"{model_summary.concurrency_backoffs} back-offs"
+                )
+                console.print(
+                    f"    [dim]Limit over time: {_format_limits(history)}[/dim]"
+                )
+            endpoints = model_summary.endpoints
+            if set(endpoints) - {"chat"}:
+                for stats in endpoints.values():
+                    console.print(f"    {_format_endpoint(stats)}")
+            turn_latencies = model_summary.mean_turn_latencies
+            if turn_latencies:
+                timings = ", ".join(
+                    f"{turn}: {latency:.2f}s"
+                    for turn, latency in enumerate(turn_latencies, start=1)
+                )
+                console.print(f"    Mean latency per turn: {timings}")
+            if model_summary.schema:
+                console.print(f"    {_format_schema(model_summary.schema)}")
+            latencies = model_summary.latency_percentiles()
+            if latencies is not None:
+                p50, p90, p99 = latencies
+                console.print(
+                    f"    Latency: p50 {p50:.2f}s, p90 {p90:.2f}s, p99 {p99:.2f}s"
+                )
+            estimate = model_summary.score_estimate()
+            if estimate is not None:
+                console.print(
+                    f"    Score: {_format_estimate(estimate)} over "
+                    f"{estimate.count} cases "
+                    f"[dim](scorer time {model_summary.scoring_seconds:.2f}s)[/dim]"
+                )
+                scored_blocks = [b for b in model_summary.blocks if b.scores]
+                if len(scored_blocks) > 1:
+                    for block in scored_blocks:
+                        block_estimate = block.score_estimate()
+                        if block_estimate is not None:
+                            console.print(
+                                f"      {block.block_id}: "
+                                f"{_format_estimate(block_estimate)}"
+                            )
+            if model_summary.deduplicated_cases:
+                console.print(
+                    f"    Deduplicated: {model_summary.deduplicated_cases} cases "
+                    "shared an identical request's result"
+                )
+            if model_summary.truncated_cases:
+                console.print(
+                    f"    [yellow]Truncated: {model_summary.truncated_cases}[/yellow]"
+                )
+            if model_summary.sample_results:
+                max_k = max(n for n, _ in model_summary.sample_results)
+                for k in sorted({1, max_k}):
+                    score = model_summary.pass_at_k(k)
+                    if score is not None:
+                        console.print(f"    pass@{k}: {score:.3f}")
 
     except TlsError as e:
         console.print(f"[red]Error:[/red] {e}")
@@ -116,3 +389,203 @@ def run(
     except Exception as e:
         console.print(f"[red]Unexpected error:[/red] {e}")
         raise typer.Exit(1)
+
+
+def _print_plan(console: Console, plan: RunPlan) -> None:
+    """Print a run plan."""
+    console.print("[bold]Run Plan[/bold] [dim](no requests sent)[/dim]")
+    console.print(f"  Cases: {plan.cases:,} per model, {len(plan.models)} model(s)")
+    console.print(f"  Requests: {plan.requests:,} per model")
+    console.print(
+        f"  Prompt tokens: ~{_format_count(plan.prompt_tokens)} per model "
+        f"[dim](estimated at {CHARS_PER_TOKEN} characters per token)[/dim]"
+    )
+    for block in plan.blocks:
+        console.print(
+            f"    {block.block_id} ({block.endpoint}): {block.cases:,} cases, "
+            f"{block.requests:,} requests, "
+            f"~{_format_count(block.prompt_tokens)} prompt tokens"
+        )
+    for projection in plan.models:
+        console.print(f"\n  Model: [cyan]{projection.model}[/cyan]")
+        throughput = projection.throughput
+        if throughput is None or projection.seconds is None:
+            console.print(
+                "    [yellow]No previous runs to project from; "
+                "run a small sample first[/yellow]"
+            )
+            continue
+        console.print(
+            f"    Duration: ~{_format_duration(projection.seconds)} at "
+            f"{throughput.cases_per_second:.1f} cases/s "
+            f"[dim](last {throughput.runs} run(s))[/dim]"
+        )
+        if projection.completion_tokens:
+            console.print(
+                f"    Completion tokens: ~{_format_count(projection.completion_tokens)} "
+                f"({throughput.completion_tokens_per_case:.0f} per case)"
+            )
+
+
+def _format_count(value: int) -> str:
+    """Format a count compactly (1.2k, 3.4M)."""
+    for threshold, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "k")):
+        if value >= threshold:
+            return f"{value / threshold:.1f}{suffix}"
+    return str(value)
+
+
+def _format_duration(seconds: float) -> str:
+    """Format a duration as hours, minutes and seconds."""
+    minutes, secs = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {secs:02d}s"
+    return f"{secs}s"
+
+
+def _format_endpoint(stats: EndpointStats) -> str:
+    """One-line throughput summary of an endpoint."""
+    unit = "vectors" if stats.endpoint == "embeddings" else "cases"
+    line = f"{stats.endpoint.capitalize()}: {stats.items} {unit} in {stats.requests} requests"
+    if stats.items_per_second is not None:
+        line += f", {stats.items_per_second:.1f} {unit}/s"
+    if stats.tokens_per_second is not None:
+        line += f", {stats.tokens_per_second:.1f} tokens/s"
+    return line
+
+
+def _format_estimate(estimate: MeanEstimate) -> str:
+    """Mean with its confidence interval, e.g. "0.832 (0.801-0.860, 95% CI)"."""
+    return f"{estimate.mean:.3f} ({estimate.low:.3f}-{estimate.high:.3f}, 95% CI)"
+
+
+def _format_schema(schema: dict[str, SchemaStats]) -> str:
+    """One-line schema validity summary, comparing constrained and free decoding."""
+    parts = []
+    for mode in ("constrained", "free"):
+        stats = schema.get(mode)
+        if stats is None or stats.validity_rate is None:
+            continue
+        parts.append(
+            f"{mode} {stats.valid}/{stats.cases} ({stats.validity_rate:.0%}, "
+            f"{stats.mean_latency:.2f}s mean)"
+        )
+    line = "Schema validity: " + ", ".join(parts)
+    constrained, free = schema.get("constrained"), schema.get("free")
+    if constrained and free and constrained.mean_latency and free.mean_latency:
+        delta = constrained.mean_latency / free.mean_latency - 1
+        line += f"; constrained latency {delta:+.0%} vs free"
+    return line
+
+
+def _format_limits(history: list[tuple[float, int]], points: int = 12) -> str:
+    """Format a concurrency history as a compact "time=limit" timeline."""
+    step = max(1, len(history) // points)
+    shown = history[::step]
+    if shown[-1] != history[-1]:
+        shown.append(history[-1])
+    return " ".join(f"{seconds:.1f}s={limit}" for seconds, limit in shown)
+
+
+async def _watch(
+    console: Console,
+    make_executor: Callable[[ReporterProtocol], Executor],
+    reporter: ReporterProtocol,
+    history: HistoryStore,
+    reports_dir: Path,
+    blocks_dir: Path,
+    models: list[str],
+    target_file: Path | None,
+) -> None:
+    """Update the latest runs now and after every change to the benchmarks."""
+    watcher = BlockWatcher(target_file or blocks_dir)
+    console.print(f"Watching [dim]{watcher.path}[/dim] for changes (Ctrl+C to stop)")
+    while True:
+        try:
+            updates = await update_runs(
+                make_executor,
+                reports_dir,
+                blocks_dir,
+                models,
+                target_file,
+                reporter=reporter,
+                history=history,
+            )
+        except TlsError as e:
+            console.print(f"[red]Error:[/red] {e}")
+        else:
+            for update in updates:
+                console.print(_format_update(update))
+        await watcher.wait()
+
+
+def _print_retry(console: Console, retry: RetryResult) -> None:
+    """Print the outcome of retrying failed cases."""
+    if not retry.failed:
+        console.print(f"No failed cases in {retry.run_dir}")
+        return
+    console.print(
+        f"Retried {retry.retried} of {retry.failed} failed cases of "
+        f"[cyan]{retry.model}[/cyan]: [green]{retry.fixed} fixed[/green]"
+        + (
+            f", [red]{retry.still_failing} still failing[/red]"
+            if retry.still_failing
+            else ""
+        )
+    )
+    if retry.skipped:
+        console.print(
+            f"[yellow]Skipped {len(retry.skipped)} cases changed or removed "
+            f"since the run: {', '.join(retry.skipped[:5])}"
+            f"{', ...' if len(retry.skipped) > 5 else ''}[/yellow]"
+        )
+    console.print(f"  Report: [dim]{retry.run_dir}[/dim]")
+
+
+def _format_update(update: RunUpdate) -> str:
+    """One-line summary of an incremental update."""
+    if update.full_run:
+        action = f"ran all {update.executed} cases (no earlier run)"
+    elif update.executed or update.removed:
+        action = ", ".join(
+            part
+            for part in (
+                f"re-ran {update.executed} changed cases" if update.executed else "",
+                f"dropped {update.removed} removed cases" if update.removed else "",
+            )
+            if part
+        )
+    else:
+        action = "up to date"
+    if update.failed:
+        action += f", [red]{update.failed} failed[/red]"
+    return f"  [cyan]{update.model}[/cyan]: {action} [dim]{update.run_dir}[/dim]"
+
+
+async def _execute(
+    executor: Executor,
+    server: MetricsServer | None,
+    blocks_dir: Path,
+    models: list[str],
+    target_file: Path | None,
+    target_id: str | None,
+) -> RunSummary:
+    """Run the executor, serving metrics for the duration when requested."""
+    if server is None:
+        return await executor.execute(
+            blocks_dir=blocks_dir,
+            models=models,
+            target_file=target_file,
+            target_id=target_id,
+        )
+
+    async with server:
+        return await executor.execute(
+            blocks_dir=blocks_dir,
+            models=models,
+            target_file=target_file,
+            target_id=target_id,
+        )
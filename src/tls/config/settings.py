@@ -7,7 +7,13 @@ from pydantic import Field
 from pydantic_settings import BaseSettings
 
 from tls.errors import ConfigError
-from tls.models.project_config import Config, ProjectConfig, TargetConfig
+from tls.models.benchmark import OutputLimits, SamplingParams
+from tls.models.project_config import (
+    Config,
+    ProjectConfig,
+    ReportsConfig,
+    TargetConfig,
+)
 
 
 class AppSettings(BaseSettings):
@@ -75,9 +81,56 @@ def load_config(project_root: Path) -> Config:
         endpoint=target_section.get("endpoint", "http://127.0.0.1:11434"),
         timeout=int(target_section.get("timeout", "300")),
         api_key=target_section.get("api_key"),
+        batch_size=int(target_section.get("batch_size", "1")),
+        ordering=target_section.get("ordering", "dataset"),
+        supports_n=target_section.getboolean("supports_n", fallback=False),
+        supports_response_format=target_section.getboolean(
+            "supports_response_format", fallback=True
+        ),
+        concurrency=target_section.get("concurrency", "1"),
+        max_concurrency=int(target_section.get("max_concurrency", "64")),
+        warmup=int(target_section.get("warmup", "0")),
+        dedup=target_section.getboolean("dedup", fallback=True),
     )
 
-    return Config(project=project_config, target=target_config)
+    sampling = SamplingParams()
+    if "sampling" in parser:
+        sampling_section = parser["sampling"]
+        sampling = SamplingParams(
+            temperature=sampling_section.getfloat("temperature"),
+            top_p=sampling_section.getfloat("top_p"),
+            max_tokens=sampling_section.getint("max_tokens"),
+            seed=sampling_section.getint("seed"),
+        )
+
+    limits = OutputLimits()
+    if "limits" in parser:
+        limits_section = parser["limits"]
+        limits = OutputLimits(
+            max_seconds=limits_section.getfloat("max_seconds"),
+            max_chars=limits_section.getint("max_chars"),
+        )
+
+    reports_section = parser["reports"] if "reports" in parser else {}
+    backends_str = reports_section.get("backends", "files")
+    reports = ReportsConfig(
+        backends=[b.strip() for b in backends_str.split(",") if b.strip()],
+        compression=reports_section.get("compression", "none"),
+        queue_size=int(reports_section.get("queue_size", "1024")),
+        options={
+            name.removeprefix("reporter."): dict(parser[name])
+            for name in parser.sections()
+            if name.startswith("reporter.")
+        },
+    )
+
+    return Config(
+        project=project_config,
+        target=target_config,
+        sampling=sampling,
+        limits=limits,
+        reports=reports,
+    )
 
 
 settings = AppSettings()
@@ -19,6 +19,65 @@ timeout = 300
 # Optional: API key for authenticated endpoints (not required for local LLMs)
 # api_key = your-api-key-here
 
+# Optional: send N prompts per request to /v1/completions (batch servers)
+# batch_size = 8
+
+# Optional: group cases sharing a prompt prefix to improve server-side
+# prefix cache hits (vLLM, llama.cpp). Reports keep dataset order.
+# ordering = prefix
+
+# Optional: the endpoint returns several samples per request via "n"
+# supports_n = true
+
+# Optional: blocks with an "output_schema" send it as "response_format" for
+# constrained decoding. Disable for endpoints without structured outputs;
+# outputs are still validated against the schema.
+# supports_response_format = false
+
+# Optional: requests in flight per model, or "auto" to raise the limit while
+# latency stays stable and back off on latency growth, timeouts or 429/5xx
+# concurrency = auto
+# max_concurrency = 64
+
+# Optional: throwaway requests per model before measured cases, so model
+# load time (e.g. Ollama) stays out of latency stats. Use 2+ to detect
+# cold starts.
+# warmup = 2
+
+# Optional: identical requests (same prompt, context, input and settings)
+# are sent once per model and their result shared across cases. Disable to
+# send every case, e.g. to sample repeated cases independently.
+# dedup = false
+
+# Optional: default sampling parameters (blocks can override via "sampling")
+# [sampling]
+# temperature = 0.7
+# top_p = 0.95
+# max_tokens = 1024
+# seed = 42
+
+# Optional: bound runaway generations (blocks can override via "limits").
+# Responses are streamed and cut off at the limit, keeping partial output.
+# Cap generated tokens with max_tokens under [sampling].
+# [limits]
+# max_seconds = 120
+# max_chars = 20000
+
+# Optional: stream-compress entries.jsonl and the Markdown reports of large
+# runs ("gzip", or "zstd" with Python 3.14+ or the zstandard package).
+# tls compare and other readers decompress them on the fly.
+# Reporter backends receive every run; "files" writes the run directories
+# other commands read, and plugins registered under the "tls.reporters"
+# entry point group add more. Settings of a plugin go in [reporter.NAME].
+# [reports]
+# compression = gzip
+# Only "files" is built in; list installed plugins after it, e.g.
+# "backends = files, my_plugin".
+# backends = files
+# Entries are written by background tasks; running cases wait only when a
+# backend falls this many entries behind.
+# queue_size = 1024
+
 # Available Models (Reference):
 # deepseek-r1:8b-0528-qwen3-q4_K_M
 # deepseek-r1:8b-0528-qwen3-q8_0
@@ -7,12 +7,13 @@ from rich.console import Console
 
 from tls.config.settings import AppSettings, load_config
 from tls.errors import ConfigError, TlsError
-from tls.models.project_config import Config
+from tls.models.project_config import Config, ReportsConfig
 from tls.protocols.llm import LlmClientProtocol
 from tls.protocols.reporter import ReporterProtocol
 from tls.services.executor import Executor
 from tls.services.initializer import Initializer
 from tls.services.llm_client import LlmClient
+from tls.services.registry import create_reporter
 from tls.services.reporter import FileSystemReporter
 
 
@@ -103,7 +104,12 @@ def create_context(
 
     if reporter is None:
         reports_dir = project_root / "reports"
-        reporter = FileSystemReporter(reports_dir=reports_dir)
+        reports = config.reports if config is not None else ReportsConfig()
+        try:
+            reporter = create_reporter(reports_dir, reports)
+        except ConfigError:
+            # Reported by the commands writing reports; fall back to files
+            reporter = FileSystemReporter(reports_dir=reports_dir)
 
     executor = Executor(
         client=llm_client,
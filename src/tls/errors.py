@@ -16,7 +16,32 @@ class ConfigError(TlsError):
 class NetworkError(TlsError):
     """Network/HTTP-related errors."""
 
-    pass
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        timed_out: bool = False,
+    ) -> None:
+        """
+        Initialize the error.
+
+        Args:
+            message: Error message.
+            status_code: HTTP status code of the failed response, if any.
+            timed_out: Whether the request hit the client timeout.
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.timed_out = timed_out
+
+    @property
+    def overloaded(self) -> bool:
+        """Whether the failure signals an overloaded server (timeout, 429, 5xx)."""
+        if self.timed_out:
+            return True
+        return self.status_code is not None and (
+            self.status_code == 429 or self.status_code >= 500
+        )
 
 
 class ValidationError(TlsError):
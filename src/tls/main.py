@@ -6,6 +6,8 @@ from typing import Optional
 import typer
 from rich.console import Console
 
+from tls.commands.compare import compare
+from tls.commands.history import history
 from tls.commands.init import init
 from tls.commands.run import run
 from tls.context import create_context
@@ -47,6 +49,8 @@ app = typer.Typer(
 # Register commands
 app.command("init")(init)
 app.command("run")(run)
+app.command("compare")(compare)
+app.command("history")(history)
 
 
 @app.callback()
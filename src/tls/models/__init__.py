@@ -4,28 +4,41 @@ from tls.models.benchmark import (
     BlockGrading,
     BlockMetadata,
     BlockPrompts,
+    EndpointKind,
     EvaluationBlock,
     GradingCriteria,
+    OutputLimits,
+    SamplingParams,
+    ScorerKind,
     TestCase,
 )
 from tls.models.project_config import (
     Config,
     ProjectConfig,
+    ReportsConfig,
     TargetConfig,
     sanitize_model_name,
 )
-from tls.models.report import RunEntry
+from tls.models.report import RunEntry, TurnRecord, UnconstrainedRun, case_key
 
 __all__ = [
     "BlockGrading",
     "BlockMetadata",
     "BlockPrompts",
     "Config",
+    "EndpointKind",
     "EvaluationBlock",
     "GradingCriteria",
+    "OutputLimits",
     "ProjectConfig",
+    "ReportsConfig",
     "RunEntry",
+    "SamplingParams",
+    "ScorerKind",
     "TargetConfig",
     "TestCase",
+    "TurnRecord",
+    "UnconstrainedRun",
+    "case_key",
     "sanitize_model_name",
 ]
@@ -1,10 +1,19 @@
 """Benchmark evaluation block models."""
 
-from pydantic import BaseModel, Field
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, model_validator
 
 # Type alias for grading criteria
 GradingCriteria = list[str]
 
+# API endpoint a block's cases are sent to
+EndpointKind = Literal["chat", "completions", "embeddings"]
+
+# Metric scoring outputs against the expected value of their case
+ScorerKind = Literal["exact", "contains", "json", "regex", "edit", "rouge"]
+
 
 class BlockGrading(BaseModel):
     """Grading settings applied to the entire block."""
@@ -36,6 +45,57 @@ class BlockPrompts(BaseModel):
     system: str = Field(..., description="System prompt for the block")
 
 
+class SamplingParams(BaseModel):
+    """Sampling parameters sent with each request (unset values are omitted)."""
+
+    temperature: float | None = Field(
+        default=None, ge=0, description="Sampling temperature"
+    )
+    top_p: float | None = Field(
+        default=None, gt=0, le=1, description="Nucleus sampling probability mass"
+    )
+    max_tokens: int | None = Field(
+        default=None, ge=1, description="Maximum number of tokens to generate"
+    )
+    seed: int | None = Field(default=None, description="Seed for reproducible sampling")
+
+    def merge(self, override: "SamplingParams | None") -> "SamplingParams":
+        """Return a copy with the values set in override taking precedence."""
+        if override is None:
+            return self
+        return self.model_copy(update=override.model_dump(exclude_none=True))
+
+    def to_payload(self) -> dict[str, float | int]:
+        """Parameters to add to the request payload."""
+        return self.model_dump(exclude_none=True)
+
+
+class OutputLimits(BaseModel):
+    """Client-side guards bounding the time and size of a single generation."""
+
+    max_seconds: float | None = Field(
+        default=None,
+        gt=0,
+        description="Wall-time per case; streaming stops and keeps partial output",
+    )
+    max_chars: int | None = Field(
+        default=None,
+        ge=1,
+        description="Maximum output characters; streaming stops once reached",
+    )
+
+    @property
+    def active(self) -> bool:
+        """Whether any limit is set."""
+        return self.max_seconds is not None or self.max_chars is not None
+
+    def merge(self, override: "OutputLimits | None") -> "OutputLimits":
+        """Return a copy with the values set in override taking precedence."""
+        if override is None:
+            return self
+        return self.model_copy(update=override.model_dump(exclude_none=True))
+
+
 class TestCase(BaseModel):
     """A single test case within an evaluation block."""
 
@@ -54,6 +114,24 @@ class TestCase(BaseModel):
         default=None,
         description="Control execution status for individual test case (optional)",
     )
+    samples: int | None = Field(
+        default=None,
+        ge=1,
+        description="Number of samples to generate for this case (for pass@k)",
+    )
+    turns: list[str] | None = Field(
+        default=None,
+        min_length=1,
+        description="Follow-up user messages of a scripted conversation; each is "
+        "sent after the model's reply to the previous one",
+    )
+
+    @model_validator(mode="after")
+    def _single_sample_conversations(self) -> "TestCase":
+        """Reject multi-turn cases asking for several samples."""
+        if self.turns and (self.samples or 1) > 1:
+            raise ValueError("Multi-turn cases cannot request several samples")
+        return self
 
 
 class EvaluationBlock(BaseModel):
@@ -64,4 +142,81 @@ class EvaluationBlock(BaseModel):
     grading: BlockGrading | None = Field(
         default=None, description="Grading settings (optional)"
     )
-    dataset: list[TestCase]
+    sampling: SamplingParams | None = Field(
+        default=None, description="Sampling parameters overriding the config"
+    )
+    limits: OutputLimits | None = Field(
+        default=None, description="Output limits overriding the config"
+    )
+    endpoint: EndpointKind = Field(
+        default="chat",
+        description="Endpoint the cases are sent to: chat (/v1/chat/completions), "
+        "completions (/v1/completions, prompt flattened) or embeddings "
+        "(/v1/embeddings, case input embedded)",
+    )
+    output_schema: dict[str, Any] | None = Field(
+        default=None,
+        description="JSON Schema outputs must satisfy; sent as 'response_format' "
+        "when the endpoint supports constrained decoding",
+    )
+    compare_unconstrained: bool = Field(
+        default=False,
+        description="Also send every case without 'response_format' to compare "
+        "validity and latency of constrained and free decoding",
+    )
+    scorer: ScorerKind | None = Field(
+        default=None,
+        description="Metric scoring every output against its case's 'expected' "
+        "value from 0 to 1: exact, contains, json, regex (expected is a "
+        "pattern), edit (Levenshtein similarity) or rouge (ROUGE-L F1)",
+    )
+    pass_threshold: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description="Score a sample needs to pass for pass@k when the block "
+        "has a scorer",
+    )
+    dataset: list[TestCase] = Field(default_factory=list)
+    dataset_file: Path | None = Field(
+        default=None,
+        description="JSONL file of additional test cases (one per line), "
+        "relative to the block file; read lazily for large suites",
+    )
+
+    @model_validator(mode="after")
+    def _require_cases(self) -> "EvaluationBlock":
+        """Require inline cases or a dataset file and endpoint-compatible settings."""
+        if "dataset" not in self.model_fields_set and self.dataset_file is None:
+            raise ValueError("Block needs a 'dataset' or a 'dataset_file'")
+        if self.output_schema is not None and self.endpoint != "chat":
+            raise ValueError("'output_schema' requires the chat endpoint")
+        if self.compare_unconstrained and self.output_schema is None:
+            raise ValueError("'compare_unconstrained' requires an 'output_schema'")
+        if self.scorer is not None and self.endpoint == "embeddings":
+            raise ValueError("'scorer' cannot score the embeddings endpoint")
+        for case in self.dataset:
+            check_case_endpoint(case, self.endpoint)
+        return self
+
+
+def check_case_endpoint(case: TestCase, endpoint: EndpointKind) -> None:
+    """
+    Check that a case can be sent to an endpoint.
+
+    Raises:
+        ValueError: If the case asks for several samples or turns from an
+            endpoint other than chat.
+    """
+    if endpoint == "chat":
+        return
+    if (case.samples or 1) > 1:
+        raise ValueError(
+            f"Case {case.id or case.input[:30]!r} requests {case.samples} samples, "
+            f"which the {endpoint} endpoint does not support"
+        )
+    if case.turns:
+        raise ValueError(
+            f"Case {case.id or case.input[:30]!r} has several turns, "
+            f"which the {endpoint} endpoint does not support"
+        )
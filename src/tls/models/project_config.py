@@ -2,9 +2,12 @@
 
 import re
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from tls.models.benchmark import OutputLimits, SamplingParams
+
 
 def sanitize_model_name(model: str) -> str:
     """Sanitize a model name for use in filesystem paths."""
@@ -35,6 +38,63 @@ class TargetConfig(BaseModel):
     api_key: str | None = Field(
         default=None, description="Optional API key for authenticated endpoints"
     )
+    batch_size: int = Field(
+        default=1,
+        ge=1,
+        description="Prompts per request sent to the completions endpoint (1 disables batching)",
+    )
+    ordering: Literal["dataset", "prefix"] = Field(
+        default="dataset",
+        description="Dispatch order of cases: dataset order or grouped by shared prompt prefix",
+    )
+    supports_n: bool = Field(
+        default=False,
+        description="Whether the endpoint returns several samples per request via 'n'",
+    )
+    supports_response_format: bool = Field(
+        default=True,
+        description="Whether the endpoint constrains outputs to a JSON Schema "
+        "passed as 'response_format'",
+    )
+    concurrency: int | Literal["auto"] = Field(
+        default=1,
+        description="Maximum in-flight requests per model, or 'auto' to adapt "
+        "to observed latency",
+    )
+    max_concurrency: int = Field(
+        default=64, ge=1, description="Upper bound of the adaptive concurrency limit"
+    )
+    warmup: int = Field(
+        default=0,
+        ge=0,
+        description="Throwaway requests per model before measured cases",
+    )
+    dedup: bool = Field(
+        default=True,
+        description="Send identical requests once per model and share the result",
+    )
+
+
+class ReportsConfig(BaseModel):
+    """Report output configuration from [reports] section."""
+
+    backends: list[str] = Field(
+        default_factory=lambda: ["files"],
+        description="Reporter backends receiving every run, the run owner first",
+    )
+    compression: Literal["none", "gzip", "zstd"] = Field(
+        default="none",
+        description="Stream-compress entries and Markdown reports (gzip or zstd)",
+    )
+    queue_size: int = Field(
+        default=1024,
+        ge=1,
+        description="Entries a backend may fall behind by before writing waits",
+    )
+    options: dict[str, dict[str, str]] = Field(
+        default_factory=dict,
+        description="Backend settings from [reporter.NAME] sections, by backend",
+    )
 
 
 class Config(BaseModel):
@@ -42,3 +102,15 @@ class Config(BaseModel):
 
     project: ProjectConfig
     target: TargetConfig
+    sampling: SamplingParams = Field(
+        default_factory=SamplingParams,
+        description="Default sampling parameters from [sampling] section",
+    )
+    limits: OutputLimits = Field(
+        default_factory=OutputLimits,
+        description="Default output limits from [limits] section",
+    )
+    reports: ReportsConfig = Field(
+        default_factory=ReportsConfig,
+        description="Report output settings from [reports] section",
+    )
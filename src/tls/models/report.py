@@ -1,10 +1,31 @@
 """Report models for benchmark run results."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 
 from pydantic import BaseModel, Field
 
-from tls.models.benchmark import GradingCriteria
+from tls.models.benchmark import EndpointKind, GradingCriteria
+
+
+class TurnRecord(BaseModel):
+    """One exchange of a multi-turn conversation case."""
+
+    input: str = Field(..., description="User message of the turn")
+    output: str = Field(..., description="Model's reply to the turn")
+    latency_seconds: float = Field(..., description="Latency of the turn's request")
+
+
+class UnconstrainedRun(BaseModel):
+    """Result of a case sent again without 'response_format', for comparison."""
+
+    output: str = Field(..., description="Model's response output")
+    latency_seconds: float = Field(..., description="Latency of the request")
+    error: str | None = Field(
+        default=None, description="Error message if the request failed"
+    )
+    schema_valid: bool | None = Field(
+        default=None, description="Whether the output satisfies the block schema"
+    )
 
 
 class RunEntry(BaseModel):
@@ -12,6 +33,12 @@ class RunEntry(BaseModel):
 
     block_id: str = Field(..., description="ID of the evaluation block")
     case_index: int = Field(..., description="Index of the test case within the block")
+    case_id: str | None = Field(default=None, description="ID of the test case")
+    case_hash: str | None = Field(
+        default=None,
+        description="Hash of the case content and the block settings shaping its "
+        "request; unchanged cases keep their hash across runs",
+    )
     input: str = Field(..., description="Input prompt sent to the model")
     output: str = Field(..., description="Model's response output")
     model: str = Field(..., description="Model used for this evaluation")
@@ -23,6 +50,69 @@ class RunEntry(BaseModel):
     grading_template: str | None = Field(
         default=None, description="Grading prompt template for reproducibility"
     )
+    error: str | None = Field(
+        default=None, description="Error message if the request failed"
+    )
+    latency_seconds: float | None = Field(
+        default=None, description="Wall-clock latency of the model request"
+    )
+    prompt_tokens: int | None = Field(
+        default=None, description="Prompt tokens reported by the server"
+    )
+    completion_tokens: int | None = Field(
+        default=None, description="Completion tokens reported by the server"
+    )
+    score: float | None = Field(
+        default=None, description="Score assigned to the output, if scored"
+    )
+    samples: list[str] | None = Field(
+        default=None, description="All sampled outputs when more than one was drawn"
+    )
+    passed_samples: int | None = Field(
+        default=None, description="Number of samples containing the expected answer"
+    )
+    truncated: str | None = Field(
+        default=None,
+        description="Limit that cut the output short: max_tokens, max_chars "
+        "or max_seconds",
+    )
+    turns: list[TurnRecord] | None = Field(
+        default=None,
+        description="Every exchange of a multi-turn case, in order; output and "
+        "latency_seconds then refer to the last turn and the whole conversation",
+    )
+    constrained: bool | None = Field(
+        default=None,
+        description="Whether the block schema was sent as 'response_format' "
+        "(unset for blocks without a schema)",
+    )
+    schema_valid: bool | None = Field(
+        default=None, description="Whether the output satisfies the block schema"
+    )
+    schema_error: str | None = Field(
+        default=None, description="First schema violation of the output"
+    )
+    unconstrained: UnconstrainedRun | None = Field(
+        default=None,
+        description="Same case sent without 'response_format', when compared",
+    )
+    endpoint: EndpointKind = Field(
+        default="chat", description="Endpoint the case was sent to"
+    )
+    dimensions: int | None = Field(
+        default=None, description="Size of the embedding vector (embeddings only)"
+    )
+    duplicate_of: str | None = Field(
+        default=None,
+        description="Case ('block_id/case') whose identical request produced this "
+        "output; the request was sent once and its result shared",
+    )
     timestamp: datetime = Field(
-        default_factory=datetime.utcnow, description="Timestamp of the execution"
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Timestamp of the execution",
     )
+
+
+def case_key(case_id: str | None, case_index: int) -> str:
+    """Key identifying a case within a block across runs."""
+    return case_id if case_id is not None else f"#{case_index}"
@@ -1,9 +1,22 @@
 """Protocol definitions for tls services."""
 
-from tls.protocols.llm import LlmClientProtocol, Message
+from tls.protocols.llm import (
+    BatchLlmClientProtocol,
+    Completion,
+    CompletionBatch,
+    EmbeddingLlmClientProtocol,
+    Embeddings,
+    LlmClientProtocol,
+    Message,
+)
 from tls.protocols.reporter import ReporterProtocol
 
 __all__ = [
+    "BatchLlmClientProtocol",
+    "Completion",
+    "CompletionBatch",
+    "EmbeddingLlmClientProtocol",
+    "Embeddings",
     "LlmClientProtocol",
     "Message",
     "ReporterProtocol",
@@ -1,10 +1,12 @@
 """Protocol for LLM client implementations."""
 
-from dataclasses import dataclass
-from typing import Protocol
+from dataclasses import dataclass, field
+from typing import Any, Protocol, runtime_checkable
 
+from tls.models.benchmark import OutputLimits, SamplingParams
 
-@dataclass
+
+@dataclass(slots=True)
 class Message:
     """Chat message structure."""
 
@@ -16,6 +18,40 @@ class Message:
         return {"role": self.role, "content": self.content}
 
 
+@dataclass(slots=True)
+class Completion:
+    """Chat completion result with token usage reported by the server."""
+
+    content: str
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    cached_tokens: int | None = None
+    samples: list[str] = field(default_factory=list)
+    truncated: str | None = None
+
+    @property
+    def outputs(self) -> list[str]:
+        """All sampled outputs (just the content for single-sample requests)."""
+        return self.samples or [self.content]
+
+
+@dataclass(slots=True)
+class CompletionBatch:
+    """Completions of a batched request with the usage reported for all of them."""
+
+    completions: list[Completion]
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+
+
+@dataclass(slots=True)
+class Embeddings:
+    """Embedding vectors for a batch of inputs with the usage reported by the server."""
+
+    vectors: list[list[float]]
+    prompt_tokens: int | None = None
+
+
 class LlmClientProtocol(Protocol):
     """Protocol for LLM client implementations."""
 
@@ -31,3 +67,77 @@ class LlmClientProtocol(Protocol):
             The model's response content.
         """
         ...
+
+    async def complete(
+        self,
+        model: str,
+        messages: list[Message],
+        sampling: SamplingParams | None = None,
+        n: int = 1,
+        limits: OutputLimits | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> Completion:
+        """
+        Send a chat completion request and keep the usage details.
+
+        Args:
+            model: Model name to use.
+            messages: List of messages for the conversation.
+            sampling: Optional sampling parameters for the request.
+            n: Number of samples to request with the API's "n" parameter.
+            limits: Optional output limits. Outputs cut short are marked in
+                Completion.truncated.
+            response_format: Optional "response_format" constraining the
+                output, e.g. to a JSON Schema.
+
+        Returns:
+            The model's response content together with token usage. With
+            n > 1, every sample is listed in Completion.samples.
+        """
+        ...
+
+
+@runtime_checkable
+class BatchLlmClientProtocol(Protocol):
+    """Protocol for clients that can send many prompts in one request."""
+
+    async def complete_batch(
+        self,
+        model: str,
+        conversations: list[list[Message]],
+        sampling: SamplingParams | None = None,
+        limits: OutputLimits | None = None,
+    ) -> CompletionBatch:
+        """
+        Send several conversations in a single request.
+
+        Args:
+            model: Model name to use.
+            conversations: Message lists, one per prompt.
+            sampling: Optional sampling parameters for the request.
+            limits: Optional output limits applied to each completion.
+
+        Returns:
+            One completion per conversation, in the same order, and the
+            token usage of the whole request.
+        """
+        ...
+
+
+@runtime_checkable
+class EmbeddingLlmClientProtocol(Protocol):
+    """Protocol for clients that can compute embeddings."""
+
+    async def embed(self, model: str, inputs: list[str]) -> Embeddings:
+        """
+        Embed several inputs in a single request.
+
+        Args:
+            model: Model name to use.
+            inputs: Texts to embed.
+
+        Returns:
+            One vector per input, in the same order, and the prompt tokens
+            of the whole request.
+        """
+        ...
@@ -37,3 +37,12 @@ class ReporterProtocol(Protocol):
             entry: The test case entry to write.
         """
         ...
+
+    async def finalize_run(self, run_dir: Path) -> None:
+        """
+        Finish a run after all of its entries have been written.
+
+        Args:
+            run_dir: The run directory path.
+        """
+        ...
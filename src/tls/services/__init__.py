@@ -3,20 +3,36 @@
 from tls.models.report import RunEntry
 from tls.protocols.llm import LlmClientProtocol, Message
 from tls.protocols.reporter import ReporterProtocol
+from tls.services.comparer import ComparisonReport, compare_runs, load_run
 from tls.services.executor import Executor, RunSummary
+from tls.services.history import HistoryReporter, HistoryStore
 from tls.services.initializer import Initializer, InitReport
 from tls.services.llm_client import LlmClient
-from tls.services.reporter import FileSystemReporter
+from tls.services.metrics import MetricsServer, RunMetrics
+from tls.services.registry import create_reporter
+from tls.services.reporter import FanOutReporter, FileSystemReporter, PatchReporter
+from tls.services.tracer import Tracer
 
 __all__ = [
+    "ComparisonReport",
     "Executor",
+    "FanOutReporter",
     "FileSystemReporter",
+    "HistoryReporter",
+    "HistoryStore",
     "InitReport",
     "Initializer",
     "LlmClient",
     "LlmClientProtocol",
     "Message",
+    "MetricsServer",
+    "PatchReporter",
     "ReporterProtocol",
     "RunEntry",
+    "RunMetrics",
     "RunSummary",
+    "Tracer",
+    "compare_runs",
+    "create_reporter",
+    "load_run",
 ]
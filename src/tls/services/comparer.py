@@ -0,0 +1,241 @@
+"""Run comparison service for detecting output changes and regressions."""
+
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from tls.errors import ValidationError
+from tls.models.report import case_key
+from tls.services.compression import find_file, open_text
+from tls.services.reporter import ENTRIES_FILENAME
+from tls.services.statistics import (
+    MeanEstimate,
+    estimate_mean,
+    percentiles,
+    wilcoxon_signed_rank,
+)
+
+EntryKey = tuple[str, str]
+
+
+@dataclass
+class EntryRecord:
+    """Fields of a stored run entry needed for comparison.
+
+    Outputs are kept as hashes only, so diffing large runs does not hold
+    every generated text in memory.
+    """
+
+    output_hash: int
+    error: str | None
+    score: float | None
+    latency_seconds: float | None
+    completion_tokens: int | None
+
+
+@dataclass
+class RunData:
+    """Structured entries of a single run, indexed by (block_id, case key)."""
+
+    run_dir: Path
+    model: str | None
+    entries: dict[EntryKey, EntryRecord]
+
+
+@dataclass
+class LatencyComparison:
+    """Paired latency comparison between two runs."""
+
+    pairs: int
+    median_a: float
+    median_b: float
+    p90_a: float
+    p90_b: float
+    p99_a: float
+    p99_b: float
+    z_score: float
+    p_value: float
+
+    @property
+    def median_change(self) -> float:
+        """Relative change of the median latency from run A to run B."""
+        if not self.median_a:
+            return math.nan
+        return (self.median_b - self.median_a) / self.median_a
+
+
+@dataclass
+class ComparisonReport:
+    """Result of comparing two runs."""
+
+    run_a: RunData
+    run_b: RunData
+    matched: int = 0
+    only_a: list[EntryKey] = field(default_factory=list)
+    only_b: list[EntryKey] = field(default_factory=list)
+    changed_outputs: list[EntryKey] = field(default_factory=list)
+    new_failures: list[EntryKey] = field(default_factory=list)
+    fixed_failures: list[EntryKey] = field(default_factory=list)
+    score_deltas: dict[EntryKey, float] = field(default_factory=dict)
+    latency: LatencyComparison | None = None
+    throughput_a: float | None = None
+    throughput_b: float | None = None
+
+    @property
+    def mean_score_delta(self) -> float | None:
+        """Mean score change over cases scored in both runs."""
+        if not self.score_deltas:
+            return None
+        return sum(self.score_deltas.values()) / len(self.score_deltas)
+
+    def score_delta_estimate(self) -> MeanEstimate | None:
+        """Mean score change with a bootstrap confidence interval."""
+        return estimate_mean(list(self.score_deltas.values()))
+
+    def block_score_deltas(self) -> dict[str, MeanEstimate]:
+        """Mean score change per block with bootstrap confidence intervals."""
+        deltas: dict[str, list[float]] = {}
+        for (block_id, _), delta in self.score_deltas.items():
+            deltas.setdefault(block_id, []).append(delta)
+        estimates: dict[str, MeanEstimate] = {}
+        for block_id, values in deltas.items():
+            estimate = estimate_mean(values)
+            if estimate is not None:
+                estimates[block_id] = estimate
+        return estimates
+
+    def is_latency_regression(self, threshold: float, alpha: float = 0.05) -> bool:
+        """
+        Whether run B is significantly slower than run A.
+
+        Args:
+            threshold: Minimum relative median increase (e.g. 0.1 for 10%).
+            alpha: Significance level for the paired test.
+        """
+        if self.latency is None:
+            return False
+        return self.latency.median_change > threshold and self.latency.p_value < alpha
+
+
+def load_run(run_dir: Path) -> RunData:
+    """
+    Load the structured entries of a run directory.
+
+    Compressed entries are decompressed on the fly while streaming.
+
+    Args:
+        run_dir: Run directory written by FileSystemReporter.
+
+    Returns:
+        Entries indexed by (block_id, case key).
+
+    Raises:
+        ValidationError: If the directory has no structured entries.
+    """
+    entries_path = find_file(run_dir, ENTRIES_FILENAME)
+    if entries_path is None:
+        raise ValidationError(f"No {ENTRIES_FILENAME} found in {run_dir}")
+
+    entries: dict[EntryKey, EntryRecord] = {}
+    model: str | None = None
+    with open_text(entries_path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            model = data.get("model", model)
+            key = (data["block_id"], case_key(data.get("case_id"), data["case_index"]))
+            entries[key] = EntryRecord(
+                output_hash=hash(data["output"]),
+                error=data.get("error"),
+                score=data.get("score"),
+                latency_seconds=data.get("latency_seconds"),
+                completion_tokens=data.get("completion_tokens"),
+            )
+
+    return RunData(run_dir=run_dir, model=model, entries=entries)
+
+
+def _throughput(records: list[EntryRecord]) -> float | None:
+    """Completion tokens per second of request time."""
+    tokens = 0
+    seconds = 0.0
+    for r in records:
+        if r.completion_tokens is None or r.latency_seconds is None:
+            continue
+        tokens += r.completion_tokens
+        seconds += r.latency_seconds
+    return tokens / seconds if seconds > 0 else None
+
+
+def compare_runs(run_a: RunData, run_b: RunData) -> ComparisonReport:
+    """
+    Align two runs by (block_id, case key) and compute their differences.
+
+    Args:
+        run_a: Baseline run.
+        run_b: Candidate run.
+
+    Returns:
+        Comparison report with output changes, score deltas and latency stats.
+    """
+    report = ComparisonReport(run_a=run_a, run_b=run_b)
+    a_entries = run_a.entries
+    b_entries = run_b.entries
+
+    latencies_a: list[float] = []
+    latencies_b: list[float] = []
+    matched_a: list[EntryRecord] = []
+    matched_b: list[EntryRecord] = []
+
+    for key, a in a_entries.items():
+        b = b_entries.get(key)
+        if b is None:
+            report.only_a.append(key)
+            continue
+
+        report.matched += 1
+        matched_a.append(a)
+        matched_b.append(b)
+
+        if a.output_hash != b.output_hash:
+            report.changed_outputs.append(key)
+        if a.error is None and b.error is not None:
+            report.new_failures.append(key)
+        elif a.error is not None and b.error is None:
+            report.fixed_failures.append(key)
+        if a.score is not None and b.score is not None:
+            report.score_deltas[key] = b.score - a.score
+        if (
+            a.error is None
+            and b.error is None
+            and a.latency_seconds is not None
+            and b.latency_seconds is not None
+        ):
+            latencies_a.append(a.latency_seconds)
+            latencies_b.append(b.latency_seconds)
+
+    report.only_b = [key for key in b_entries if key not in a_entries]
+
+    if latencies_a:
+        z_score, p_value = wilcoxon_signed_rank(
+            [b - a for a, b in zip(latencies_a, latencies_b)]
+        )
+        median_a, p90_a, p99_a = percentiles(latencies_a, (50, 90, 99))
+        median_b, p90_b, p99_b = percentiles(latencies_b, (50, 90, 99))
+        report.latency = LatencyComparison(
+            pairs=len(latencies_a),
+            median_a=median_a,
+            median_b=median_b,
+            p90_a=p90_a,
+            p90_b=p90_b,
+            p99_a=p99_a,
+            p99_b=p99_b,
+            z_score=z_score,
+            p_value=p_value,
+        )
+
+    report.throughput_a = _throughput(matched_a)
+    report.throughput_b = _throughput(matched_b)
+    return report
@@ -0,0 +1,133 @@
+"""Streaming compression of report files and transparent decompression."""
+
+import gzip
+import importlib
+import io
+import zlib
+from pathlib import Path
+from types import ModuleType
+from typing import IO, Protocol
+
+from tls.errors import ConfigError
+
+# Supported report compressions
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+# File name suffix of each compression
+SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# zlib window bits selecting the gzip container
+_GZIP_WBITS = 31
+
+
+class Compressor(Protocol):
+    """Incremental compressor (zlib and zstd compression objects)."""
+
+    def compress(self, data: bytes, /) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+def _zstd() -> ModuleType:
+    """
+    Import a zstd implementation.
+
+    Uses the standard library's compression.zstd (Python 3.14+), else the
+    optional zstandard package.
+
+    Raises:
+        ConfigError: If neither is available.
+    """
+    for name in ("compression.zstd", "zstandard"):
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            continue
+    raise ConfigError(
+        "zstd compression needs Python 3.14+ or the zstandard package "
+        "(the 'zstd' extra)"
+    )
+
+
+def check_compression(compression: str) -> str:
+    """
+    Validate a compression name.
+
+    Raises:
+        ConfigError: If the compression is unknown or unavailable.
+    """
+    if compression not in COMPRESSIONS:
+        raise ConfigError(
+            f"Unknown compression '{compression}', expected one of "
+            + ", ".join(COMPRESSIONS)
+        )
+    if compression == "zstd":
+        _zstd()
+    return compression
+
+
+def compressed_name(name: str, compression: str) -> str:
+    """File name of a report file written with a compression."""
+    return name + SUFFIXES[compression]
+
+
+def new_compressor(compression: str) -> Compressor:
+    """
+    Create an incremental compressor writing a complete gzip or zstd stream.
+
+    Args:
+        compression: "gzip" or "zstd".
+    """
+    if compression == "gzip":
+        return zlib.compressobj(wbits=_GZIP_WBITS)
+    module = _zstd()
+    if module.__name__ == "zstandard":
+        compressor: Compressor = module.ZstdCompressor().compressobj()
+    else:
+        compressor = module.ZstdCompressor()
+    return compressor
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    """Compress data in one go (no-op without compression)."""
+    if compression == "none":
+        return data
+    compressor = new_compressor(compression)
+    return compressor.compress(data) + compressor.flush()
+
+
+def find_file(run_dir: Path, name: str) -> Path | None:
+    """
+    Find a report file of a run, whichever compression it was written with.
+
+    Args:
+        run_dir: Run directory.
+        name: Uncompressed file name, e.g. "entries.jsonl".
+
+    Returns:
+        Path of the existing file, or None.
+    """
+    for suffix in SUFFIXES.values():
+        path = run_dir / (name + suffix)
+        if path.exists():
+            return path
+    return None
+
+
+def open_text(path: Path) -> IO[str]:
+    """
+    Open a report file for reading text, decompressing it on the fly.
+
+    The compression is taken from the file suffix (.gz, .zst), so the file
+    is streamed rather than decompressed into memory first.
+    """
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.suffix == ".zst":
+        module = _zstd()
+        if module.__name__ == "zstandard":
+            reader = module.ZstdDecompressor().stream_reader(path.open("rb"))
+            return io.TextIOWrapper(reader, encoding="utf-8")
+        stream: IO[str] = module.open(path, "rt", encoding="utf-8")
+        return stream
+    return path.open(encoding="utf-8")
@@ -0,0 +1,112 @@
+"""Lazy access to the test cases of an evaluation block."""
+
+import hashlib
+from collections.abc import Iterator
+from pathlib import Path
+
+from tls.errors import ValidationError
+from tls.models.benchmark import EvaluationBlock, TestCase, check_case_endpoint
+
+
+def resolve_dataset_file(block: EvaluationBlock, block_path: Path) -> None:
+    """Make a block's dataset file path absolute, relative to its block file."""
+    if block.dataset_file is not None and not block.dataset_file.is_absolute():
+        block.dataset_file = block_path.parent / block.dataset_file
+
+
+def iter_cases(block: EvaluationBlock) -> Iterator[TestCase]:
+    """
+    Yield the inline cases of a block, then those of its dataset file.
+
+    Dataset file lines are parsed one at a time, so a file of any size is
+    never held in memory. Blank lines are skipped.
+
+    Args:
+        block: Evaluation block.
+
+    Yields:
+        Test cases in dataset order.
+
+    Raises:
+        ValidationError: If the dataset file is missing or a line is invalid.
+    """
+    yield from block.dataset
+    if block.dataset_file is None:
+        return
+    try:
+        f = block.dataset_file.open("rb")
+    except OSError as e:
+        raise ValidationError(f"Cannot read dataset file: {e}") from e
+    with f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                case = TestCase.model_validate_json(line)
+                check_case_endpoint(case, block.endpoint)
+            except ValueError as e:
+                raise ValidationError(
+                    f"{block.dataset_file}:{number}: invalid test case: {e}"
+                ) from e
+            yield case
+
+
+def count_cases(block: EvaluationBlock) -> int:
+    """
+    Count the cases of a block without parsing its dataset file.
+
+    Args:
+        block: Evaluation block.
+
+    Returns:
+        Number of inline cases plus non-blank dataset file lines.
+
+    Raises:
+        ValidationError: If the dataset file cannot be read.
+    """
+    count = len(block.dataset)
+    if block.dataset_file is None:
+        return count
+    try:
+        with block.dataset_file.open("rb") as f:
+            for line in f:
+                if line.strip():
+                    count += 1
+    except OSError as e:
+        raise ValidationError(f"Cannot read dataset file: {e}") from e
+    return count
+
+
+def block_digest(block: EvaluationBlock) -> bytes:
+    """
+    Digest of the block settings that shape its requests and entries.
+
+    Covers everything but the metadata and the cases: prompts, grading,
+    endpoint, sampling, limits and output schema.
+
+    Args:
+        block: Evaluation block.
+
+    Returns:
+        A 16-byte digest, used as the key of its cases' hashes.
+    """
+    settings = block.model_dump_json(exclude={"metadata", "dataset", "dataset_file"})
+    return hashlib.blake2b(settings.encode(), digest_size=16).digest()
+
+
+def case_hash(digest: bytes, case: TestCase) -> str:
+    """
+    Content hash of a case within its block.
+
+    The case ID and active flag are left out, so renaming a case does not
+    count as a change.
+
+    Args:
+        digest: Digest of the case's block (see block_digest).
+        case: Test case.
+
+    Returns:
+        16 hex characters; equal hashes mean identical requests and entries.
+    """
+    content = case.model_dump_json(exclude={"id", "active"})
+    return hashlib.blake2b(content.encode(), digest_size=8, key=digest).hexdigest()
@@ -1,25 +1,171 @@
 """Benchmark execution service."""
 
+import asyncio
+import dataclasses
+import itertools
 import json
+import time
+from array import array
+from collections import Counter
+from collections.abc import Callable, Collection, Iterator, Mapping
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 from rich.console import Console
-from rich.progress import (
-    BarColumn,
-    Progress,
-    SpinnerColumn,
-    TaskProgressColumn,
-    TextColumn,
-    TimeElapsedColumn,
-)
 
-from tls.errors import ConfigError
-from tls.models.benchmark import EvaluationBlock
-from tls.models.report import RunEntry
-from tls.protocols.llm import LlmClientProtocol, Message
+from tls.errors import ConfigError, NetworkError
+from tls.models.benchmark import (
+    EndpointKind,
+    EvaluationBlock,
+    OutputLimits,
+    SamplingParams,
+    TestCase,
+)
+from tls.models.report import RunEntry, TurnRecord, UnconstrainedRun, case_key
+from tls.protocols.llm import (
+    BatchLlmClientProtocol,
+    Completion,
+    CompletionBatch,
+    EmbeddingLlmClientProtocol,
+    Embeddings,
+    LlmClientProtocol,
+    Message,
+)
 from tls.protocols.reporter import ReporterProtocol
+from tls.services.dataset import (
+    block_digest,
+    case_hash,
+    count_cases,
+    iter_cases,
+    resolve_dataset_file,
+)
+from tls.services.limiter import create_limiter
+from tls.services.metrics import RunMetrics
+from tls.services.progress import DEFAULT_DESCRIPTION, PROGRESS_MODES, RunProgress
+from tls.services.scheduler import (
+    ORDER_WINDOW,
+    ORDERINGS,
+    ReorderBuffer,
+    SharedRequests,
+    WorkItem,
+    dispatch_units,
+    request_key,
+)
+from tls.services.schema import (
+    Validator,
+    compile_schema,
+    response_format,
+    validate_output,
+)
+from tls.services.scoring import Score, pass_at_k, passing_samples
+from tls.services.scoring_pool import ScoringPool
+from tls.services.statistics import MeanEstimate, estimate_mean, percentile, percentiles
+from tls.services.tracer import Tracer
+
+# Extra time granted past max_seconds before a request is abandoned, so
+# streaming clients can return their partial output first
+DEADLINE_GRACE_SECONDS = 1.0
+
+# Capacity of the queue between the dispatch and writing stages
+QUEUE_SIZE = 256
+
+# Maximum distance, in cases, between a dispatched case and the oldest case
+# whose entry is not yet written; bounds the reorder buffer
+REORDER_WINDOW: int = 2 * ORDER_WINDOW
+
+# Tiny throwaway request used to load a model before measured cases; it
+# shares no prefix with benchmark prompts, so no case gets a cache head start
+WARMUP_MESSAGES = [Message(role="user", content="Hello")]
+WARMUP_INPUT = "Hello"
+
+# A first warmup request slower than this multiple of the following ones
+# is reported as a cold start (model load)
+COLD_START_FACTOR = 3.0
+
+
+@lru_cache(maxsize=1024)
+def system_message(prompt: str, context: str | None) -> Message:
+    """
+    Shared system message for a block prompt and case context.
+
+    Cases of a block usually share their system message, so one instance
+    (and one string) serves all of them instead of a copy per case.
+    Messages are never mutated after creation.
+
+    Args:
+        prompt: Block system prompt.
+        context: Optional case context appended to the prompt.
+
+    Returns:
+        The cached system message.
+    """
+    content = f"{prompt}\n\nContext:\n{context}" if context else prompt
+    return Message(role="system", content=content)
+
+
+def _total(values: list[int | None]) -> int | None:
+    """Sum of the reported values, or None if none was reported."""
+    present = [v for v in values if v is not None]
+    return sum(present) if present else None
+
+
+def merge_samples(completions: list[Completion]) -> Completion:
+    """Combine single-sample completions into one multi-sample completion."""
+    return Completion(
+        content=completions[0].content,
+        prompt_tokens=_total([c.prompt_tokens for c in completions]),
+        completion_tokens=_total([c.completion_tokens for c in completions]),
+        cached_tokens=_total([c.cached_tokens for c in completions]),
+        samples=[c.content for c in completions],
+        truncated=next((c.truncated for c in completions if c.truncated), None),
+    )
+
+
+def merge_turns(completions: list[Completion]) -> Completion:
+    """Combine the completions of a conversation's turns, ending with the last reply."""
+    return Completion(
+        content=completions[-1].content,
+        prompt_tokens=_total([c.prompt_tokens for c in completions]),
+        completion_tokens=_total([c.completion_tokens for c in completions]),
+        cached_tokens=_total([c.cached_tokens for c in completions]),
+        truncated=next((c.truncated for c in completions if c.truncated), None),
+    )
+
+
+@dataclass(slots=True)
+class CaseResult:
+    """Outcome of sending one test case to a model."""
+
+    latency: float
+    completion: Completion | None = None
+    error: str | None = None
+    overloaded: bool = False
+    duplicate_of: str | None = None
+    dimensions: int | None = None
+    turns: list[TurnRecord] | None = None
+    unconstrained: "CaseResult | None" = None
+    score: asyncio.Future[Score] | None = None
+
+    @property
+    def output(self) -> str:
+        """Output text as written to reports."""
+        if self.error is not None:
+            return f"Error: {self.error}"
+        return self.completion.content if self.completion else ""
+
+
+def _output_chars(result: CaseResult) -> int:
+    """Characters of generated text a result holds, all samples and turns."""
+    chars = 0
+    if result.completion is not None:
+        chars += sum(len(output) for output in result.completion.outputs)
+    for turn in result.turns or []:
+        chars += len(turn.output)
+    if result.unconstrained is not None:
+        chars += _output_chars(result.unconstrained)
+    return chars
 
 
 @dataclass
@@ -30,6 +176,99 @@ class BlockSummary:
     total_cases: int
     completed_cases: int = 0
     failed_cases: int = 0
+    # Compact arrays, so summaries of large suites stay small
+    scores: array[float] = field(default_factory=lambda: array("d"))
+    latencies: array[float] = field(default_factory=lambda: array("d"))
+
+    def score_estimate(self) -> MeanEstimate | None:
+        """Mean score of the block's scored cases with a confidence interval."""
+        return estimate_mean(self.scores)
+
+
+@dataclass
+class EndpointStats:
+    """Throughput of the requests a model served through one endpoint."""
+
+    endpoint: EndpointKind
+    requests: int = 0
+    items: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    started: float | None = None
+    finished: float | None = None
+
+    def record(
+        self,
+        started: float,
+        items: int,
+        prompt_tokens: int | None = None,
+        completion_tokens: int | None = None,
+    ) -> None:
+        """
+        Record a finished request.
+
+        Args:
+            started: perf_counter() time the request was sent.
+            items: Number of cases (inputs) the request carried.
+            prompt_tokens: Prompt tokens reported by the server.
+            completion_tokens: Completion tokens reported by the server.
+        """
+        if self.started is None or started < self.started:
+            self.started = started
+        self.finished = time.perf_counter()
+        self.requests += 1
+        self.items += items
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+
+    @property
+    def seconds(self) -> float:
+        """Wall time from the first request sent to the last one finished."""
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    @property
+    def items_per_second(self) -> float | None:
+        """Cases served per second (vectors per second for embeddings)."""
+        return self.items / self.seconds if self.seconds > 0 else None
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Prompt tokens embedded, or completion tokens generated, per second."""
+        if self.seconds <= 0:
+            return None
+        tokens = (
+            self.prompt_tokens
+            if self.endpoint == "embeddings"
+            else self.completion_tokens
+        )
+        return tokens / self.seconds if tokens else None
+
+
+@dataclass
+class SchemaStats:
+    """Schema validity and latency of structured-output cases of one mode."""
+
+    cases: int = 0
+    valid: int = 0
+    latency_sum: float = 0.0
+
+    def add(self, valid: bool, latency: float) -> None:
+        """Count a validated output and the latency of its request."""
+        self.cases += 1
+        self.valid += valid
+        self.latency_sum += latency
+
+    @property
+    def validity_rate(self) -> float | None:
+        """Fraction of outputs satisfying the schema."""
+        return self.valid / self.cases if self.cases else None
+
+    @property
+    def mean_latency(self) -> float | None:
+        """Mean request latency in seconds."""
+        return self.latency_sum / self.cases if self.cases else None
 
 
 @dataclass
@@ -39,6 +278,85 @@ class ModelSummary:
     model: str
     blocks: list[BlockSummary] = field(default_factory=list)
     run_dir: Path | None = None
+    sample_results: Counter[tuple[int, int]] = field(default_factory=Counter)
+    truncated_cases: int = 0
+    deduplicated_cases: int = 0
+    concurrency_history: list[tuple[float, int]] = field(default_factory=list)
+    concurrency_backoffs: int = 0
+    warmup_latencies: list[float] = field(default_factory=list)
+    warmup_errors: list[str] = field(default_factory=list)
+    endpoints: dict[str, EndpointStats] = field(default_factory=dict)
+    turn_latency_sums: list[float] = field(default_factory=list)
+    turn_counts: list[int] = field(default_factory=list)
+    # Keyed by "constrained" (schema sent as response_format) or "free"
+    schema: dict[str, SchemaStats] = field(default_factory=dict)
+    scoring_seconds: float = 0.0
+
+    @property
+    def scored_cases(self) -> int:
+        """Number of cases with a score."""
+        return sum(len(b.scores) for b in self.blocks)
+
+    def score_estimate(self) -> MeanEstimate | None:
+        """Mean score over all blocks with a bootstrap confidence interval."""
+        scores: array[float] = array("d")
+        for block in self.blocks:
+            scores.extend(block.scores)
+        return estimate_mean(scores)
+
+    def latency_percentiles(
+        self, qs: tuple[float, ...] = (50, 90, 99)
+    ) -> list[float] | None:
+        """Latency percentiles of the successful cases, or None without any."""
+        latencies: array[float] = array("d")
+        for block in self.blocks:
+            latencies.extend(block.latencies)
+        return percentiles(latencies, qs) if latencies else None
+
+    @property
+    def mean_turn_latencies(self) -> list[float]:
+        """Mean latency of the n-th turn over all multi-turn cases, per turn."""
+        return [
+            total / count
+            for total, count in zip(self.turn_latency_sums, self.turn_counts)
+        ]
+
+    def add_turns(self, turns: list[TurnRecord]) -> None:
+        """Count the turn latencies of a finished multi-turn case."""
+        for position, turn in enumerate(turns):
+            if position == len(self.turn_counts):
+                self.turn_latency_sums.append(0.0)
+                self.turn_counts.append(0)
+            self.turn_latency_sums[position] += turn.latency_seconds
+            self.turn_counts[position] += 1
+
+    @property
+    def cold_start_seconds(self) -> float | None:
+        """
+        Estimated model load time, if the first warmup request was a cold start.
+
+        Needs at least two warmup requests: the first is compared against
+        the median of the rest.
+        """
+        if len(self.warmup_latencies) < 2:
+            return None
+        first, rest = self.warmup_latencies[0], self.warmup_latencies[1:]
+        steady: float = percentile(rest, 50)
+        if first <= steady * COLD_START_FACTOR:
+            return None
+        return first - steady
+
+    def pass_at_k(self, k: int) -> float | None:
+        """Mean pass@k over multi-sample cases with at least k samples."""
+        total = 0.0
+        cases = 0
+        for (n, c), count in self.sample_results.items():
+            if n >= k:
+                total += pass_at_k(n, c, k) * count
+                cases += count
+        if not cases:
+            return None
+        return total / cases
 
 
 @dataclass
@@ -66,6 +384,20 @@ class Executor:
         client: LlmClientProtocol,
         reporter: ReporterProtocol,
         console: Console | None = None,
+        metrics: RunMetrics | None = None,
+        tracer: Tracer | None = None,
+        batch_size: int = 1,
+        ordering: str = "dataset",
+        sampling: SamplingParams | None = None,
+        native_n: bool = False,
+        limits: OutputLimits | None = None,
+        concurrency: int | str = 1,
+        max_concurrency: int = 64,
+        warmup: int = 0,
+        progress: str = "auto",
+        dedup: bool = True,
+        response_format: bool = True,
+        scoring_workers: int | None = None,
     ) -> None:
         """
         Initialize the executor.
@@ -74,10 +406,70 @@ class Executor:
             client: LLM client for API calls.
             reporter: Report writer for results.
             console: Optional Rich console for output.
+            metrics: Optional live metrics registry updated per request.
+            tracer: Optional tracer recording per-phase timing spans.
+            batch_size: Number of cases sharing a system prompt sent per
+                request, and number of inputs per request for blocks using
+                the embeddings endpoint. Values above 1 require a client
+                implementing BatchLlmClientProtocol.
+            ordering: Dispatch order of cases within a model: "dataset" or
+                "prefix" (group cases sharing a prompt prefix for server-side
+                prefix caching). Reports keep dataset order either way.
+            sampling: Default sampling parameters; block-level values win.
+            native_n: Request multiple samples with the API's "n" parameter
+                instead of concurrent requests.
+            limits: Default output limits; block-level values win. Requests
+                still running shortly after max_seconds are abandoned and
+                recorded as timed out.
+            concurrency: Maximum in-flight requests per model, or "auto" to
+                adapt the limit to observed latency and overload responses.
+            max_concurrency: Upper bound of the adaptive limit.
+            warmup: Number of throwaway requests sent to each model before
+                its measured cases. Their timings are kept apart from the
+                run's entries and statistics.
+            progress: Progress display: "bar", "log" (status lines for
+                non-TTY output), "none", or "auto" to pick "bar" on a
+                terminal and "log" otherwise.
+            dedup: Send identical requests (same messages and settings) to
+                a model once per run and share the result across all
+                matching cases. Shared entries are marked with the case
+                whose request they reuse.
+            response_format: Send the output_schema of blocks as the
+                request's "response_format" so the server constrains
+                outputs to it. Outputs are validated against the schema
+                either way.
+            scoring_workers: Processes computing the scores of blocks with
+                a scorer, while requests are in flight; None starts one
+                per CPU, 0 scores on the event loop.
         """
         self.client = client
         self.reporter = reporter
         self.console = console or Console()
+        self.metrics = metrics
+        self.tracer = tracer or Tracer(enabled=False)
+        self.batch_size = batch_size
+        if ordering not in ORDERINGS:
+            raise ConfigError(
+                f"Unknown ordering '{ordering}'. Choose from: {', '.join(ORDERINGS)}"
+            )
+        self.ordering = ordering
+        self.sampling = sampling or SamplingParams()
+        self.native_n = native_n
+        self.limits = limits or OutputLimits()
+        # Validate the setting up front; each model gets a fresh limiter
+        create_limiter(concurrency, max_concurrency)
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.warmup = warmup
+        if progress not in PROGRESS_MODES:
+            raise ConfigError(
+                f"Unknown progress mode '{progress}'. "
+                f"Choose from: {', '.join(PROGRESS_MODES)}"
+            )
+        self.progress = progress
+        self.dedup = dedup
+        self.response_format = response_format
+        self.scoring_workers = scoring_workers
 
     def load_blocks(self, path: Path) -> list[EvaluationBlock]:
         """
@@ -102,9 +494,11 @@ class Executor:
     def _load_block_file(self, path: Path) -> list[EvaluationBlock]:
         """Load a single block file."""
         try:
-            content = path.read_text()
-            data = json.loads(content)
-            block = EvaluationBlock.model_validate(data)
+            with self.tracer.span("load_block", path=str(path)):
+                content = path.read_text()
+                data = json.loads(content)
+                block = EvaluationBlock.model_validate(data)
+                resolve_dataset_file(block, path)
             return [block]
         except json.JSONDecodeError as e:
             self.console.print(f"[yellow]Warning: Failed to parse {path}: {e}[/yellow]")
@@ -113,27 +507,26 @@ class Executor:
             self.console.print(f"[yellow]Warning: Failed to load {path}: {e}[/yellow]")
             return []
 
-    async def execute(
+    def select_blocks(
         self,
         blocks_dir: Path,
-        models: list[str],
         target_file: Path | None = None,
         target_id: str | None = None,
-    ) -> RunSummary:
+    ) -> tuple[list[EvaluationBlock], str]:
         """
-        Execute benchmark evaluations.
+        Load the blocks a run executes, after all filters.
 
         Args:
             blocks_dir: Directory containing benchmark files.
-            models: List of model names to evaluate.
             target_file: Optional specific file to run.
             target_id: Optional specific test case ID to run.
 
         Returns:
-            Summary of the run.
-        """
-        start_time = datetime.now(timezone.utc)
+            The selected blocks and the run category.
 
+        Raises:
+            ConfigError: If no block (or case with the target ID) is found.
+        """
         # Load blocks
         if target_file:
             blocks = self.load_blocks(target_file)
@@ -155,88 +548,163 @@ class Executor:
         if not blocks:
             raise ConfigError("No evaluation blocks found")
 
+        return blocks, category
+
+    async def execute(
+        self,
+        blocks_dir: Path,
+        models: list[str],
+        target_file: Path | None = None,
+        target_id: str | None = None,
+        only: Mapping[str, Collection[int]] | None = None,
+    ) -> RunSummary:
+        """
+        Execute benchmark evaluations.
+
+        Args:
+            blocks_dir: Directory containing benchmark files.
+            models: List of model names to evaluate.
+            target_file: Optional specific file to run.
+            target_id: Optional specific test case ID to run (instead of
+                `only`).
+            only: Optional indices of the cases to run, per block ID. Blocks
+                not listed are skipped; entries keep the cases' indices.
+
+        Returns:
+            Summary of the run.
+        """
+        blocks, category = self.select_blocks(blocks_dir, target_file)
+        if target_id:
+            # Run the case within its full block, so its entry records the
+            # case's dataset index that retries and watch mode look up
+            only = self._find_case(blocks, target_id)
+        return await self.execute_blocks(blocks, category, models, only)
+
+    async def execute_blocks(
+        self,
+        blocks: list[EvaluationBlock],
+        category: str | None,
+        models: list[str],
+        only: Mapping[str, Collection[int]] | None = None,
+    ) -> RunSummary:
+        """
+        Execute already selected evaluation blocks.
+
+        Args:
+            blocks: Blocks to run, in order.
+            category: Run category passed to the reporter.
+            models: List of model names to evaluate.
+            only: Optional indices of the cases to run, per block ID. Blocks
+                not listed are skipped; entries keep the cases' indices.
+
+        Returns:
+            Summary of the run.
+
+        Raises:
+            ConfigError: If no block is left to run.
+        """
+        start_time = datetime.now(timezone.utc)
+        if only is not None:
+            blocks = [b for b in blocks if b.metadata.id in only]
+        if not blocks:
+            raise ConfigError("No evaluation blocks found")
+
+        endpoints = {b.endpoint for b in blocks}
+        if self.batch_size > 1 and not isinstance(self.client, BatchLlmClientProtocol):
+            raise ConfigError("The configured LLM client does not support batching")
+        if "completions" in endpoints and not isinstance(
+            self.client, BatchLlmClientProtocol
+        ):
+            raise ConfigError(
+                "The configured LLM client does not support the completions endpoint"
+            )
+        if "embeddings" in endpoints and not isinstance(
+            self.client, EmbeddingLlmClientProtocol
+        ):
+            raise ConfigError("The configured LLM client does not support embeddings")
+
         block_ids = [b.metadata.id for b in blocks]
+        # Compiled once per block; also rejects unsupported schemas up front
+        validators = [
+            compile_schema(b.output_schema) if b.output_schema is not None else None
+            for b in blocks
+        ]
 
         # Calculate total cases
-        total_cases_per_model = sum(len(b.dataset) for b in blocks)
+        block_cases = [
+            len(only[b.metadata.id]) if only is not None else count_cases(b)
+            for b in blocks
+        ]
+        total_cases_per_model = sum(block_cases)
         total_cases = total_cases_per_model * len(models)
 
-        model_summaries = []
-        successful_cases = 0
-        failed_cases = 0
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(style="cyan"),
-            TaskProgressColumn(),
-            TimeElapsedColumn(),
-            console=self.console,
-        ) as progress:
-            overall_task = progress.add_task(
-                "[cyan]Running benchmarks...", total=total_cases
-            )
+        model_summaries: list[ModelSummary] = []
 
+        async with (
+            ScoringPool(self.scoring_workers) as scoring,
+            RunProgress(
+                self.console, total_cases, self.progress, tracer=self.tracer
+            ) as progress,
+        ):
             for model in models:
-                run_dir = await self.reporter.init_run(category, model, block_ids)
-                model_summary = ModelSummary(model=model, run_dir=run_dir)
+                warmup_latencies: list[float] = []
+                warmup_errors: list[str] = []
+                if self.warmup > 0:
+                    progress.set_description(f"Warming up {model}...")
+                    for _ in range(self.warmup):
+                        latency, error = await self._warmup_request(
+                            model, blocks[0].endpoint
+                        )
+                        warmup_latencies.append(latency)
+                        if error is not None:
+                            warmup_errors.append(error)
+                    progress.set_description(DEFAULT_DESCRIPTION)
+
+                with self.tracer.span("init_run", category="io", model=model):
+                    run_dir = await self.reporter.init_run(category, model, block_ids)
+                model_summary = ModelSummary(
+                    model=model,
+                    run_dir=run_dir,
+                    warmup_latencies=warmup_latencies,
+                    warmup_errors=warmup_errors,
+                )
 
-                for block in blocks:
-                    block_summary = BlockSummary(
-                        block_id=block.metadata.id,
-                        total_cases=len(block.dataset),
+                for block, cases in zip(blocks, block_cases):
+                    model_summary.blocks.append(
+                        BlockSummary(block_id=block.metadata.id, total_cases=cases)
                     )
 
-                    for idx, case in enumerate(block.dataset):
-                        # Build messages
-                        system_prompt = block.prompts.system
-                        if case.context:
-                            system_prompt += f"\n\nContext:\n{case.context}"
-
-                        messages = [
-                            Message(role="system", content=system_prompt),
-                            Message(role="user", content=case.input),
-                        ]
-
-                        # Call LLM
-                        try:
-                            output = await self.client.chat(model, messages)
-                            is_error = False
-                        except Exception as e:
-                            output = f"Error: {e}"
-                            is_error = True
-
-                        # Update counters
-                        if is_error:
-                            block_summary.failed_cases += 1
-                            failed_cases += 1
-                        else:
-                            block_summary.completed_cases += 1
-                            successful_cases += 1
-
-                        # Write entry
-                        entry = RunEntry(
-                            block_id=block.metadata.id,
-                            case_index=idx,
-                            input=case.input,
-                            output=output,
-                            model=model,
-                            expected=case.expected,
-                            context=case.context,
-                            criteria=case.criteria,
-                            grading_template=block.grading.template
-                            if block.grading
-                            else None,
+                try:
+                    await self._run_model(
+                        model,
+                        blocks,
+                        validators,
+                        run_dir,
+                        model_summary,
+                        progress.advance,
+                        scoring,
+                        only,
+                    )
+                except BaseException as error:
+                    # Also when interrupted, so the entries recorded so far
+                    # are written out and the reports completed. A reporter
+                    # failing too must not hide the original error.
+                    try:
+                        await self._finalize_run(model, run_dir)
+                    except Exception as finalize_error:
+                        error.add_note(
+                            f"Finalizing the run also failed: {finalize_error!r}"
                         )
-                        await self.reporter.write_entry(run_dir, entry)
-
-                        progress.update(overall_task, advance=1)
-
-                    model_summary.blocks.append(block_summary)
+                    raise
+                await self._finalize_run(model, run_dir)
                 model_summaries.append(model_summary)
 
         end_time = datetime.now(timezone.utc)
 
+        all_blocks = [b for m in model_summaries for b in m.blocks]
+        successful_cases = sum(b.completed_cases for b in all_blocks)
+        failed_cases = sum(b.failed_cases for b in all_blocks)
+
         return RunSummary(
             start_time=start_time,
             end_time=end_time,
@@ -246,25 +714,705 @@ class Executor:
             failed_cases=failed_cases,
         )
 
+    async def _finalize_run(self, model: str, run_dir: Path) -> None:
+        """Finalize a model's run with the reporter."""
+        with self.tracer.span("finalize_run", category="io", model=model):
+            await self.reporter.finalize_run(run_dir)
+
+    async def _warmup_request(
+        self, model: str, endpoint: EndpointKind = "chat"
+    ) -> tuple[float, str | None]:
+        """
+        Send one throwaway request generating a single token.
+
+        Warmup requests bypass metrics and are never reported as entries.
+
+        Args:
+            model: Model to warm up.
+            endpoint: Endpoint of the model's first block; embedding models
+                are warmed up with a one-input embeddings request.
+
+        Returns:
+            Latency in seconds and the error message, if the request failed.
+        """
+        sampling = self.sampling.merge(SamplingParams(max_tokens=1))
+        started = time.perf_counter()
+        error: str | None = None
+        try:
+            with self.tracer.span("warmup", category="http", model=model):
+                if endpoint == "embeddings" and isinstance(
+                    self.client, EmbeddingLlmClientProtocol
+                ):
+                    await self.client.embed(model, [WARMUP_INPUT])
+                elif endpoint == "completions" and isinstance(
+                    self.client, BatchLlmClientProtocol
+                ):
+                    await self.client.complete_batch(model, [WARMUP_MESSAGES], sampling)
+                else:
+                    await self.client.complete(model, WARMUP_MESSAGES, sampling)
+        except Exception as e:
+            error = str(e)
+        return time.perf_counter() - started, error
+
+    def _build_messages(self, block: EvaluationBlock, case: TestCase) -> list[Message]:
+        """Build the chat messages for a test case."""
+        with self.tracer.span("build_messages"):
+            return [
+                system_message(block.prompts.system, case.context),
+                Message(role="user", content=case.input),
+            ]
+
+    @staticmethod
+    def _deadline(limits: OutputLimits | None) -> float | None:
+        """Seconds after which a request is abandoned, if limited."""
+        if limits is None or limits.max_seconds is None:
+            return None
+        deadline: float = limits.max_seconds + DEADLINE_GRACE_SECONDS
+        return deadline
+
+    async def _call(
+        self,
+        model: str,
+        item: WorkItem,
+        n: int = 1,
+        messages: list[Message] | None = None,
+    ) -> CaseResult:
+        """Issue one client request with metrics and tracing."""
+        if self.metrics:
+            self.metrics.request_started(model)
+        started = time.perf_counter()
+        completion: Completion | None = None
+        error: str | None = None
+        overloaded = False
+        try:
+            with self.tracer.span(
+                "client.chat",
+                category="http",
+                model=model,
+                block_id=item.block.metadata.id,
+                case_index=item.case_index,
+            ):
+                async with asyncio.timeout(self._deadline(item.limits)):
+                    completion = await self.client.complete(
+                        model,
+                        messages or item.messages,
+                        item.sampling,
+                        n,
+                        item.limits,
+                        item.response_format,
+                    )
+        except TimeoutError:
+            error = f"Timed out after {self._deadline(item.limits):g}s"
+            overloaded = True
+        except NetworkError as e:
+            error = str(e)
+            overloaded = e.overloaded
+        except Exception as e:
+            error = str(e)
+        latency = time.perf_counter() - started
+        if self.metrics:
+            self.metrics.request_finished(model, latency, completion)
+        return CaseResult(
+            latency=latency, completion=completion, error=error, overloaded=overloaded
+        )
+
+    async def _send(self, model: str, item: WorkItem) -> CaseResult:
+        """
+        Send a case to the model, capturing errors and latency.
+
+        Multi-sample cases use the API's "n" parameter when the endpoint
+        supports it, and otherwise issue concurrent requests whose outputs
+        are merged into one completion. Blocks comparing constrained and
+        free decoding send each case twice concurrently, with and without
+        the response format.
+        """
+        if item.case.turns:
+            return await self._send_turns(model, item)
+        k = item.samples
+        if k == 1 and item.response_format is not None:
+            if not item.block.compare_unconstrained:
+                return await self._call(model, item)
+            result, free = await asyncio.gather(
+                self._call(model, item),
+                self._call(model, dataclasses.replace(item, response_format=None)),
+            )
+            result.unconstrained = free
+            return result
+        if k == 1 or self.native_n:
+            return await self._call(model, item, k)
+
+        started = time.perf_counter()
+        calls = await asyncio.gather(*(self._call(model, item) for _ in range(k)))
+        errors = [c.error for c in calls if c.error is not None]
+        completions = [c.completion for c in calls if c.completion is not None]
+        return CaseResult(
+            latency=time.perf_counter() - started,
+            completion=merge_samples(completions) if not errors else None,
+            error=errors[0] if errors else None,
+            overloaded=any(c.overloaded for c in calls),
+        )
+
+    async def _send_turns(self, model: str, item: WorkItem) -> CaseResult:
+        """
+        Play a scripted conversation, one request per user turn.
+
+        Each request repeats the previous one plus the model's reply and
+        the next user message, so servers with prefix caching only process
+        the new messages. Turns are sent back to back while the case keeps
+        its slot, before other requests can evict the cached conversation.
+        The conversation stops at the first failed turn.
+        """
+        messages = list(item.messages)
+        turns: list[TurnRecord] = []
+        completions: list[Completion] = []
+        for position, text in enumerate([item.case.input, *(item.case.turns or [])]):
+            if position > 0:
+                messages = [
+                    *messages,
+                    Message(role="assistant", content=completions[-1].content),
+                    Message(role="user", content=text),
+                ]
+            result = await self._call(model, item, messages=messages)
+            if result.completion is None:
+                return CaseResult(
+                    latency=sum(t.latency_seconds for t in turns) + result.latency,
+                    error=f"Turn {position + 1}: {result.error}",
+                    overloaded=result.overloaded,
+                    turns=turns,
+                )
+            completions.append(result.completion)
+            turns.append(
+                TurnRecord(
+                    input=text,
+                    output=result.completion.content,
+                    latency_seconds=result.latency,
+                )
+            )
+        return CaseResult(
+            latency=sum(t.latency_seconds for t in turns),
+            completion=merge_turns(completions),
+            turns=turns,
+        )
+
+    async def _send_batch(
+        self, model: str, items: list[WorkItem], stats: EndpointStats
+    ) -> list[CaseResult]:
+        """
+        Send several cases sharing a system prompt in a single request.
+
+        The server reports token usage per request, so it is recorded in
+        the endpoint stats and metrics rather than on each case.
+        """
+        if not isinstance(self.client, BatchLlmClientProtocol):
+            raise ConfigError("The configured LLM client does not support batching")
+
+        conversations = [item.messages for item in items]
+        if self.metrics:
+            for _ in conversations:
+                self.metrics.request_started(model)
+        started = time.perf_counter()
+        batch: CompletionBatch | None = None
+        error: str | None = None
+        overloaded = False
+        try:
+            with self.tracer.span(
+                "client.complete_batch",
+                category="http",
+                model=model,
+                block_id=items[0].block.metadata.id,
+                size=len(conversations),
+            ):
+                async with asyncio.timeout(self._deadline(items[0].limits)):
+                    batch = await self.client.complete_batch(
+                        model, conversations, items[0].sampling, items[0].limits
+                    )
+            if len(batch.completions) != len(conversations):
+                raise ConfigError(
+                    f"Batch returned {len(batch.completions)} results "
+                    f"for {len(conversations)} prompts"
+                )
+        except TimeoutError:
+            batch = None
+            error = f"Timed out after {self._deadline(items[0].limits):g}s"
+            overloaded = True
+        except NetworkError as e:
+            batch = None
+            error = str(e)
+            overloaded = e.overloaded
+        except Exception as e:
+            batch = None
+            error = str(e)
+        latency = time.perf_counter() - started
+
+        if batch is not None:
+            # Usage may come per completion or, from servers, per batch
+            stats.record(
+                started,
+                len(conversations),
+                sum(c.prompt_tokens or 0 for c in batch.completions)
+                + (batch.prompt_tokens or 0),
+                sum(c.completion_tokens or 0 for c in batch.completions)
+                + (batch.completion_tokens or 0),
+            )
+            if self.metrics:
+                self.metrics.batch_usage(
+                    model, batch.prompt_tokens, batch.completion_tokens
+                )
+
+        results = []
+        for i in range(len(conversations)):
+            completion = batch.completions[i] if batch is not None else None
+            if self.metrics:
+                self.metrics.request_finished(model, latency, completion)
+            results.append(
+                CaseResult(
+                    latency=latency,
+                    completion=completion,
+                    error=error,
+                    overloaded=overloaded,
+                )
+            )
+        return results
+
+    async def _send_embeddings(
+        self, model: str, items: list[WorkItem], stats: EndpointStats
+    ) -> list[CaseResult]:
+        """
+        Embed the inputs of several cases in a single request.
+
+        The server reports token usage per request, so it is recorded in
+        the endpoint stats and metrics rather than on each case.
+        """
+        if not isinstance(self.client, EmbeddingLlmClientProtocol):
+            raise ConfigError("The configured LLM client does not support embeddings")
+
+        inputs = [item.case.input for item in items]
+        if self.metrics:
+            for _ in inputs:
+                self.metrics.request_started(model)
+        started = time.perf_counter()
+        embeddings: Embeddings | None = None
+        error: str | None = None
+        overloaded = False
+        try:
+            with self.tracer.span(
+                "client.embed",
+                category="http",
+                model=model,
+                block_id=items[0].block.metadata.id,
+                size=len(inputs),
+            ):
+                embeddings = await self.client.embed(model, inputs)
+            if len(embeddings.vectors) != len(inputs):
+                raise ConfigError(
+                    f"Embeddings request returned {len(embeddings.vectors)} vectors "
+                    f"for {len(inputs)} inputs"
+                )
+        except NetworkError as e:
+            embeddings = None
+            error = str(e)
+            overloaded = e.overloaded
+        except Exception as e:
+            embeddings = None
+            error = str(e)
+        latency = time.perf_counter() - started
+
+        if embeddings is not None:
+            stats.record(started, len(inputs), prompt_tokens=embeddings.prompt_tokens)
+            if self.metrics:
+                self.metrics.vectors_embedded(
+                    model, len(embeddings.vectors), embeddings.prompt_tokens
+                )
+
+        results = []
+        for i in range(len(inputs)):
+            completion = Completion(content="") if embeddings is not None else None
+            if self.metrics:
+                self.metrics.request_finished(model, latency, completion)
+            results.append(
+                CaseResult(
+                    latency=latency,
+                    completion=completion,
+                    error=error,
+                    overloaded=overloaded,
+                    dimensions=len(embeddings.vectors[i]) if embeddings else None,
+                )
+            )
+        return results
+
+    async def _run_model(
+        self,
+        model: str,
+        blocks: list[EvaluationBlock],
+        validators: list[Validator | None],
+        run_dir: Path,
+        model_summary: ModelSummary,
+        advance: Callable[[int], None],
+        scoring: ScoringPool,
+        only: Mapping[str, Collection[int]] | None = None,
+    ) -> None:
+        """
+        Run every (selected) case of every block against one model.
+
+        Runs as a streaming pipeline: cases are loaded lazily, dispatched
+        in the configured order (and batched when enabled) with up to the
+        limiter's number of units in flight, and written in dataset order
+        by a single writer behind a bounded queue. Outputs of blocks with
+        a scorer are submitted to the scoring pool as soon as they arrive,
+        so scoring overlaps with the requests still in flight. Each stage
+        only runs ahead of the next by a bounded amount, so memory use
+        does not grow with the suite size.
+        """
+        block_sampling = [self.sampling.merge(block.sampling) for block in blocks]
+        block_limits = [self.limits.merge(block.limits) for block in blocks]
+        limiter = create_limiter(self.concurrency, self.max_concurrency)
+        finished: asyncio.Queue[tuple[list[WorkItem], list[CaseResult]] | None] = (
+            asyncio.Queue(QUEUE_SIZE)
+        )
+        buffer: ReorderBuffer[tuple[WorkItem, CaseResult]] = ReorderBuffer()
+        window_moved = asyncio.Event()
+        shared: SharedRequests[CaseResult] | None = (
+            SharedRequests(weigh=_output_chars) if self.dedup else None
+        )
+        originals: dict[int, asyncio.Future[CaseResult]] = {}
+        digests = [block_digest(block) for block in blocks]
+        block_formats = [
+            response_format(block.output_schema, block.metadata.id)
+            if block.output_schema is not None and self.response_format
+            else None
+            for block in blocks
+        ]
+        block_settings = [
+            f"{block.endpoint}\0{sampling.model_dump_json()}\0"
+            f"{limits.model_dump_json()}\0{json.dumps(fmt)}\0"
+            f"{block.compare_unconstrained}"
+            for block, sampling, limits, fmt in zip(
+                blocks, block_sampling, block_limits, block_formats
+            )
+        ]
+
+        def work_items() -> Iterator[WorkItem]:
+            seq = itertools.count()
+            for block_pos, block in enumerate(blocks):
+                selected = only[block.metadata.id] if only is not None else None
+                for idx, case in enumerate(iter_cases(block)):
+                    if selected is not None and idx not in selected:
+                        continue
+                    yield WorkItem(
+                        seq=next(seq),
+                        block=block,
+                        block_pos=block_pos,
+                        case_index=idx,
+                        case=case,
+                        messages=self._build_messages(block, case),
+                        sampling=block_sampling[block_pos],
+                        limits=block_limits[block_pos],
+                        response_format=block_formats[block_pos],
+                    )
+
+        async def send(unit: list[WorkItem]) -> None:
+            endpoint = unit[0].block.endpoint
+            stats = model_summary.endpoints.get(endpoint)
+            if stats is None:
+                stats = model_summary.endpoints[endpoint] = EndpointStats(endpoint)
+            started = time.perf_counter()
+            if endpoint == "embeddings":
+                results = await self._send_embeddings(model, unit, stats)
+            elif endpoint == "completions" or (
+                self.batch_size > 1 and unit[0].batchable
+            ):
+                results = await self._send_batch(model, unit, stats)
+            else:
+                results = [await self._send(model, unit[0])]
+                completion = results[0].completion
+                if completion:
+                    stats.record(
+                        started,
+                        1,
+                        completion.prompt_tokens,
+                        completion.completion_tokens,
+                    )
+            for item, result in zip(unit, results):
+                scorer = item.block.scorer
+                expected = item.case.expected
+                if scorer and expected is not None and result.completion:
+                    result.score = scoring.submit(
+                        scorer, result.completion.content, expected
+                    )
+                original = originals.pop(item.seq, None)
+                if original is not None:
+                    original.set_result(result)
+            # The slot is held until the writer accepts the results, so a
+            # slow reporter throttles dispatch
+            await finished.put((unit, results))
+            await limiter.release(
+                max(r.latency for r in results), any(r.overloaded for r in results)
+            )
+
+        async def follow(
+            item: WorkItem, ref: str, original: asyncio.Future[CaseResult]
+        ) -> None:
+            result = dataclasses.replace(await original, duplicate_of=ref)
+            await finished.put(([item], [result]))
+
+        def unique(unit: list[WorkItem], senders: asyncio.TaskGroup) -> list[WorkItem]:
+            # Keep the items that must be sent; the others follow an
+            # identical request sent earlier
+            if shared is None:
+                return unit
+            to_send = []
+            for item in unit:
+                key = request_key(
+                    [
+                        *item.messages,
+                        *(Message("user", t) for t in item.case.turns or []),
+                    ],
+                    f"{item.samples}\0{block_settings[item.block_pos]}",
+                )
+                found = shared.lookup(key)
+                if found is None:
+                    case = case_key(item.case.id, item.case_index)
+                    ref = f"{item.block.metadata.id}/{case}"
+                    originals[item.seq] = shared.register(key, ref)
+                    to_send.append(item)
+                else:
+                    senders.create_task(follow(item, *found))
+            return to_send
+
+        async def write() -> None:
+            while (done := await finished.get()) is not None:
+                unit, results = done
+                for item, result in zip(unit, results):
+                    for ready_item, ready_result in buffer.add(
+                        item.seq, (item, result)
+                    ):
+                        await self._record(
+                            model,
+                            ready_item,
+                            validators[ready_item.block_pos],
+                            digests[ready_item.block_pos],
+                            run_dir,
+                            model_summary,
+                            ready_result,
+                        )
+                advance(len(unit))
+                window_moved.set()
+
+        def within_window(unit: list[WorkItem]) -> bool:
+            distance: int = unit[0].seq - buffer.next_seq
+            return distance < REORDER_WINDOW
+
+        async with asyncio.TaskGroup() as group:
+            writer = group.create_task(write())
+            async with asyncio.TaskGroup() as senders:
+                # Cases are read and planned lazily, only as fast as slots
+                # free up, so loading never runs ahead of dispatch
+                for unit in dispatch_units(
+                    work_items(), self.batch_size, self.ordering
+                ):
+                    # Results wait in the reorder buffer until all earlier
+                    # cases finish; stop dispatching too far ahead of them
+                    while not within_window(unit):
+                        window_moved.clear()
+                        await window_moved.wait()
+                    # Duplicates of earlier requests wait for their result
+                    # without taking a slot
+                    unit = unique(unit, senders)
+                    if not unit:
+                        continue
+                    await limiter.acquire()
+                    senders.create_task(send(unit))
+            await finished.put(None)
+            await writer
+
+        model_summary.concurrency_history = limiter.history
+        model_summary.concurrency_backoffs = limiter.backoffs
+        if shared is not None:
+            model_summary.deduplicated_cases = shared.shared
+
+    async def _record(
+        self,
+        model: str,
+        item: WorkItem,
+        validator: Validator | None,
+        digest: bytes,
+        run_dir: Path,
+        model_summary: ModelSummary,
+        result: CaseResult,
+    ) -> None:
+        """Count a finished case, validate its output and write its entry."""
+        block_summary = model_summary.blocks[item.block_pos]
+        # Shared results count their request once, for the original case
+        shared = result.duplicate_of is not None
+        if result.error is not None:
+            block_summary.failed_cases += 1
+        else:
+            block_summary.completed_cases += 1
+            if not shared:
+                block_summary.latencies.append(result.latency)
+
+        case = item.case
+        completion = result.completion
+        if completion is not None and completion.truncated is not None:
+            model_summary.truncated_cases += 1
+        if result.turns and not shared:
+            model_summary.add_turns(result.turns)
+
+        samples: list[str] | None = None
+        passed: int | None = None
+        if completion is not None and item.samples > 1:
+            samples = completion.outputs
+            if case.expected is not None:
+                block = item.block
+                passed = passing_samples(
+                    samples, case.expected, block.scorer, block.pass_threshold
+                )
+            if passed is not None:
+                model_summary.sample_results[len(samples), passed] += 1
+        schema_valid: bool | None = None
+        schema_error: str | None = None
+        unconstrained: UnconstrainedRun | None = None
+        if validator is not None and completion is not None:
+            with self.tracer.span("validate_output"):
+                schema_error = validate_output(validator, completion.content)
+            schema_valid = schema_error is None
+            mode = "constrained" if item.response_format is not None else "free"
+            stats = model_summary.schema.setdefault(mode, SchemaStats())
+            stats.add(schema_valid, result.latency)
+        free = result.unconstrained
+        if validator is not None and free is not None:
+            free_valid: bool | None = None
+            if free.completion is not None:
+                free_valid = validate_output(validator, free.completion.content) is None
+                stats = model_summary.schema.setdefault("free", SchemaStats())
+                stats.add(free_valid, free.latency)
+            unconstrained = UnconstrainedRun(
+                output=free.output,
+                latency_seconds=free.latency,
+                error=free.error,
+                schema_valid=free_valid,
+            )
+        score: float | None = None
+        if result.score is not None:
+            with self.tracer.span("await_score"):
+                score, seconds = await result.score
+            if not shared:
+                model_summary.scoring_seconds += seconds
+            if score is not None:
+                block_summary.scores.append(score)
+        with self.tracer.span("build_entry"):
+            entry = self._build_entry(
+                model,
+                item,
+                result,
+                case_hash(digest, case),
+                samples,
+                passed,
+                schema_valid,
+                schema_error,
+                unconstrained,
+                score,
+            )
+        with self.tracer.span("write_entry", category="io"):
+            await self.reporter.write_entry(run_dir, entry)
+
+    def _build_entry(
+        self,
+        model: str,
+        item: WorkItem,
+        result: CaseResult,
+        content_hash: str | None = None,
+        samples: list[str] | None = None,
+        passed: int | None = None,
+        schema_valid: bool | None = None,
+        schema_error: str | None = None,
+        unconstrained: UnconstrainedRun | None = None,
+        score: float | None = None,
+    ) -> RunEntry:
+        """Build the report entry of a finished case."""
+        block = item.block
+        case = item.case
+        completion = result.completion
+        # Request latency and usage stay with the case that sent the request,
+        # so aggregates over entries count every request once
+        usage = completion if completion and result.duplicate_of is None else None
+        return RunEntry(
+            block_id=block.metadata.id,
+            case_index=item.case_index,
+            case_id=case.id,
+            case_hash=content_hash,
+            input=case.input,
+            output=result.output,
+            model=model,
+            expected=case.expected,
+            context=case.context,
+            criteria=case.criteria,
+            grading_template=block.grading.template if block.grading else None,
+            error=result.error,
+            score=score,
+            latency_seconds=result.latency if result.duplicate_of is None else None,
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            samples=samples,
+            passed_samples=passed,
+            truncated=completion.truncated if completion else None,
+            turns=result.turns,
+            constrained=(
+                item.response_format is not None if schema_valid is not None else None
+            ),
+            schema_valid=schema_valid,
+            schema_error=schema_error,
+            unconstrained=unconstrained,
+            endpoint=block.endpoint,
+            dimensions=result.dimensions,
+            duplicate_of=result.duplicate_of,
+        )
+
     def _filter_by_id(
         self, blocks: list[EvaluationBlock], target_id: str
     ) -> list[EvaluationBlock]:
         """Filter blocks to only include cases with the target ID."""
-        filtered_blocks = []
+        found = self._find_case(blocks, target_id)
+        return [
+            # A copy with only the matching case
+            block.model_copy(
+                update={
+                    "dataset": [
+                        case
+                        for idx, case in enumerate(iter_cases(block))
+                        if idx in found[block.metadata.id]
+                    ],
+                    "dataset_file": None,
+                }
+            )
+            for block in blocks
+            if block.metadata.id in found
+        ]
+
+    def _find_case(
+        self, blocks: list[EvaluationBlock], target_id: str
+    ) -> dict[str, set[int]]:
+        """
+        Locate the case with the target ID.
+
+        Returns:
+            Dataset index of the case, by block ID (the `only` selection).
+
+        Raises:
+            ConfigError: If no case or more than one case has the ID.
+        """
+        found: dict[str, set[int]] = {}
         total_matches = 0
 
         for block in blocks:
-            matching_cases = [c for c in block.dataset if c.id == target_id]
-            if matching_cases:
-                total_matches += len(matching_cases)
-                # Create a copy with only matching cases
-                filtered_block = EvaluationBlock(
-                    metadata=block.metadata,
-                    prompts=block.prompts,
-                    grading=block.grading,
-                    dataset=matching_cases,
-                )
-                filtered_blocks.append(filtered_block)
+            indices = {
+                idx
+                for idx, case in enumerate(iter_cases(block))
+                if case.id == target_id
+            }
+            if indices:
+                total_matches += len(indices)
+                found.setdefault(block.metadata.id, set()).update(indices)
 
         if total_matches == 0:
             raise ConfigError(f"No test case found with ID: {target_id}")
@@ -273,4 +1421,4 @@ class Executor:
                 f"Multiple test cases found with ID: {target_id}. IDs must be unique."
             )
 
-        return filtered_blocks
+        return found
@@ -0,0 +1,428 @@
+"""Append-only SQLite store of run entries and per-run summary metrics."""
+
+import asyncio
+import sqlite3
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from tls.models.report import RunEntry, case_key
+from tls.protocols.reporter import ReporterProtocol
+from tls.services.reporter import read_entries, read_manifest
+from tls.services.statistics import percentiles
+
+HISTORY_FILENAME = "history.sqlite3"
+
+# Rows are inserted in batches to keep per-entry overhead low
+_FLUSH_EVERY = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    category TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    total_cases INTEGER,
+    failed_cases INTEGER,
+    success_rate REAL,
+    mean_score REAL,
+    mean_latency REAL,
+    p50_latency REAL,
+    p90_latency REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    tokens_per_second REAL
+);
+CREATE INDEX IF NOT EXISTS runs_model_started ON runs (model, started_at);
+CREATE TABLE IF NOT EXISTS entries (
+    run_id TEXT NOT NULL,
+    block_id TEXT NOT NULL,
+    case_key TEXT NOT NULL,
+    failed INTEGER NOT NULL,
+    score REAL,
+    latency REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS entries_run_block ON entries (run_id, block_id);
+"""
+
+_EntryRow = tuple[
+    str, str, str, int, float | None, float | None, int | None, int | None
+]
+
+
+@dataclass
+class RunStats:
+    """Summary metrics of one run (or one block within a run)."""
+
+    run_id: str
+    model: str
+    started_at: str
+    total_cases: int
+    failed_cases: int
+    success_rate: float | None
+    mean_score: float | None
+    mean_latency: float | None
+    p50_latency: float | None
+    p90_latency: float | None
+    tokens_per_second: float | None
+
+
+@dataclass
+class Throughput:
+    """Aggregate throughput of a model over recent finished runs."""
+
+    runs: int
+    cases: int
+    seconds: float
+    prompt_tokens: int
+    completion_tokens: int
+
+    @property
+    def cases_per_second(self) -> float | None:
+        """Cases finished per second of run wall time."""
+        return self.cases / self.seconds if self.seconds > 0 else None
+
+    @property
+    def completion_tokens_per_case(self) -> float:
+        """Mean completion tokens generated per case."""
+        return self.completion_tokens / self.cases if self.cases else 0.0
+
+
+def _summarize(
+    rows: list[tuple[int, float | None, float | None, int | None, int | None]],
+) -> dict[str, float | int | None]:
+    """Compute summary metrics from (failed, score, latency, prompt, completion)."""
+    total = len(rows)
+    failed = sum(r[0] for r in rows)
+    scores = [r[1] for r in rows if r[1] is not None]
+    latencies = [r[2] for r in rows if r[2] is not None and not r[0]]
+    prompt_tokens = sum(r[3] or 0 for r in rows)
+    completion_tokens = sum(r[4] or 0 for r in rows)
+    latency_total = sum(latencies)
+    p50, p90 = percentiles(latencies, (50, 90)) if latencies else (None, None)
+    return {
+        "total_cases": total,
+        "failed_cases": failed,
+        "success_rate": (total - failed) / total if total else None,
+        "mean_score": sum(scores) / len(scores) if scores else None,
+        "mean_latency": latency_total / len(latencies) if latencies else None,
+        "p50_latency": p50,
+        "p90_latency": p90,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "tokens_per_second": completion_tokens / latency_total
+        if latency_total > 0
+        else None,
+    }
+
+
+class HistoryStore:
+    """SQLite-backed history of all runs in a project.
+
+    Entries are appended as compact rows and each run gets a precomputed
+    summary row when it finishes, so queries over hundreds of runs only
+    touch the small runs table. Writes may run in worker threads (see
+    HistoryReporter); they are serialized by a lock.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Open (and create if needed) the history database.
+
+        Args:
+            path: Path to the SQLite database file.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        self._pending: list[_EntryRow] = []
+
+    @property
+    def pending(self) -> int:
+        """Number of queued entry rows."""
+        return len(self._pending)
+
+    def close(self) -> None:
+        """Flush pending rows and close the database."""
+        self.flush()
+        self._conn.close()
+
+    def start_run(
+        self, run_id: str, model: str, category: str | None, started_at: datetime
+    ) -> None:
+        """Register a new run."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, model, category, started_at) "
+                "VALUES (?, ?, ?, ?)",
+                (run_id, model, category, started_at.isoformat()),
+            )
+
+    def add_entry(self, run_id: str, entry: RunEntry, flush: bool = True) -> None:
+        """
+        Queue an entry row; rows are written in batches.
+
+        Args:
+            run_id: Run identifier.
+            entry: Entry to record.
+            flush: Write the queued rows once a batch is full. Callers that
+                flush off the event loop pass False and check `pending`.
+        """
+        self._pending.append(
+            (
+                run_id,
+                entry.block_id,
+                case_key(entry.case_id, entry.case_index),
+                1 if entry.error is not None else 0,
+                entry.score,
+                entry.latency_seconds,
+                entry.prompt_tokens,
+                entry.completion_tokens,
+            )
+        )
+        if flush and len(self._pending) >= _FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write queued entry rows."""
+        with self._lock:
+            # Rows queued while this batch is written go to the next one
+            rows, self._pending = self._pending, []
+            if not rows:
+                return
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+
+    def replace_run(
+        self,
+        run_id: str,
+        model: str,
+        category: str | None,
+        started_at: datetime,
+        finished_at: datetime | None,
+        entries: Iterable[RunEntry],
+    ) -> None:
+        """
+        Replace the entries of a run and recompute its summary.
+
+        Used for runs updated in place (watch mode, retries), so their
+        history reflects the run's current entries rather than the ones
+        first recorded. The run is registered if it is not known yet.
+
+        Args:
+            run_id: Run identifier (the run directory).
+            model: Model of the run.
+            category: Run category.
+            started_at: Start time of the run.
+            finished_at: Original finish time, kept so throughput stays
+                based on the run's own wall time; None uses the current time.
+            entries: All current entries of the run.
+        """
+        with self._lock:
+            self.flush()
+            with self._conn:
+                self._conn.execute("DELETE FROM entries WHERE run_id = ?", (run_id,))
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO runs (run_id, model, category, started_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (run_id, model, category, started_at.isoformat()),
+                )
+            for entry in entries:
+                self.add_entry(run_id, entry)
+            self.finish_run(run_id, finished_at)
+
+    def finish_run(self, run_id: str, finished_at: datetime | None = None) -> None:
+        """Compute and store the summary metrics of a finished run."""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                "SELECT failed, score, latency, prompt_tokens, completion_tokens "
+                "FROM entries WHERE run_id = ?",
+                (run_id,),
+            ).fetchall()
+            summary = _summarize(rows)
+            assignments = ", ".join(f"{column} = ?" for column in summary)
+            with self._conn:
+                self._conn.execute(
+                    f"UPDATE runs SET finished_at = ?, {assignments} WHERE run_id = ?",
+                    (
+                        (finished_at or datetime.now(timezone.utc)).isoformat(),
+                        *summary.values(),
+                        run_id,
+                    ),
+                )
+
+    def throughput(self, model: str, runs: int = 5) -> Throughput | None:
+        """
+        Aggregate throughput of a model's most recent finished runs.
+
+        Args:
+            model: Model name.
+            runs: Number of most recent runs to aggregate.
+
+        Returns:
+            Cases, wall time and token volume summed over the runs, or None
+            if the model has no finished run with cases.
+        """
+        rows = self._conn.execute(
+            "SELECT started_at, finished_at, total_cases, prompt_tokens, "
+            "completion_tokens FROM runs WHERE model = ? AND finished_at IS NOT NULL "
+            "AND total_cases > 0 ORDER BY started_at DESC LIMIT ?",
+            (model, runs),
+        ).fetchall()
+        if not rows:
+            return None
+        seconds = sum(
+            (
+                datetime.fromisoformat(finished) - datetime.fromisoformat(started)
+            ).total_seconds()
+            for started, finished, *_ in rows
+        )
+        return Throughput(
+            runs=len(rows),
+            cases=sum(row[2] for row in rows),
+            seconds=seconds,
+            prompt_tokens=sum(row[3] or 0 for row in rows),
+            completion_tokens=sum(row[4] or 0 for row in rows),
+        )
+
+    def query_runs(
+        self,
+        model: str | None = None,
+        block_id: str | None = None,
+        limit: int | None = None,
+    ) -> list[RunStats]:
+        """
+        Return summary metrics of finished runs, oldest first.
+
+        Args:
+            model: Only include runs of this model.
+            block_id: Restrict metrics to a single block (computed from entries).
+            limit: Only include the most recent N runs.
+
+        Returns:
+            Per-run summary metrics.
+        """
+        sql = (
+            "SELECT run_id, model, started_at, total_cases, failed_cases, "
+            "success_rate, mean_score, mean_latency, p50_latency, p90_latency, "
+            "tokens_per_second FROM runs WHERE finished_at IS NOT NULL"
+        )
+        params: list[str | int] = []
+        if model is not None:
+            sql += " AND model = ?"
+            params.append(model)
+        sql += " ORDER BY started_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        runs = [RunStats(*row) for row in self._conn.execute(sql, params)]
+        runs.reverse()
+
+        if block_id is None:
+            return runs
+
+        block_runs = []
+        for run in runs:
+            rows = self._conn.execute(
+                "SELECT failed, score, latency, prompt_tokens, completion_tokens "
+                "FROM entries WHERE run_id = ? AND block_id = ?",
+                (run.run_id, block_id),
+            ).fetchall()
+            if not rows:
+                continue
+            summary = _summarize(rows)
+            block_runs.append(
+                RunStats(
+                    run_id=run.run_id,
+                    model=run.model,
+                    started_at=run.started_at,
+                    total_cases=len(rows),
+                    failed_cases=int(summary["failed_cases"] or 0),
+                    success_rate=summary["success_rate"],
+                    mean_score=summary["mean_score"],
+                    mean_latency=summary["mean_latency"],
+                    p50_latency=summary["p50_latency"],
+                    p90_latency=summary["p90_latency"],
+                    tokens_per_second=summary["tokens_per_second"],
+                )
+            )
+        return block_runs
+
+
+def record_updated_run(store: HistoryStore, run_dir: Path) -> None:
+    """
+    Replace the history of a run with the entries of its run directory.
+
+    Args:
+        store: History store.
+        run_dir: Run directory updated in place.
+    """
+    manifest = read_manifest(run_dir)
+    finished_at = manifest.get("finished_at")
+    store.replace_run(
+        str(run_dir),
+        manifest["model"],
+        manifest.get("category"),
+        datetime.fromisoformat(manifest["started_at"]),
+        datetime.fromisoformat(finished_at) if finished_at else None,
+        read_entries(run_dir),
+    )
+
+
+class HistoryReporter:
+    """Reporter decorator that also records every run in a HistoryStore.
+
+    Database writes run in worker threads, so they do not block the event
+    loop that is sending requests.
+    """
+
+    def __init__(self, inner: ReporterProtocol, store: HistoryStore) -> None:
+        """
+        Initialize the reporter.
+
+        Args:
+            inner: Reporter that owns the run directories.
+            store: History store receiving entries and summaries.
+        """
+        self.inner = inner
+        self.store = store
+
+    async def init_run(
+        self,
+        category: str | None,
+        model: str,
+        block_ids: list[str],
+    ) -> Path:
+        """Initialize the run with the inner reporter and register it."""
+        run_dir: Path = await self.inner.init_run(category, model, block_ids)
+        await asyncio.to_thread(
+            self.store.start_run,
+            str(run_dir),
+            model,
+            category,
+            datetime.now(timezone.utc),
+        )
+        return run_dir
+
+    async def write_entry(self, run_dir: Path, entry: RunEntry) -> None:
+        """Write the entry and queue its history row."""
+        await self.inner.write_entry(run_dir, entry)
+        self.store.add_entry(str(run_dir), entry, flush=False)
+        if self.store.pending >= _FLUSH_EVERY:
+            await asyncio.to_thread(self.store.flush)
+
+    async def finalize_run(self, run_dir: Path) -> None:
+        """Finalize the inner run and store its summary metrics."""
+        await self.inner.finalize_run(run_dir)
+        await asyncio.to_thread(self.store.finish_run, str(run_dir))
@@ -0,0 +1,192 @@
+"""Concurrency limiters bounding in-flight requests during a run."""
+
+import asyncio
+import time
+from collections import deque
+
+from tls.errors import ConfigError
+
+# Value of the concurrency setting selecting the adaptive limiter
+AUTO = "auto"
+
+
+class ConcurrencyLimiter:
+    """Fixed cap on the number of in-flight requests.
+
+    The limit history is recorded as (seconds since creation, limit) pairs
+    so runs can report how concurrency evolved.
+    """
+
+    def __init__(self, limit: int = 1) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            limit: Maximum number of requests in flight.
+
+        Raises:
+            ConfigError: If the limit is below 1.
+        """
+        if limit < 1:
+            raise ConfigError(f"Concurrency must be at least 1, got {limit}")
+        self._limit = limit
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._started = time.monotonic()
+        self.history: list[tuple[float, int]] = [(0.0, limit)]
+        self.backoffs = 0
+
+    @property
+    def limit(self) -> int:
+        """Current maximum number of in-flight requests."""
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently in flight."""
+        return self._in_flight
+
+    @property
+    def peak(self) -> int:
+        """Highest limit reached so far."""
+        return max(limit for _, limit in self.history)
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent and reserve a slot for it."""
+        while self._in_flight >= self._limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            await waiter
+        self._in_flight += 1
+
+    async def release(self, latency: float, overloaded: bool = False) -> None:
+        """
+        Free a slot after a request finished.
+
+        Args:
+            latency: Wall-clock latency of the request in seconds.
+            overloaded: Whether the server signalled overload (timeout, 429,
+                5xx).
+        """
+        self._in_flight -= 1
+        self._update(latency, overloaded)
+        free = self._limit - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _update(self, latency: float, overloaded: bool) -> None:
+        """Adjust the limit after a finished request (fixed: never)."""
+
+    def _set_limit(self, limit: int) -> None:
+        """Change the limit and record it in the history."""
+        if limit != self._limit:
+            self._limit = limit
+            self.history.append((time.monotonic() - self._started, limit))
+
+
+class AdaptiveLimiter(ConcurrencyLimiter):
+    """AIMD limit driven by observed latency and overload responses.
+
+    The limit grows by one per round of successful requests (about one per
+    `limit` completions) while latency stays within `tolerance` times the
+    baseline, the lowest latency of the recent window. Latency growth beyond
+    that, a timeout or a 429/5xx response cuts the limit by `backoff`.
+    After a cut, requests already in flight are not allowed to cut again,
+    since they were sent under the old limit.
+    """
+
+    def __init__(
+        self,
+        initial: int = 1,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        tolerance: float = 2.0,
+        backoff: float = 0.5,
+        window: int = 100,
+    ) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            initial: Starting limit.
+            min_limit: Lowest limit backed off to.
+            max_limit: Highest limit grown to.
+            tolerance: Latency growth over the baseline treated as congestion.
+            backoff: Multiplicative decrease applied on congestion.
+            window: Number of recent latencies the baseline is taken from.
+
+        Raises:
+            ConfigError: If the bounds are inconsistent.
+        """
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ConfigError(
+                "Adaptive concurrency requires 1 <= min <= initial <= max, got "
+                f"{min_limit}, {initial}, {max_limit}"
+            )
+        super().__init__(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._growth = 0.0
+        self._cooldown = 0
+
+    def _update(self, latency: float, overloaded: bool) -> None:
+        """Apply additive increase or multiplicative decrease."""
+        congested = overloaded
+        if not overloaded:
+            self._latencies.append(latency)
+            congested = latency > min(self._latencies) * self.tolerance
+
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return
+
+        if congested:
+            limit = max(self.min_limit, int(self._limit * self.backoff))
+            if limit < self._limit:
+                self.backoffs += 1
+            self._set_limit(limit)
+            self._growth = 0.0
+            self._cooldown = self._in_flight
+            return
+
+        # Only grow while the current limit is actually in use
+        if self._in_flight + 1 < self._limit:
+            return
+        self._growth += 1 / self._limit
+        if self._growth >= 1:
+            self._growth = 0.0
+            self._set_limit(min(self.max_limit, self._limit + 1))
+
+
+def create_limiter(
+    concurrency: int | str, max_concurrency: int = 64
+) -> ConcurrencyLimiter:
+    """
+    Create the limiter for a concurrency setting.
+
+    Args:
+        concurrency: Fixed number of in-flight requests, or "auto" for an
+            adaptive limit.
+        max_concurrency: Upper bound of the adaptive limit.
+
+    Returns:
+        A fixed or adaptive limiter.
+
+    Raises:
+        ConfigError: If the setting is invalid.
+    """
+    if concurrency == AUTO:
+        return AdaptiveLimiter(max_limit=max_concurrency)
+    try:
+        limit = int(concurrency)
+    except ValueError:
+        raise ConfigError(
+            f"Invalid concurrency '{concurrency}'. Use a number or '{AUTO}'"
+        ) from None
+    return ConcurrencyLimiter(limit)
@@ -1,9 +1,42 @@
 """LLM client service for API communication."""
 
+import asyncio
+import json
+from typing import Any
+
 import httpx
 
 from tls.errors import NetworkError
-from tls.protocols.llm import Message
+from tls.models.benchmark import OutputLimits, SamplingParams
+from tls.protocols.llm import Completion, CompletionBatch, Embeddings, Message
+from tls.services.tracer import Tracer
+
+
+def format_prompt(messages: list[Message]) -> str:
+    """Flatten chat messages into a plain prompt for completions endpoints."""
+    return "\n\n".join(m.content for m in messages)
+
+
+def cap_output(
+    text: str, finish_reason: str | None, limits: OutputLimits | None
+) -> tuple[str, str | None]:
+    """
+    Apply the character limit to a complete output.
+
+    Args:
+        text: Generated text.
+        finish_reason: Finish reason reported by the server.
+        limits: Optional output limits.
+
+    Returns:
+        The (possibly shortened) text and the truncation reason, if any.
+    """
+    if limits is not None and limits.max_chars is not None:
+        if len(text) > limits.max_chars:
+            return text[: limits.max_chars], "max_chars"
+    if finish_reason == "length":
+        return text, "max_tokens"
+    return text, None
 
 
 class LlmClient:
@@ -14,6 +47,7 @@ class LlmClient:
         base_url: str,
         api_key: str | None = None,
         timeout: int = 300,
+        tracer: Tracer | None = None,
     ) -> None:
         """
         Initialize the LLM client.
@@ -22,12 +56,14 @@ class LlmClient:
             base_url: Base URL for the API endpoint.
             api_key: Optional API key for authentication.
             timeout: Request timeout in seconds.
+            tracer: Optional tracer recording HTTP and decoding spans.
         """
         self.api_key = api_key or "dummy"
 
         # Normalize URL to ensure trailing slash
         self.base_url = base_url.rstrip("/") + "/"
         self.timeout = timeout
+        self.tracer = tracer or Tracer(enabled=False)
 
     async def chat(self, model: str, messages: list[Message]) -> str:
         """
@@ -40,35 +76,291 @@ class LlmClient:
         Returns:
             The model's response content.
 
+        Raises:
+            NetworkError: If the request fails.
+        """
+        completion = await self.complete(model, messages)
+        content: str = completion.content
+        return content
+
+    async def complete(
+        self,
+        model: str,
+        messages: list[Message],
+        sampling: SamplingParams | None = None,
+        n: int = 1,
+        limits: OutputLimits | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> Completion:
+        """
+        Send a chat completion request and keep the usage details.
+
+        Single-sample requests with active limits are streamed, so a
+        runaway generation is cancelled as soon as it exceeds its wall-time
+        or size limit instead of running to the server's context limit.
+
+        Args:
+            model: Model name to use.
+            messages: List of messages for the conversation.
+            sampling: Optional sampling parameters for the request.
+            n: Number of samples to request with the API's "n" parameter.
+            limits: Optional output limits. Outputs cut short are marked in
+                Completion.truncated.
+            response_format: Optional "response_format" constraining the
+                output, e.g. to a JSON Schema.
+
+        Returns:
+            The model's response content together with token usage. With
+            n > 1, every sample is listed in Completion.samples.
+
         Raises:
             NetworkError: If the request fails.
         """
         url = f"{self.base_url}v1/chat/completions"
         headers = {"Authorization": f"Bearer {self.api_key}"}
-        payload = {
+        payload: dict[str, object] = {
             "model": model,
             "messages": [m.to_dict() for m in messages],
         }
+        if sampling is not None:
+            payload.update(sampling.to_payload())
+        if n > 1:
+            payload["n"] = n
+        if response_format is not None:
+            payload["response_format"] = response_format
+
+        if limits is not None and limits.active and n == 1:
+            return await self._stream(url, headers, payload, limits)
+
+        data = await self._post(url, headers, payload)
+
+        choices = data.get("choices", [])
+        if not choices:
+            raise NetworkError("No choices in response")
 
+        outputs = [
+            cap_output(c["message"]["content"], c.get("finish_reason"), limits)
+            for c in choices
+        ]
+        content: str = outputs[0][0]
+        truncated = next((reason for _, reason in outputs if reason), None)
+        usage = data.get("usage") or {}
+        details = usage.get("prompt_tokens_details") or {}
+        return Completion(
+            content=content,
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            cached_tokens=details.get("cached_tokens"),
+            samples=[text for text, _ in outputs] if n > 1 else [],
+            truncated=truncated,
+        )
+
+    async def _post(
+        self, url: str, headers: dict[str, str], payload: dict[str, object]
+    ) -> Any:
+        """
+        Send a JSON request and decode the JSON response.
+
+        Raises:
+            NetworkError: If the request fails or the response is not JSON.
+        """
         async with httpx.AsyncClient(timeout=self.timeout) as client:
             try:
-                response = await client.post(url, json=payload, headers=headers)
+                with self.tracer.span("http.post", category="http"):
+                    response = await client.post(url, json=payload, headers=headers)
+            except httpx.TimeoutException as e:
+                raise NetworkError(f"Request timed out: {e}", timed_out=True) from e
             except httpx.RequestError as e:
                 raise NetworkError(f"Request failed: {e}") from e
 
             if not response.is_success:
                 raise NetworkError(
-                    f"API Request failed: {response.status_code} - {response.text}"
+                    f"API Request failed: {response.status_code} - {response.text}",
+                    status_code=response.status_code,
                 )
 
             try:
-                data = response.json()
+                with self.tracer.span("decode_response", category="http"):
+                    return response.json()
             except Exception as e:
                 raise NetworkError(f"Failed to parse response: {e}") from e
 
-            choices = data.get("choices", [])
-            if not choices:
-                raise NetworkError("No choices in response")
+    async def _stream(
+        self,
+        url: str,
+        headers: dict[str, str],
+        payload: dict[str, object],
+        limits: OutputLimits,
+    ) -> Completion:
+        """
+        Stream a chat completion, stopping early when a limit is exceeded.
+
+        Closing the stream cancels the generation on servers that abort
+        requests on disconnect (vLLM, llama.cpp, Ollama).
+
+        Raises:
+            NetworkError: If the request fails.
+        """
+        payload = {
+            **payload,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        parts: list[str] = []
+        size = 0
+        usage: dict[str, Any] = {}
+        truncated: str | None = None
+
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            try:
+                async with asyncio.timeout(limits.max_seconds):
+                    with self.tracer.span("http.stream", category="http"):
+                        async with client.stream(
+                            "POST", url, json=payload, headers=headers
+                        ) as response:
+                            if not response.is_success:
+                                body = (await response.aread()).decode()
+                                raise NetworkError(
+                                    f"API Request failed: "
+                                    f"{response.status_code} - {body}",
+                                    status_code=response.status_code,
+                                )
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[len("data:") :].strip()
+                                if data == "[DONE]":
+                                    break
+                                chunk = json.loads(data)
+                                usage = chunk.get("usage") or usage
+                                for choice in chunk.get("choices") or []:
+                                    delta = choice.get("delta") or {}
+                                    text = delta.get("content")
+                                    if text:
+                                        parts.append(text)
+                                        size += len(text)
+                                    if choice.get("finish_reason") == "length":
+                                        truncated = "max_tokens"
+                                if (
+                                    limits.max_chars is not None
+                                    and size >= limits.max_chars
+                                ):
+                                    truncated = "max_chars"
+                                    break
+            except TimeoutError:
+                truncated = "max_seconds"
+            except httpx.TimeoutException as e:
+                raise NetworkError(f"Request timed out: {e}", timed_out=True) from e
+            except httpx.RequestError as e:
+                raise NetworkError(f"Request failed: {e}") from e
+            except json.JSONDecodeError as e:
+                raise NetworkError(f"Failed to parse stream chunk: {e}") from e
+
+        content = "".join(parts)
+        if limits.max_chars is not None and len(content) > limits.max_chars:
+            content = content[: limits.max_chars]
+            truncated = "max_chars"
+        details = usage.get("prompt_tokens_details") or {}
+        return Completion(
+            content=content,
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            cached_tokens=details.get("cached_tokens"),
+            truncated=truncated,
+        )
+
+    async def complete_batch(
+        self,
+        model: str,
+        conversations: list[list[Message]],
+        sampling: SamplingParams | None = None,
+        limits: OutputLimits | None = None,
+    ) -> CompletionBatch:
+        """
+        Send several prompts in one request to the completions endpoint.
+
+        Each conversation is flattened with format_prompt() and the prompts
+        are sent as a list, which completions-style servers process as a
+        single batch.
+
+        Args:
+            model: Model name to use.
+            conversations: Message lists, one per prompt.
+            sampling: Optional sampling parameters for the request.
+            limits: Optional output limits. The character limit is applied
+                to each completion; batches are not streamed, so the wall-time
+                limit is left to the caller.
+
+        Returns:
+            One completion per conversation, in the same order. The server
+            reports token usage for the whole batch, so it is returned on
+            the batch rather than on each completion.
+
+        Raises:
+            NetworkError: If the request fails or results are missing.
+        """
+        url = f"{self.base_url}v1/completions"
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        payload: dict[str, object] = {
+            "model": model,
+            "prompt": [format_prompt(messages) for messages in conversations],
+        }
+        if sampling is not None:
+            payload.update(sampling.to_payload())
+
+        data = await self._post(url, headers, payload)
+
+        texts: dict[int, tuple[str, str | None]] = {}
+        for position, choice in enumerate(data.get("choices", [])):
+            texts[choice.get("index", position)] = cap_output(
+                choice["text"], choice.get("finish_reason"), limits
+            )
+
+        missing = [i for i in range(len(conversations)) if i not in texts]
+        if missing:
+            raise NetworkError(f"No choices in response for prompts {missing}")
+
+        usage = data.get("usage") or {}
+        return CompletionBatch(
+            completions=[
+                Completion(content=texts[i][0], truncated=texts[i][1])
+                for i in range(len(conversations))
+            ],
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+        )
+
+    async def embed(self, model: str, inputs: list[str]) -> Embeddings:
+        """
+        Embed several inputs in one request to the embeddings endpoint.
+
+        Args:
+            model: Model name to use.
+            inputs: Texts to embed.
+
+        Returns:
+            One vector per input, in the same order, and the prompt tokens
+            of the whole request.
+
+        Raises:
+            NetworkError: If the request fails or vectors are missing.
+        """
+        url = f"{self.base_url}v1/embeddings"
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        payload: dict[str, object] = {"model": model, "input": inputs}
+
+        data = await self._post(url, headers, payload)
+
+        vectors: dict[int, list[float]] = {}
+        for position, item in enumerate(data.get("data", [])):
+            vectors[item.get("index", position)] = item["embedding"]
+
+        missing = [i for i in range(len(inputs)) if i not in vectors]
+        if missing:
+            raise NetworkError(f"No embeddings in response for inputs {missing}")
 
-            content: str = choices[0]["message"]["content"]
-            return content
+        usage = data.get("usage") or {}
+        return Embeddings(
+            vectors=[vectors[i] for i in range(len(inputs))],
+            prompt_tokens=usage.get("prompt_tokens"),
+        )
@@ -0,0 +1,330 @@
+"""Live run metrics exposed in the Prometheus text exposition format."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from tls.protocols.llm import Completion
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+
+def escape_label(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@dataclass
+class ModelMetrics:
+    """Counters and latency histogram for a single model."""
+
+    started_at: float = field(default_factory=time.monotonic)
+    # Set while no request is in flight, so rates stop decaying once the
+    # model is done
+    ended_at: float | None = None
+    in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    latency_sum: float = 0.0
+    bucket_counts: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    vectors: int = 0
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds from the first request to the last response (or now)."""
+        return (self.ended_at or time.monotonic()) - self.started_at
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Completion tokens generated per second of the model's run."""
+        elapsed = self.elapsed
+        return self.completion_tokens / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def vectors_per_second(self) -> float:
+        """Embedding vectors computed per second of the model's run."""
+        elapsed = self.elapsed
+        return self.vectors / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of prompt tokens served from the server's prefix cache."""
+        if not self.prompt_tokens:
+            return 0.0
+        return self.cached_tokens / self.prompt_tokens
+
+
+class RunMetrics:
+    """In-process metrics registry updated by the executor."""
+
+    def __init__(self, endpoint: str) -> None:
+        """
+        Initialize the registry.
+
+        Args:
+            endpoint: Endpoint URL attached as a label to every series.
+        """
+        self.endpoint = endpoint
+        self.models: dict[str, ModelMetrics] = {}
+
+    def _get(self, model: str) -> ModelMetrics:
+        metrics = self.models.get(model)
+        if metrics is None:
+            metrics = self.models[model] = ModelMetrics()
+        return metrics
+
+    def request_started(self, model: str) -> None:
+        """Record a request being dispatched."""
+        metrics = self._get(model)
+        metrics.in_flight += 1
+        metrics.ended_at = None
+
+    def request_finished(
+        self,
+        model: str,
+        latency: float,
+        completion: Completion | None,
+    ) -> None:
+        """
+        Record a finished request.
+
+        Args:
+            model: Model the request was sent to.
+            latency: Wall-clock request latency in seconds.
+            completion: The completion, or None if the request failed.
+        """
+        metrics = self._get(model)
+        metrics.in_flight -= 1
+        if not metrics.in_flight:
+            metrics.ended_at = time.monotonic()
+        metrics.latency_sum += latency
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                metrics.bucket_counts[i] += 1
+                break
+
+        if completion is None:
+            metrics.failed += 1
+            return
+
+        metrics.completed += 1
+        metrics.prompt_tokens += completion.prompt_tokens or 0
+        metrics.completion_tokens += completion.completion_tokens or 0
+        metrics.cached_tokens += completion.cached_tokens or 0
+
+    def batch_usage(
+        self, model: str, prompt_tokens: int | None, completion_tokens: int | None
+    ) -> None:
+        """
+        Record the token usage of a batched request.
+
+        Args:
+            model: Model the request was sent to.
+            prompt_tokens: Prompt tokens of the whole request, if reported.
+            completion_tokens: Completion tokens of the whole request, if
+                reported.
+        """
+        metrics = self._get(model)
+        metrics.prompt_tokens += prompt_tokens or 0
+        metrics.completion_tokens += completion_tokens or 0
+
+    def vectors_embedded(
+        self, model: str, vectors: int, prompt_tokens: int | None
+    ) -> None:
+        """
+        Record the output of an embeddings request.
+
+        Args:
+            model: Model the request was sent to.
+            vectors: Number of vectors returned.
+            prompt_tokens: Prompt tokens of the whole request, if reported.
+        """
+        metrics = self._get(model)
+        metrics.vectors += vectors
+        metrics.prompt_tokens += prompt_tokens or 0
+
+    def render(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        lines = [
+            "# HELP tls_requests_in_flight Requests currently awaiting a response.",
+            "# TYPE tls_requests_in_flight gauge",
+        ]
+        labels = {
+            model: f'model="{escape_label(model)}",endpoint="{escape_label(self.endpoint)}"'
+            for model in self.models
+        }
+        for model, m in self.models.items():
+            lines.append(f"tls_requests_in_flight{{{labels[model]}}} {m.in_flight}")
+
+        lines += [
+            "# HELP tls_requests_total Finished requests by outcome.",
+            "# TYPE tls_requests_total counter",
+        ]
+        for model, m in self.models.items():
+            lines.append(
+                f'tls_requests_total{{{labels[model]},outcome="completed"}} {m.completed}'
+            )
+            lines.append(
+                f'tls_requests_total{{{labels[model]},outcome="failed"}} {m.failed}'
+            )
+
+        lines += [
+            "# HELP tls_request_latency_seconds Request latency.",
+            "# TYPE tls_request_latency_seconds histogram",
+        ]
+        for model, m in self.models.items():
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, m.bucket_counts):
+                cumulative += count
+                lines.append(
+                    f'tls_request_latency_seconds_bucket{{{labels[model]},le="{bound}"}} {cumulative}'
+                )
+            total = m.completed + m.failed
+            lines.append(
+                f'tls_request_latency_seconds_bucket{{{labels[model]},le="+Inf"}} {total}'
+            )
+            lines.append(
+                f"tls_request_latency_seconds_sum{{{labels[model]}}} {m.latency_sum}"
+            )
+            lines.append(
+                f"tls_request_latency_seconds_count{{{labels[model]}}} {total}"
+            )
+
+        lines += [
+            "# HELP tls_tokens_total Tokens reported by the server.",
+            "# TYPE tls_tokens_total counter",
+        ]
+        for model, m in self.models.items():
+            lines.append(
+                f'tls_tokens_total{{{labels[model]},kind="prompt"}} {m.prompt_tokens}'
+            )
+            lines.append(
+                f'tls_tokens_total{{{labels[model]},kind="completion"}} {m.completion_tokens}'
+            )
+            lines.append(
+                f'tls_tokens_total{{{labels[model]},kind="cached"}} {m.cached_tokens}'
+            )
+
+        lines += [
+            "# HELP tls_tokens_per_second Completion tokens per second for the run.",
+            "# TYPE tls_tokens_per_second gauge",
+        ]
+        for model, m in self.models.items():
+            lines.append(
+                f"tls_tokens_per_second{{{labels[model]}}} {m.tokens_per_second:.3f}"
+            )
+
+        lines += [
+            "# HELP tls_embedding_vectors_total Embedding vectors computed.",
+            "# TYPE tls_embedding_vectors_total counter",
+        ]
+        for model, m in self.models.items():
+            lines.append(f"tls_embedding_vectors_total{{{labels[model]}}} {m.vectors}")
+
+        lines += [
+            "# HELP tls_vectors_per_second Embedding vectors per second for the run.",
+            "# TYPE tls_vectors_per_second gauge",
+        ]
+        for model, m in self.models.items():
+            lines.append(
+                f"tls_vectors_per_second{{{labels[model]}}} {m.vectors_per_second:.3f}"
+            )
+
+        lines += [
+            "# HELP tls_cache_hit_rate Share of prompt tokens served from cache.",
+            "# TYPE tls_cache_hit_rate gauge",
+        ]
+        for model, m in self.models.items():
+            lines.append(
+                f"tls_cache_hit_rate{{{labels[model]}}} {m.cache_hit_rate:.4f}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Minimal HTTP server exposing RunMetrics on /metrics."""
+
+    def __init__(
+        self,
+        metrics: RunMetrics,
+        host: str = "127.0.0.1",
+        port: int = 9464,
+    ) -> None:
+        """
+        Initialize the server.
+
+        Args:
+            metrics: Registry to expose.
+            host: Interface to bind to.
+            port: Port to listen on (0 picks a free port).
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        """Start listening for scrape requests."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Resolve the actual port when 0 was requested
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop the server and close open connections."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "MetricsServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve a single HTTP/1.0-style request."""
+        try:
+            request_line = await reader.readline()
+            # Drain headers; the request body is never used
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1] == "/metrics":
+                status = "200 OK"
+                body = self.metrics.render().encode()
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
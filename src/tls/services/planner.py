@@ -0,0 +1,148 @@
+"""Dry-run planning: request volume, token and duration estimates of a run."""
+
+from dataclasses import dataclass, field
+
+from tls.models.benchmark import EndpointKind, EvaluationBlock
+from tls.services.dataset import iter_cases
+from tls.services.history import HistoryStore, Throughput
+
+# Rough characters per token of English text and code for BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+# Tokens a chat template adds around every message (role markers etc.)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Number of recent runs per model the projections are based on
+HISTORY_RUNS = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer.
+
+    Args:
+        text: Text to estimate.
+
+    Returns:
+        About one token per CHARS_PER_TOKEN characters, rounded up.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class BlockPlan:
+    """Requests and estimated prompt tokens of one block, per model."""
+
+    block_id: str
+    endpoint: EndpointKind
+    cases: int = 0
+    requests: int = 0
+    prompt_tokens: int = 0
+
+
+@dataclass
+class ModelProjection:
+    """Duration and token volume of a run projected from a model's history."""
+
+    model: str
+    throughput: Throughput | None = None
+    seconds: float | None = None
+    completion_tokens: int | None = None
+
+
+@dataclass
+class RunPlan:
+    """What a run would send, and how long it is expected to take."""
+
+    blocks: list[BlockPlan] = field(default_factory=list)
+    models: list[ModelProjection] = field(default_factory=list)
+
+    @property
+    def cases(self) -> int:
+        """Cases per model."""
+        return sum(b.cases for b in self.blocks)
+
+    @property
+    def requests(self) -> int:
+        """Requests per model (before batching and deduplication)."""
+        return sum(b.requests for b in self.blocks)
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Estimated prompt tokens per model."""
+        return sum(b.prompt_tokens for b in self.blocks)
+
+
+def plan_block(block: EvaluationBlock, native_n: bool = False) -> BlockPlan:
+    """
+    Count the cases and requests of a block and estimate its prompt tokens.
+
+    Cases are streamed, so planning a large dataset file runs in constant
+    memory. Samples drawn as separate requests and every turn of a
+    conversation count as requests with their own prompt; model replies
+    resent in later turns are unknown before the run and not counted.
+
+    Args:
+        block: Evaluation block.
+        native_n: Whether samples are requested with the API's "n".
+
+    Returns:
+        The block's plan.
+    """
+    plan = BlockPlan(block_id=block.metadata.id, endpoint=block.endpoint)
+    system_tokens = estimate_tokens(block.prompts.system) + MESSAGE_OVERHEAD_TOKENS
+    for case in iter_cases(block):
+        plan.cases += 1
+        if block.endpoint == "embeddings":
+            plan.requests += 1
+            plan.prompt_tokens += estimate_tokens(case.input)
+            continue
+        prompt = system_tokens + (estimate_tokens(case.context) if case.context else 0)
+        copies = 1 if native_n else case.samples or 1
+        if block.compare_unconstrained:
+            copies *= 2
+        for text in [case.input, *(case.turns or [])]:
+            prompt += estimate_tokens(text) + MESSAGE_OVERHEAD_TOKENS
+            plan.requests += copies
+            plan.prompt_tokens += prompt * copies
+    return plan
+
+
+def plan_run(
+    blocks: list[EvaluationBlock],
+    models: list[str],
+    history: HistoryStore | None = None,
+    native_n: bool = False,
+    history_runs: int = HISTORY_RUNS,
+) -> RunPlan:
+    """
+    Plan a run without sending any request.
+
+    Durations and completion tokens are projected from each model's
+    throughput over its most recent runs, so they reflect the endpoint
+    and concurrency those runs used.
+
+    Args:
+        blocks: Blocks the run executes, after all filters.
+        models: Models the run evaluates.
+        history: Optional history store of previous runs.
+        native_n: Whether samples are requested with the API's "n".
+        history_runs: Number of recent runs per model to project from.
+
+    Returns:
+        The run plan.
+    """
+    plan = RunPlan(blocks=[plan_block(block, native_n) for block in blocks])
+    for model in models:
+        projection = ModelProjection(model=model)
+        if history is not None:
+            projection.throughput = history.throughput(model, history_runs)
+        throughput = projection.throughput
+        if throughput is not None:
+            rate = throughput.cases_per_second
+            projection.seconds = plan.cases / rate if rate else None
+            projection.completion_tokens = round(
+                plan.cases * throughput.completion_tokens_per_case
+            )
+        plan.models.append(projection)
+    return plan
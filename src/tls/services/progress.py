@@ -0,0 +1,165 @@
+"""Run progress display with rendering decoupled from case throughput."""
+
+import asyncio
+import contextlib
+import time
+from types import TracebackType
+
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    Progress,
+    SpinnerColumn,
+    TaskID,
+    TaskProgressColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
+
+from tls.errors import ConfigError
+from tls.services.tracer import Tracer
+
+# "auto" picks "bar" on a terminal and "log" otherwise
+PROGRESS_MODES = ("auto", "bar", "log", "none")
+
+DEFAULT_DESCRIPTION = "Running benchmarks..."
+
+
+class RunProgress:
+    """Progress display updated at a fixed rate instead of per case.
+
+    advance() only bumps a counter. While the display is active, a
+    background task renders the current count every refresh interval, so
+    the per-case cost stays constant however fast cases complete. The
+    "bar" mode draws a Rich progress bar; the "log" mode prints a compact
+    status line at a slower interval, suited to CI logs and other non-TTY
+    output; "none" renders nothing.
+    """
+
+    def __init__(
+        self,
+        console: Console,
+        total: int,
+        mode: str = "auto",
+        refresh_per_second: float = 4.0,
+        log_interval: float = 10.0,
+        tracer: Tracer | None = None,
+    ) -> None:
+        """
+        Initialize the display.
+
+        Args:
+            console: Console to render to.
+            total: Total number of cases in the run.
+            mode: One of PROGRESS_MODES.
+            refresh_per_second: Redraw rate of the progress bar.
+            log_interval: Seconds between status lines in "log" mode.
+            tracer: Optional tracer recording render spans.
+
+        Raises:
+            ConfigError: If the mode is unknown.
+        """
+        if mode not in PROGRESS_MODES:
+            raise ConfigError(
+                f"Unknown progress mode '{mode}'. "
+                f"Choose from: {', '.join(PROGRESS_MODES)}"
+            )
+        if mode == "auto":
+            mode = "bar" if console.is_terminal else "log"
+        self.console = console
+        self.total = total
+        self.mode = mode
+        self.completed = 0
+        self.description = DEFAULT_DESCRIPTION
+        self.tracer = tracer or Tracer(enabled=False)
+        self._interval = 1 / refresh_per_second if mode == "bar" else log_interval
+        self._progress: Progress | None = None
+        self._task_id: TaskID | None = None
+        self._ticker: asyncio.Task[None] | None = None
+        self._started = 0.0
+        self._logged = -1
+
+    def advance(self, count: int = 1) -> None:
+        """Count finished cases; they are shown on the next refresh."""
+        self.completed += count
+
+    def set_description(self, description: str) -> None:
+        """Change the status text shown next to the progress."""
+        self.description = description
+
+    async def __aenter__(self) -> "RunProgress":
+        """Start rendering."""
+        self._started = time.monotonic()
+        if self.mode == "bar":
+            self._progress = Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(style="cyan"),
+                TaskProgressColumn(),
+                TimeElapsedColumn(),
+                console=self.console,
+                auto_refresh=False,
+            )
+            self._progress.start()
+            self._task_id = self._progress.add_task(
+                f"[cyan]{self.description}", total=self.total
+            )
+        if self.mode != "none":
+            self._ticker = asyncio.create_task(self._tick())
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Stop rendering after drawing the final state."""
+        if self._ticker is not None:
+            self._ticker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._ticker
+            self._ticker = None
+        if self.mode != "none":
+            self.render(final=True)
+        if self._progress is not None:
+            self._progress.stop()
+            self._progress = None
+
+    async def _tick(self) -> None:
+        """Render at the configured interval until cancelled."""
+        while True:
+            await asyncio.sleep(self._interval)
+            self.render()
+
+    def render(self, final: bool = False) -> None:
+        """
+        Draw the current state.
+
+        Args:
+            final: Whether this is the last render of the run. In "log"
+                mode a status line is printed only when the count changed,
+                except for the final line.
+        """
+        with self.tracer.span("progress", category="ui"):
+            if self._progress is not None and self._task_id is not None:
+                self._progress.update(
+                    self._task_id,
+                    completed=self.completed,
+                    description=f"[cyan]{self.description}",
+                )
+                self._progress.refresh()
+            elif self.mode == "log" and (final or self.completed != self._logged):
+                self._logged = self.completed
+                self.console.print(self._status_line(final), highlight=False)
+
+    def _status_line(self, final: bool) -> str:
+        """Compact single-line status for non-TTY output."""
+        elapsed = time.monotonic() - self._started
+        rate = self.completed / elapsed if elapsed > 0 else 0.0
+        percent = self.completed / self.total if self.total else 1.0
+        label = "Finished" if final else self.description
+        return (
+            f"{label} {self.completed}/{self.total} cases ({percent:.0%}) "
+            f"in {elapsed:.1f}s, {rate:.1f} cases/s"
+        )
@@ -0,0 +1,89 @@
+"""Reporter backends: built-ins and plugins registered as entry points."""
+
+from collections.abc import Callable
+from importlib.metadata import entry_points
+from pathlib import Path
+
+from tls.errors import ConfigError
+from tls.models.project_config import ReportsConfig
+from tls.protocols.reporter import ReporterProtocol
+from tls.services.reporter import FanOutReporter, FileSystemReporter
+
+# Entry point group of reporter backend plugins
+REPORTER_GROUP = "tls.reporters"
+
+# Creates a backend from the reports directory and the [reports] settings
+ReporterFactory = Callable[[Path, ReportsConfig], ReporterProtocol]
+
+
+def files_reporter(reports_dir: Path, reports: ReportsConfig) -> ReporterProtocol:
+    """Markdown reports, entries.jsonl and run.json per run directory."""
+    return FileSystemReporter(reports_dir, reports.compression)
+
+
+BUILTIN_REPORTERS: dict[str, ReporterFactory] = {"files": files_reporter}
+
+
+def available_reporters() -> list[str]:
+    """Names of the built-in and installed reporter backends."""
+    names = set(BUILTIN_REPORTERS)
+    names.update(ep.name for ep in entry_points(group=REPORTER_GROUP))
+    return sorted(names)
+
+
+def load_reporter(name: str) -> ReporterFactory:
+    """
+    Find the factory of a reporter backend.
+
+    Built-in backends take precedence over plugins of the same name.
+    Plugins register a factory under the "tls.reporters" entry point
+    group, e.g. in pyproject.toml:
+
+        [project.entry-points."tls.reporters"]
+        sqlite = "my_package.reporting:sqlite_reporter"
+
+    Args:
+        name: Backend name.
+
+    Returns:
+        Factory creating the backend.
+
+    Raises:
+        ConfigError: If no backend has the name or its plugin fails to load.
+    """
+    factory = BUILTIN_REPORTERS.get(name)
+    if factory is not None:
+        return factory
+    matches = entry_points(group=REPORTER_GROUP, name=name)
+    if not matches:
+        raise ConfigError(
+            f"Unknown reporter backend '{name}', available: "
+            + ", ".join(available_reporters())
+        )
+    try:
+        loaded: ReporterFactory = next(iter(matches)).load()
+    except Exception as e:
+        raise ConfigError(f"Failed to load reporter backend '{name}': {e}") from e
+    return loaded
+
+
+def create_reporter(reports_dir: Path, reports: ReportsConfig) -> ReporterProtocol:
+    """
+    Create the reporter of the backends selected in the [reports] section.
+
+    Args:
+        reports_dir: Base directory for reports.
+        reports: Report settings; the first backend owns the run directory.
+
+    Returns:
+        A reporter writing to every selected backend.
+
+    Raises:
+        ConfigError: If no backend is selected or one is unknown.
+    """
+    if not reports.backends:
+        raise ConfigError("No reporter backends selected in [reports]")
+    return FanOutReporter(
+        [load_reporter(name)(reports_dir, reports) for name in reports.backends],
+        queue_size=reports.queue_size,
+    )
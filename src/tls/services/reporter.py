@@ -1,7 +1,12 @@
 """Reporter service for writing benchmark run results."""
 
+import asyncio
+import json
+import os
+from collections.abc import Callable
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
 import aiofiles
 import aiofiles.os
@@ -9,6 +14,23 @@ import aiofiles.os
 from tls.errors import TlsError
 from tls.models.project_config import sanitize_model_name
 from tls.models.report import RunEntry
+from tls.protocols.reporter import ReporterProtocol
+from tls.services.compression import (
+    Compressor,
+    check_compression,
+    compress,
+    compressed_name,
+    find_file,
+    new_compressor,
+    open_text,
+)
+
+# Structured per-run files written next to the Markdown reports
+ENTRIES_FILENAME = "entries.jsonl"
+MANIFEST_FILENAME = "run.json"
+
+# Entries a backend may fall behind by before writing new ones waits for it
+QUEUE_SIZE = 1024
 
 
 def sanitize_block_id(block_id: str) -> str:
@@ -23,6 +45,35 @@ def format_entry(entry: RunEntry) -> str:
         f"- **Input**: {entry.input}",
         f"- **Output**: {entry.output}",
     ]
+    if entry.turns:
+        for i, turn in enumerate(entry.turns[1:], start=2):
+            lines.append(f"- **Turn {i}**: {turn.input}")
+            lines.append(
+                f"- **Reply {i}** ({turn.latency_seconds:.2f}s): {turn.output}"
+            )
+    if entry.samples and len(entry.samples) > 1:
+        for i, sample in enumerate(entry.samples[1:], start=2):
+            lines.append(f"- **Sample {i}**: {sample}")
+        if entry.passed_samples is not None:
+            lines.append(
+                f"- **Passed**: {entry.passed_samples}/{len(entry.samples)} samples"
+            )
+    if entry.dimensions is not None:
+        lines.append(f"- **Embedding**: {entry.dimensions} dimensions")
+    if entry.schema_valid is not None:
+        mode = "constrained" if entry.constrained else "free"
+        verdict = "valid" if entry.schema_valid else f"invalid, {entry.schema_error}"
+        lines.append(f"- **Schema** ({mode}): {verdict}")
+    if entry.unconstrained is not None:
+        free = entry.unconstrained
+        label = f"{free.latency_seconds:.2f}s"
+        if free.schema_valid is not None:
+            label += ", valid" if free.schema_valid else ", invalid"
+        lines.append(f"- **Unconstrained** ({label}): {free.output}")
+    if entry.truncated:
+        lines.append(f"- **Truncated**: {entry.truncated}")
+    if entry.duplicate_of:
+        lines.append(f"- **Shared result of**: {entry.duplicate_of}")
     if entry.expected:
         lines.append(f"- **Expected**: {entry.expected}")
     if entry.context:
@@ -31,17 +82,151 @@ def format_entry(entry: RunEntry) -> str:
     return "\n".join(lines)
 
 
+def report_header(model: str, date: str) -> str:
+    """Header of a block's Markdown report."""
+    return f"# Telescope Run Report\n**Model**: {model}\n**Date**: {date}\n\n"
+
+
+def failure_record(entry: RunEntry) -> dict[str, Any]:
+    """Manifest record of a failed case."""
+    return {
+        "block_id": entry.block_id,
+        "case_index": entry.case_index,
+        "case_id": entry.case_id,
+        "error": entry.error,
+    }
+
+
+def read_manifest(run_dir: Path) -> dict[str, Any]:
+    """
+    Read the manifest of a run directory.
+
+    Raises:
+        TlsError: If the directory has no manifest.
+    """
+    manifest_path = run_dir / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        raise TlsError(f"No {MANIFEST_FILENAME} found in {run_dir}")
+    manifest: dict[str, Any] = json.loads(manifest_path.read_text())
+    return manifest
+
+
+def read_entries(run_dir: Path) -> list[RunEntry]:
+    """
+    Read the structured entries of a run directory, in written order.
+
+    Compressed entries are decompressed while reading.
+
+    Raises:
+        TlsError: If the directory has no structured entries.
+    """
+    entries_path = find_file(run_dir, ENTRIES_FILENAME)
+    if entries_path is None:
+        raise TlsError(f"No {ENTRIES_FILENAME} found in {run_dir}")
+    with open_text(entries_path) as f:
+        return [RunEntry.model_validate_json(line) for line in f if line.strip()]
+
+
+def latest_run_dir(reports_dir: Path, category: str | None, model: str) -> Path | None:
+    """Most recent run directory of a model, or None if it has none."""
+    model_dir = reports_dir / (category or "") / sanitize_model_name(model)
+    if not model_dir.is_dir():
+        return None
+    runs = [p for p in model_dir.iterdir() if (p / MANIFEST_FILENAME).exists()]
+    return max(runs, key=lambda p: p.name, default=None)
+
+
+async def rewrite_run(run_dir: Path, entries: list[RunEntry]) -> None:
+    """
+    Replace the entries of a run directory and regenerate its reports.
+
+    The Markdown report of every block is rebuilt from the entries, and
+    the manifest gains the new block IDs, the current failures and an
+    "updated_at" time. Files keep the run's compression, and each file is
+    replaced atomically.
+
+    Args:
+        run_dir: Run directory written by FileSystemReporter.
+        entries: All entries of the run, in report order.
+    """
+    manifest_path = run_dir / MANIFEST_FILENAME
+    async with aiofiles.open(manifest_path) as f:
+        manifest = json.loads(await f.read())
+    block_ids: list[str] = list(manifest.get("block_ids", []))
+    for entry in entries:
+        if entry.block_id not in block_ids:
+            block_ids.append(entry.block_id)
+    manifest["block_ids"] = block_ids
+    manifest["failures"] = [failure_record(e) for e in entries if e.error is not None]
+    manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+    compression = manifest.get("compression", "none")
+
+    header = report_header(manifest["model"], manifest["started_at"])
+    reports = {block_id: [header] for block_id in block_ids}
+    for entry in entries:
+        reports[entry.block_id].append(format_entry(entry))
+
+    reports_files = {
+        ENTRIES_FILENAME: "".join(e.model_dump_json() + "\n" for e in entries),
+        **{
+            f"{sanitize_block_id(block_id)}.md": "".join(parts)
+            for block_id, parts in reports.items()
+        },
+    }
+    files = {
+        compressed_name(name, compression): compress(content.encode(), compression)
+        for name, content in reports_files.items()
+    }
+    files[MANIFEST_FILENAME] = json.dumps(manifest, indent=2).encode()
+    for name, data in files.items():
+        temp_path = run_dir / f".{name}.tmp"
+        async with aiofiles.open(temp_path, "wb") as f:
+            await f.write(data)
+        os.replace(temp_path, run_dir / name)
+
+
+def replace_entries(old: list[RunEntry], new: list[RunEntry]) -> list[RunEntry]:
+    """
+    Merge re-executed entries into a run's entries.
+
+    Entries of the same case (block ID and case index) are replaced in
+    place; entries of cases the run did not have are appended.
+    """
+    updates = {(e.block_id, e.case_index): e for e in new}
+    merged = [updates.pop((e.block_id, e.case_index), e) for e in old]
+    return merged + list(updates.values())
+
+
 class FileSystemReporter:
-    """File system-based report writer that creates Markdown files."""
+    """File system-based report writer that creates Markdown files.
+
+    Alongside the human-readable Markdown, every entry is appended to an
+    entries.jsonl file and the run is described by a run.json manifest,
+    so analysis commands never need to parse Markdown. The manifest lists
+    the run's failed cases, so they can be retried without the others.
+
+    With compression, the entries and Markdown reports are written as
+    gzip or zstd streams: every entry is fed to a per-file compressor and
+    the compressed output appended as it becomes available, so large runs
+    are never held in memory or compressed after the fact. The streams
+    are completed when the run is finalized.
+    """
 
-    def __init__(self, reports_dir: Path) -> None:
+    def __init__(self, reports_dir: Path, compression: str = "none") -> None:
         """
         Initialize the reporter.
 
         Args:
             reports_dir: Base directory for reports.
+            compression: "none", "gzip" or "zstd".
+
+        Raises:
+            ConfigError: If the compression is unknown or unavailable.
         """
         self.reports_dir = reports_dir
+        self.compression = check_compression(compression)
+        self._failures: dict[Path, list[dict[str, Any]]] = {}
+        self._streams: dict[Path, dict[str, Compressor]] = {}
 
     async def init_run(
         self,
@@ -63,30 +248,229 @@ class FileSystemReporter:
 
         timestamp_str = now.isoformat()
 
-        # Create report files with headers for all blocks
-        for block_id in block_ids:
-            filename = sanitize_block_id(block_id)
-            file_path = run_dir / f"{filename}.md"
+        manifest = {
+            "model": model,
+            "category": category,
+            "started_at": timestamp_str,
+            "block_ids": block_ids,
+            "compression": self.compression,
+        }
+        async with aiofiles.open(run_dir / MANIFEST_FILENAME, "w") as f:
+            await f.write(json.dumps(manifest, indent=2))
+        self._failures[run_dir] = []
 
-            header = (
-                f"# Telescope Run Report\n"
-                f"**Model**: {model}\n"
-                f"**Date**: {timestamp_str}\n\n"
-            )
-            async with aiofiles.open(file_path, "w") as f:
-                await f.write(header)
+        # Create the entries file and report files with headers for all blocks
+        names = [ENTRIES_FILENAME]
+        names.extend(f"{sanitize_block_id(block_id)}.md" for block_id in block_ids)
+        if self.compression != "none":
+            self._streams[run_dir] = {
+                name: new_compressor(self.compression) for name in names
+            }
+        header = report_header(model, timestamp_str).encode()
+        streams = self._streams.get(run_dir, {})
+        for name in names:
+            content = b"" if name == ENTRIES_FILENAME else header
+            if name in streams:
+                content = streams[name].compress(content)
+            file_path = run_dir / compressed_name(name, self.compression)
+            async with aiofiles.open(file_path, "wb") as f:
+                await f.write(content)
 
         return run_dir
 
     async def write_entry(self, run_dir: Path, entry: RunEntry) -> None:
         """Write a single entry to a block's report."""
         filename = sanitize_block_id(entry.block_id)
-        file_path = run_dir / f"{filename}.md"
+        name = f"{filename}.md"
+        file_path = run_dir / compressed_name(name, self.compression)
 
         if not file_path.exists():
             raise TlsError(f"Report file not found: {file_path}")
 
-        entry_content = format_entry(entry)
+        await self._append(run_dir, name, format_entry(entry))
+        await self._append(run_dir, ENTRIES_FILENAME, entry.model_dump_json() + "\n")
+        if entry.error is not None:
+            self._failures.setdefault(run_dir, []).append(failure_record(entry))
+
+    async def _append(self, run_dir: Path, name: str, text: str) -> None:
+        """Append text to a report file, through its compressor if any."""
+        streams = self._streams.get(run_dir)
+        if streams is None:
+            async with aiofiles.open(run_dir / name, "a") as f:
+                await f.write(text)
+            return
+        data = streams[name].compress(text.encode())
+        if data:
+            file_path = run_dir / compressed_name(name, self.compression)
+            async with aiofiles.open(file_path, "ab") as f:
+                await f.write(data)
+
+    async def finalize_run(self, run_dir: Path) -> None:
+        """Record the finish time and the failed cases in the run manifest."""
+        for name, compressor in self._streams.pop(run_dir, {}).items():
+            file_path = run_dir / compressed_name(name, self.compression)
+            async with aiofiles.open(file_path, "ab") as f:
+                await f.write(compressor.flush())
+
+        manifest_path = run_dir / MANIFEST_FILENAME
+        async with aiofiles.open(manifest_path) as f:
+            manifest = json.loads(await f.read())
+        manifest["finished_at"] = datetime.now(timezone.utc).isoformat()
+        manifest["failures"] = self._failures.pop(run_dir, [])
+        async with aiofiles.open(manifest_path, "w") as f:
+            await f.write(json.dumps(manifest, indent=2))
+
+
+class PatchReporter:
+    """Reporter merging re-executed cases into existing run directories.
+
+    Instead of creating a run directory, each model's entries go to the
+    given directory of an earlier run. They are collected during the run
+    and merged with that run's entries when it is finalized, after which
+    its Markdown reports are regenerated.
+    """
+
+    def __init__(
+        self,
+        run_dirs: dict[str, Path],
+        merge: Callable[
+            [list[RunEntry], list[RunEntry]], list[RunEntry]
+        ] = replace_entries,
+    ) -> None:
+        """
+        Initialize the reporter.
+
+        Args:
+            run_dirs: Run directory to patch, per model.
+            merge: Combines a run's entries with the re-executed ones into
+                the run's new entries.
+        """
+        self.run_dirs = run_dirs
+        self.merge = merge
+        self._patches: dict[Path, list[RunEntry]] = {}
 
-        async with aiofiles.open(file_path, "a") as f:
-            await f.write(entry_content)
+    async def init_run(
+        self,
+        category: str | None,
+        model: str,
+        block_ids: list[str],
+    ) -> Path:
+        """Return the run directory patched for the model."""
+        run_dir = self.run_dirs.get(model)
+        if run_dir is None:
+            raise TlsError(f"No run directory to update for model {model}")
+        self._patches[run_dir] = []
+        return run_dir
+
+    async def write_entry(self, run_dir: Path, entry: RunEntry) -> None:
+        """Collect a re-executed entry."""
+        self._patches[run_dir].append(entry)
+
+    async def finalize_run(self, run_dir: Path) -> None:
+        """Merge the collected entries into the run and rewrite its files."""
+        patch = self._patches.pop(run_dir)
+        await rewrite_run(run_dir, self.merge(read_entries(run_dir), patch))
+
+
+class _Channel:
+    """Bounded queue feeding one backend's run, drained by a background task.
+
+    A failed write is kept and later entries are discarded, so the queue
+    keeps draining and producers waiting on a full queue never hang.
+    """
+
+    def __init__(self, backend: ReporterProtocol, run_dir: Path, size: int) -> None:
+        self.backend = backend
+        self.run_dir = run_dir
+        self.queue: asyncio.Queue[RunEntry | None] = asyncio.Queue(size)
+        self.error: Exception | None = None
+        self.task = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        """Write queued entries to the backend until the end-of-run marker."""
+        while (entry := await self.queue.get()) is not None:
+            if self.error is not None:
+                continue
+            try:
+                await self.backend.write_entry(self.run_dir, entry)
+            except Exception as e:
+                self.error = e
+
+
+class FanOutReporter:
+    """Reporter writing every run to several backends.
+
+    The first backend owns the run: the run directory it creates is the
+    one returned to the executor, while every other backend keeps its own.
+    Entries are handed to each backend through its own bounded queue,
+    drained by a background task per run and backend, so report I/O and
+    slow sinks overlap with request dispatch instead of adding to it.
+    When a backend falls `queue_size` entries behind, writing waits for
+    it, which bounds memory. Finalizing a run waits for its queues to
+    drain and then finalizes every backend.
+    """
+
+    def __init__(
+        self, backends: list[ReporterProtocol], queue_size: int = QUEUE_SIZE
+    ) -> None:
+        """
+        Initialize the reporter.
+
+        Args:
+            backends: Reporters receiving the runs, the run owner first.
+            queue_size: Entries queued per backend and run before writing
+                waits for the backend.
+
+        Raises:
+            TlsError: If no backend is given.
+        """
+        if not backends:
+            raise TlsError("At least one reporter backend is required")
+        self.backends = backends
+        self.queue_size = queue_size
+        self._runs: dict[Path, list[_Channel]] = {}
+
+    async def init_run(
+        self,
+        category: str | None,
+        model: str,
+        block_ids: list[str],
+    ) -> Path:
+        """Initialize the run with every backend and start their writers."""
+        channels = []
+        for backend in self.backends:
+            backend_dir = await backend.init_run(category, model, block_ids)
+            channels.append(_Channel(backend, backend_dir, self.queue_size))
+        run_dir = channels[0].run_dir
+        self._runs[run_dir] = channels
+        return run_dir
+
+    async def write_entry(self, run_dir: Path, entry: RunEntry) -> None:
+        """
+        Queue an entry for every backend, waiting while a queue is full.
+
+        Raises:
+            Exception: The error of a backend that failed to write an
+                earlier entry.
+        """
+        for channel in self._runs[run_dir]:
+            if channel.error is not None:
+                raise channel.error
+            await channel.queue.put(entry)
+
+    async def finalize_run(self, run_dir: Path) -> None:
+        """
+        Wait until every backend wrote the run's entries, then finalize.
+
+        Backends are finalized even if one failed to write, so their
+        reports are complete; the first write error is raised afterwards.
+        """
+        channels = self._runs.pop(run_dir)
+        for channel in channels:
+            await channel.queue.put(None)
+        await asyncio.gather(*(channel.task for channel in channels))
+        for channel in channels:
+            await channel.backend.finalize_run(channel.run_dir)
+        for channel in channels:
+            if channel.error is not None:
+                raise channel.error
@@ -0,0 +1,125 @@
+"""Re-running the failed cases of a finished run in place."""
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from tls.models.benchmark import EvaluationBlock
+from tls.models.report import RunEntry, case_key
+from tls.protocols.reporter import ReporterProtocol
+from tls.services.dataset import block_digest, case_hash, iter_cases
+from tls.services.executor import Executor
+from tls.services.history import HistoryStore, record_updated_run
+from tls.services.reporter import PatchReporter, read_entries, read_manifest
+
+
+@dataclass
+class RetryResult:
+    """Outcome of retrying the failed cases of a run."""
+
+    run_dir: Path
+    model: str
+    failed: int = 0
+    retried: int = 0
+    still_failing: int = 0
+    skipped: list[str] = field(default_factory=list)
+
+    @property
+    def fixed(self) -> int:
+        """Retried cases that succeeded this time."""
+        return self.retried - self.still_failing
+
+
+async def retry_failed_cases(
+    make_executor: Callable[[ReporterProtocol], Executor],
+    run_dir: Path,
+    blocks_dir: Path,
+    history: HistoryStore | None = None,
+) -> RetryResult:
+    """
+    Re-issue the failed cases of a run and patch its reports in place.
+
+    The retried entries replace the failed ones in the run's entries and
+    Markdown reports, and the manifest's failure list is updated. Cases
+    are looked up by index in the current benchmark files; a case whose
+    content changed since the run (see case_hash) is skipped rather than
+    recorded under a result it did not produce.
+
+    Blocks are found by the IDs recorded in the run manifest, whether or
+    not they are active, in blocks_dir and in its subdirectory named after
+    the run's category (where a run of a --file directory target came
+    from). Failed cases of blocks found in neither place are skipped.
+
+    Only the run directory and, if given, the history store are updated;
+    other reporter backends are not, as reporters cannot patch a run they
+    already finalized.
+
+    Args:
+        make_executor: Creates an executor writing to a reporter.
+        run_dir: Run directory written by an earlier run.
+        blocks_dir: Directory containing benchmark files.
+        history: History store whose record of the run is replaced.
+
+    Returns:
+        What was retried and how it went.
+    """
+    manifest = read_manifest(run_dir)
+    model: str = manifest["model"]
+    failed: dict[str, dict[int, RunEntry]] = {}
+    for entry in read_entries(run_dir):
+        if entry.error is not None:
+            failed.setdefault(entry.block_id, {})[entry.case_index] = entry
+    result = RetryResult(
+        run_dir=run_dir,
+        model=model,
+        failed=sum(len(cases) for cases in failed.values()),
+    )
+    if not failed:
+        return result
+
+    executor = make_executor(PatchReporter({model: run_dir}))
+    blocks = _run_blocks(executor, manifest, blocks_dir)
+    selection: dict[str, set[int]] = {}
+    for block in blocks:
+        cases = failed.get(block.metadata.id)
+        if not cases:
+            continue
+        digest = block_digest(block)
+        for idx, case in enumerate(iter_cases(block)):
+            entry = cases.get(idx)
+            if entry is not None and entry.case_hash in (None, case_hash(digest, case)):
+                selection.setdefault(block.metadata.id, set()).add(idx)
+                del cases[idx]
+    result.skipped = [
+        f"{e.block_id}/{case_key(e.case_id, e.case_index)}"
+        for cases in failed.values()
+        for e in cases.values()
+    ]
+
+    if selection:
+        summary = await executor.execute_blocks(
+            blocks, manifest.get("category"), [model], only=selection
+        )
+        result.retried = summary.total_cases
+        result.still_failing = summary.failed_cases
+        if history is not None:
+            await asyncio.to_thread(record_updated_run, history, run_dir)
+    return result
+
+
+def _run_blocks(
+    executor: Executor, manifest: dict[str, Any], blocks_dir: Path
+) -> list[EvaluationBlock]:
+    """Load the current version of the blocks a run included, in run order."""
+    found: dict[str, EvaluationBlock] = {}
+    category = manifest.get("category")
+    dirs = [blocks_dir]
+    if category and (blocks_dir / category).is_dir():
+        dirs.append(blocks_dir / category)
+    for path in dirs:
+        for block in executor.load_blocks(path):
+            found.setdefault(block.metadata.id, block)
+    block_ids: list[str] = manifest.get("block_ids", [])
+    return [found[block_id] for block_id in block_ids if block_id in found]
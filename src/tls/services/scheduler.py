@@ -0,0 +1,298 @@
+"""Request ordering for the executor and in-order result release."""
+
+import asyncio
+import hashlib
+import itertools
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from tls.models.benchmark import (
+    EvaluationBlock,
+    OutputLimits,
+    SamplingParams,
+    TestCase,
+)
+from tls.protocols.llm import Message
+
+T = TypeVar("T")
+
+# Supported request orderings
+ORDERINGS = ("dataset", "prefix")
+
+# Number of consecutive cases reordered and batched together. Items are
+# never dispatched more than this far from their dataset position, which
+# bounds the memory of the planning step and of the reorder buffer.
+ORDER_WINDOW = 4096
+
+# Number of distinct requests remembered for deduplication. Identical
+# requests further apart than this are sent again; the bound keeps the
+# table small on suites with millions of cases.
+DEDUP_CACHE_SIZE = 65_536
+
+# Output characters held by remembered results. Long generations fill
+# this before the entry bound, so the table stays within a few tens of
+# MB whatever the output lengths.
+DEDUP_CACHE_CHARS = 16 * 1024 * 1024
+
+
+@dataclass(slots=True)
+class WorkItem:
+    """A single case prepared for dispatch to one model.
+
+    Work items are created for every case and model, so they are kept
+    lean: the block, case, sampling and limits are shared references, and
+    the system message is shared by all cases with the same prompt.
+    """
+
+    seq: int
+    block: EvaluationBlock
+    block_pos: int
+    case_index: int
+    case: TestCase
+    messages: list[Message]
+    sampling: SamplingParams | None = None
+    limits: OutputLimits | None = None
+    response_format: dict[str, Any] | None = None
+
+    @property
+    def samples(self) -> int:
+        """Number of samples requested for the case."""
+        return self.case.samples or 1
+
+    @property
+    def batchable(self) -> bool:
+        """
+        Whether the case fits in a batched request.
+
+        Batched requests go to the completions endpoint, which takes a
+        single sample, a single turn and no response format.
+        """
+        return (
+            self.case.samples in (None, 1)
+            and not self.case.turns
+            and self.response_format is None
+        )
+
+    @property
+    def prefix(self) -> str:
+        """Shared request prefix: the system message (block prompt + context)."""
+        prefix: str = self.messages[0].content
+        return prefix
+
+
+def order_by_prefix(items: list[WorkItem]) -> list[WorkItem]:
+    """
+    Order items so requests sharing a prefix are issued back to back.
+
+    Items are grouped by system message, keeping groups in order of first
+    appearance. Within a group, items are sorted by their remaining
+    messages and follow-up turns, so cases with common input prefixes (and
+    conversations with common openings) are adjacent too. This lets
+    servers with KV prefix caching (vLLM, llama.cpp) reuse cached prompt
+    state instead of evicting it between cases.
+
+    Args:
+        items: Work items in dataset order.
+
+    Returns:
+        The same items in prefix-friendly order.
+    """
+    groups: dict[str, list[WorkItem]] = {}
+    for item in items:
+        groups.setdefault(item.prefix, []).append(item)
+
+    ordered: list[WorkItem] = []
+    for group in groups.values():
+        group.sort(
+            key=lambda item: (
+                [m.content for m in item.messages[1:]] + (item.case.turns or [])
+            )
+        )
+        ordered.extend(group)
+    return ordered
+
+
+def dispatch_units(
+    items: Iterable[WorkItem],
+    batch_size: int,
+    ordering: str = "dataset",
+    window: int = ORDER_WINDOW,
+) -> Iterator[list[WorkItem]]:
+    """
+    Lazily split items into dispatch units.
+
+    Items are consumed in windows of consecutive cases. Within a window,
+    "prefix" ordering is applied, and with batching, items of the same
+    block sharing a system message are chunked together (groups in order
+    of first appearance), so a unit never mixes blocks with different
+    endpoints or settings; otherwise every item is its own unit.
+    Multi-sample and multi-turn items are never batched.
+
+    Args:
+        items: Items in dataset order.
+        batch_size: Maximum items per unit.
+        ordering: "dataset" or "prefix".
+        window: Number of consecutive items planned together.
+
+    Yields:
+        Lists of items sent in one request.
+    """
+    if batch_size <= 1 and ordering == "dataset":
+        for item in items:
+            yield [item]
+        return
+
+    for chunk in itertools.batched(items, window):
+        planned = order_by_prefix(list(chunk)) if ordering == "prefix" else chunk
+        if batch_size <= 1:
+            for item in planned:
+                yield [item]
+            continue
+
+        groups: dict[tuple[int, str], list[WorkItem]] = {}
+        for item in planned:
+            if not item.batchable:
+                yield [item]
+                continue
+            groups.setdefault((item.block_pos, item.prefix), []).append(item)
+        for group in groups.values():
+            for batch in itertools.batched(group, batch_size):
+                yield list(batch)
+
+
+def request_key(messages: list[Message], settings: str) -> bytes:
+    """
+    Digest identifying a request by its messages and settings.
+
+    Args:
+        messages: Chat messages of the request.
+        settings: Serialized request settings (sampling, limits, samples).
+
+    Returns:
+        A 16-byte digest; equal digests mean identical requests.
+    """
+    digest = hashlib.blake2b(settings.encode(), digest_size=16)
+    for message in messages:
+        digest.update(b"\0" + message.role.encode() + b"\0")
+        digest.update(message.content.encode())
+    return digest.digest()
+
+
+class SharedRequests(Generic[T]):
+    """Results of requests sent during a run, shared with identical requests.
+
+    The first case issuing a request registers it; later cases with the
+    same request key await its result instead of sending it again. Only
+    the most recent requests are remembered: at most `size` of them, and
+    once results are weighed, only as many as fit in `max_chars`.
+    """
+
+    def __init__(
+        self,
+        size: int = DEDUP_CACHE_SIZE,
+        max_chars: int = DEDUP_CACHE_CHARS,
+        weigh: Callable[[T], int] | None = None,
+    ) -> None:
+        """
+        Initialize the table.
+
+        Args:
+            size: Maximum number of distinct requests remembered.
+            max_chars: Maximum total weight of the results remembered.
+            weigh: Weight of a result, e.g. its output characters; results
+                are not weighed without it.
+        """
+        self.size = size
+        self.max_chars = max_chars
+        self.weigh = weigh
+        self.shared = 0
+        self._requests: dict[bytes, tuple[str, asyncio.Future[T]]] = {}
+        self._weights: dict[bytes, int] = {}
+        self._chars = 0
+
+    def lookup(self, key: bytes) -> tuple[str, asyncio.Future[T]] | None:
+        """
+        Find the original of a request, counting a hit as shared.
+
+        Returns:
+            The original case reference and its pending or finished result,
+            or None if the request was not seen (recently).
+        """
+        original = self._requests.get(key)
+        if original is not None:
+            self.shared += 1
+        return original
+
+    def register(self, key: bytes, ref: str) -> asyncio.Future[T]:
+        """
+        Register a request about to be sent.
+
+        Args:
+            key: Request key.
+            ref: Reference of the case sending it, recorded on duplicates.
+
+        Returns:
+            Future to resolve with the request's result.
+        """
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._requests[key] = (ref, future)
+        if self.weigh is not None:
+            future.add_done_callback(lambda done: self._resolved(key, done))
+        self._evict()
+        return future
+
+    def _resolved(self, key: bytes, future: asyncio.Future[T]) -> None:
+        """Account for the weight of a finished result still remembered."""
+        original = self._requests.get(key)
+        if original is None or original[1] is not future or self.weigh is None:
+            return
+        if future.cancelled() or future.exception() is not None:
+            return
+        weight = self.weigh(future.result())
+        self._weights[key] = weight
+        self._chars += weight
+        self._evict()
+
+    def _evict(self) -> None:
+        """Forget the oldest requests until the table is within its bounds."""
+        while self._requests and (
+            len(self._requests) > self.size or self._chars > self.max_chars
+        ):
+            oldest = next(iter(self._requests))
+            del self._requests[oldest]
+            self._chars -= self._weights.pop(oldest, 0)
+
+
+class ReorderBuffer(Generic[T]):
+    """Releases results in sequence order regardless of completion order."""
+
+    def __init__(self) -> None:
+        self._next = 0
+        self._pending: dict[int, T] = {}
+
+    @property
+    def next_seq(self) -> int:
+        """Sequence number of the next result to be released."""
+        return self._next
+
+    def add(self, seq: int, value: T) -> list[T]:
+        """
+        Add a result and return every result that is now in order.
+
+        Args:
+            seq: Sequence number of the result (0-based, dense).
+            value: The result.
+
+        Returns:
+            Results ready to be released, in sequence order.
+        """
+        self._pending[seq] = value
+        ready = []
+        while self._next in self._pending:
+            ready.append(self._pending.pop(self._next))
+            self._next += 1
+        return ready
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,324 @@
+"""Precompiled JSON Schema validation of structured model outputs."""
+
+import json
+import re
+from collections.abc import Callable
+from typing import Any
+
+from tls.errors import ConfigError
+
+# Checks a value and returns the first violation, or None if it is valid
+Validator = Callable[[Any], str | None]
+
+# Keywords without effect on validation
+_ANNOTATIONS = frozenset(
+    {"$schema", "$id", "title", "description", "default", "examples", "$comment"}
+)
+
+_TYPES: dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: (
+        isinstance(v, int)
+        and not isinstance(v, bool)
+        or isinstance(v, float)
+        and v.is_integer()
+    ),
+    "number": lambda v: isinstance(v, int | float) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+_FENCE = re.compile(r"^```[\w-]*\s*\n(.*?)\n?```$", re.DOTALL)
+
+# Characters not allowed in a response_format schema name
+_NAME_INVALID = re.compile(r"[^a-zA-Z0-9_-]")
+
+
+def response_format(schema: dict[str, Any], name: str) -> dict[str, Any]:
+    """
+    Build the OpenAI-style "response_format" constraining outputs to a schema.
+
+    Args:
+        schema: JSON Schema document.
+        name: Schema name, e.g. the block ID; invalid characters are replaced
+            and it is cut to the 64 characters the API allows.
+
+    Returns:
+        The "response_format" payload value.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": _NAME_INVALID.sub("_", name)[:64] or "output",
+            "schema": schema,
+        },
+    }
+
+
+def compile_schema(schema: dict[str, Any], path: str = "$") -> Validator:
+    """
+    Compile a JSON Schema into a validator function.
+
+    Supports the keywords used for structured outputs: type, enum, const,
+    properties, required, additionalProperties, items, minItems, maxItems,
+    minLength, maxLength, pattern, minimum, maximum, exclusiveMinimum,
+    exclusiveMaximum, anyOf, oneOf and allOf. The schema is analysed once,
+    so validating an output only runs the resulting checks.
+
+    Args:
+        schema: JSON Schema document.
+        path: Location of the schema within the root document.
+
+    Returns:
+        Function returning the first violation of a value, or None.
+
+    Raises:
+        ConfigError: If the schema uses an unsupported keyword.
+    """
+    checks: list[Validator] = []
+    for keyword, value in schema.items():
+        if keyword in _ANNOTATIONS:
+            continue
+        factory = _KEYWORDS.get(keyword)
+        if factory is None:
+            raise ConfigError(f"Unsupported JSON Schema keyword '{keyword}' at {path}")
+        checks.append(factory(value, schema, path))
+
+    def validate(value: Any) -> str | None:
+        for check in checks:
+            error = check(value)
+            if error is not None:
+                return error
+        return None
+
+    return validate
+
+
+def parse_output(output: str) -> Any:
+    """
+    Parse a model output as JSON.
+
+    A single surrounding Markdown code fence is tolerated, since
+    unconstrained models often wrap JSON in one.
+
+    Raises:
+        ValueError: If the output is not valid JSON.
+    """
+    text = output.strip()
+    fenced = _FENCE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    return json.loads(text)
+
+
+def validate_output(validator: Validator, output: str) -> str | None:
+    """
+    Parse a model output as JSON (see parse_output) and validate it.
+
+    Args:
+        validator: Compiled schema validator.
+        output: Model output text.
+
+    Returns:
+        The first problem found, or None if the output is valid.
+    """
+    try:
+        value = parse_output(output)
+    except ValueError as e:
+        return f"invalid JSON: {e}"
+    return validator(value)
+
+
+def _type(expected: str | list[str], schema: dict[str, Any], path: str) -> Validator:
+    names = [expected] if isinstance(expected, str) else expected
+    unknown = [n for n in names if n not in _TYPES]
+    if unknown:
+        raise ConfigError(f"Unknown JSON Schema type {unknown[0]!r} at {path}")
+    tests = [_TYPES[n] for n in names]
+    label = " or ".join(names)
+
+    def check(value: Any) -> str | None:
+        if any(test(value) for test in tests):
+            return None
+        return f"{path}: expected {label}"
+
+    return check
+
+
+def _enum(options: list[Any], schema: dict[str, Any], path: str) -> Validator:
+    def check(value: Any) -> str | None:
+        if any(_equal(value, option) for option in options):
+            return None
+        return f"{path}: {value!r} is not one of {options!r}"
+
+    return check
+
+
+def _const(expected: Any, schema: dict[str, Any], path: str) -> Validator:
+    return _enum([expected], schema, path)
+
+
+def _properties(
+    properties: dict[str, Any], schema: dict[str, Any], path: str
+) -> Validator:
+    compiled = {
+        name: compile_schema(sub, f"{path}.{name}") for name, sub in properties.items()
+    }
+    extra = schema.get("additionalProperties", True)
+    extra_check = (
+        compile_schema(extra, f"{path}.*") if isinstance(extra, dict) else None
+    )
+
+    def check(value: Any) -> str | None:
+        if not isinstance(value, dict):
+            return None
+        for name, item in value.items():
+            validate = compiled.get(name, extra_check)
+            if validate is None:
+                if extra is False:
+                    return f"{path}: unexpected property {name!r}"
+                continue
+            error = validate(item)
+            if error is not None:
+                return error
+        return None
+
+    return check
+
+
+def _additional_properties(
+    extra: bool | dict[str, Any], schema: dict[str, Any], path: str
+) -> Validator:
+    # Applied together with "properties" when both are present
+    if "properties" in schema:
+        return lambda value: None
+    return _properties({}, schema, path)
+
+
+def _required(names: list[str], schema: dict[str, Any], path: str) -> Validator:
+    def check(value: Any) -> str | None:
+        if not isinstance(value, dict):
+            return None
+        for name in names:
+            if name not in value:
+                return f"{path}: missing property {name!r}"
+        return None
+
+    return check
+
+
+def _items(items: dict[str, Any], schema: dict[str, Any], path: str) -> Validator:
+    validate = compile_schema(items, f"{path}[]")
+
+    def check(value: Any) -> str | None:
+        if not isinstance(value, list):
+            return None
+        for item in value:
+            error = validate(item)
+            if error is not None:
+                return error
+        return None
+
+    return check
+
+
+def _bound(
+    kind: type | tuple[type, ...],
+    measure: Callable[[Any], float],
+    accept: Callable[[float, float], bool],
+    message: str,
+) -> Callable[[float, dict[str, Any], str], Validator]:
+    def factory(limit: float, schema: dict[str, Any], path: str) -> Validator:
+        def check(value: Any) -> str | None:
+            if not isinstance(value, kind) or isinstance(value, bool):
+                return None
+            if accept(measure(value), limit):
+                return None
+            return f"{path}: {message} {limit}"
+
+        return check
+
+    return factory
+
+
+def _pattern(pattern: str, schema: dict[str, Any], path: str) -> Validator:
+    regex = re.compile(pattern)
+
+    def check(value: Any) -> str | None:
+        if not isinstance(value, str) or regex.search(value):
+            return None
+        return f"{path}: does not match {pattern!r}"
+
+    return check
+
+
+def _any_of(options: list[Any], schema: dict[str, Any], path: str) -> Validator:
+    compiled = [compile_schema(sub, path) for sub in options]
+
+    def check(value: Any) -> str | None:
+        if any(validate(value) is None for validate in compiled):
+            return None
+        return f"{path}: matches none of the anyOf schemas"
+
+    return check
+
+
+def _one_of(options: list[Any], schema: dict[str, Any], path: str) -> Validator:
+    compiled = [compile_schema(sub, path) for sub in options]
+
+    def check(value: Any) -> str | None:
+        matches = sum(validate(value) is None for validate in compiled)
+        if matches == 1:
+            return None
+        return f"{path}: matches {matches} of the oneOf schemas instead of 1"
+
+    return check
+
+
+def _all_of(
+    options: list[dict[str, Any]], schema: dict[str, Any], path: str
+) -> Validator:
+    compiled = [compile_schema(sub, path) for sub in options]
+
+    def check(value: Any) -> str | None:
+        for validate in compiled:
+            error = validate(value)
+            if error is not None:
+                return error
+        return None
+
+    return check
+
+
+def _equal(a: Any, b: Any) -> bool:
+    """JSON equality: booleans never equal numbers."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    return bool(a == b)
+
+
+_number = (int, float)
+
+_KEYWORDS: dict[str, Callable[[Any, dict[str, Any], str], Validator]] = {
+    "type": _type,
+    "enum": _enum,
+    "const": _const,
+    "properties": _properties,
+    "additionalProperties": _additional_properties,
+    "required": _required,
+    "items": _items,
+    "minItems": _bound(list, len, lambda n, m: n >= m, "needs at least"),
+    "maxItems": _bound(list, len, lambda n, m: n <= m, "allows at most"),
+    "minLength": _bound(str, len, lambda n, m: n >= m, "shorter than"),
+    "maxLength": _bound(str, len, lambda n, m: n <= m, "longer than"),
+    "minimum": _bound(_number, float, lambda n, m: n >= m, "below"),
+    "maximum": _bound(_number, float, lambda n, m: n <= m, "above"),
+    "exclusiveMinimum": _bound(_number, float, lambda n, m: n > m, "not above"),
+    "exclusiveMaximum": _bound(_number, float, lambda n, m: n < m, "not below"),
+    "pattern": _pattern,
+    "anyOf": _any_of,
+    "oneOf": _one_of,
+    "allOf": _all_of,
+}
@@ -0,0 +1,203 @@
+"""Output scorers and scoring helpers for sampled outputs."""
+
+import re
+import time
+from collections.abc import Callable
+from math import comb
+
+from tls.services.schema import parse_output
+
+# Scores an output against a case's expected value, from 0.0 to 1.0
+Scorer = Callable[[str, str], float]
+
+# A score and the seconds spent computing it
+Score = tuple[float | None, float]
+
+_WORD = re.compile(r"\w+")
+
+
+def sample_passes(output: str, expected: str) -> bool:
+    """
+    Check whether a sampled output contains the expected answer.
+
+    Matching is case-insensitive and ignores surrounding whitespace of the
+    expected value, so answers embedded in reasoning ("FINAL ANSWER: Yes")
+    still count.
+
+    Args:
+        output: Model output.
+        expected: Expected answer.
+
+    Returns:
+        True if the expected answer appears in the output.
+    """
+    needle = expected.strip().casefold()
+    return bool(needle) and needle in output.casefold()
+
+
+def pass_at_k(n: int, c: int, k: int) -> float:
+    """
+    Unbiased pass@k estimate for one case.
+
+    Args:
+        n: Number of samples generated.
+        c: Number of passing samples.
+        k: Number of attempts allowed (k <= n).
+
+    Returns:
+        Probability that at least one of k samples drawn without
+        replacement passes: 1 - C(n - c, k) / C(n, k).
+    """
+    if n - c < k:
+        return 1.0
+    return 1.0 - comb(n - c, k) / comb(n, k)
+
+
+def exact_match(output: str, expected: str) -> float:
+    """1.0 if the output equals the expected value, ignoring surrounding space."""
+    return float(output.strip() == expected.strip())
+
+
+def contains_match(output: str, expected: str) -> float:
+    """1.0 if the output contains the expected answer (see sample_passes)."""
+    return float(sample_passes(output, expected))
+
+
+def json_match(output: str, expected: str) -> float:
+    """
+    1.0 if the output is JSON equal to the expected JSON document.
+
+    A Markdown code fence around the output is tolerated; outputs that are
+    not valid JSON score 0.0.
+
+    Raises:
+        ValueError: If the expected value is not valid JSON.
+    """
+    target = parse_output(expected)
+    try:
+        value = parse_output(output)
+    except ValueError:
+        return 0.0
+    return float(value == target)
+
+
+def regex_match(output: str, expected: str) -> float:
+    """
+    1.0 if the expected regular expression matches anywhere in the output.
+
+    Raises:
+        re.error: If the expected value is not a valid pattern.
+    """
+    return float(re.search(expected, output) is not None)
+
+
+def edit_similarity(output: str, expected: str) -> float:
+    """
+    Normalized Levenshtein similarity: 1 - distance / length of the longer text.
+
+    Runs in O(len(output) * len(expected)) time and linear memory.
+    """
+    a, b = output.strip(), expected.strip()
+    if len(a) < len(b):
+        a, b = b, a
+    if not a:
+        return 1.0
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            )
+        previous = current
+    return 1.0 - previous[-1] / len(a)
+
+
+def rouge_l(output: str, expected: str) -> float:
+    """
+    ROUGE-L F1: longest common subsequence of the lowercased words.
+
+    Returns:
+        2 * LCS / (output words + expected words); 1.0 if both are empty.
+    """
+    a = _WORD.findall(output.casefold())
+    b = _WORD.findall(expected.casefold())
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for word_a in a:
+        current = [0]
+        for j, word_b in enumerate(b, start=1):
+            if word_a == word_b:
+                current.append(previous[j - 1] + 1)
+            else:
+                current.append(max(previous[j], current[j - 1]))
+        previous = current
+    return 2 * previous[-1] / (len(a) + len(b))
+
+
+SCORERS: dict[str, Scorer] = {
+    "exact": exact_match,
+    "contains": contains_match,
+    "json": json_match,
+    "regex": regex_match,
+    "edit": edit_similarity,
+    "rouge": rouge_l,
+}
+
+
+def passing_samples(
+    outputs: list[str],
+    expected: str,
+    scorer: str | None = None,
+    threshold: float = 1.0,
+) -> int | None:
+    """
+    Count the sampled outputs of a case that pass.
+
+    Args:
+        outputs: Sampled outputs.
+        expected: Expected value of the case.
+        scorer: Scorer of the block; None checks that the expected answer
+            appears in the output (see sample_passes).
+        threshold: Score a sample needs to pass when there is a scorer.
+
+    Returns:
+        Number of passing samples, or None if the scorer cannot use the
+        expected value (e.g. an invalid pattern).
+    """
+    if scorer is None:
+        return sum(sample_passes(output, expected) for output in outputs)
+    score = SCORERS[scorer]
+    try:
+        return sum(score(output, expected) >= threshold for output in outputs)
+    except (ValueError, re.error):
+        return None
+
+
+def score_batch(jobs: list[tuple[str, str, str]]) -> list[Score]:
+    """
+    Score a batch of outputs; runs in scoring worker processes.
+
+    Args:
+        jobs: (scorer name, output, expected value) triples.
+
+    Returns:
+        Score and scoring seconds per job. Jobs whose expected value the
+        scorer cannot use (e.g. an invalid pattern) get no score.
+    """
+    scores: list[Score] = []
+    for name, output, expected in jobs:
+        started = time.perf_counter()
+        try:
+            score: float | None = SCORERS[name](output, expected)
+        except (ValueError, re.error):
+            score = None
+        scores.append((score, time.perf_counter() - started))
+    return scores
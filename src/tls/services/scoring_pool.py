@@ -0,0 +1,129 @@
+"""Batched scoring of outputs in worker processes, off the event loop."""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from types import TracebackType
+
+from tls.services.scoring import Score, score_batch
+
+# Jobs sent to a worker process in one go
+SCORING_BATCH_SIZE = 64
+
+
+class ScoringPool:
+    """Computes scores in a process pool while requests are in flight.
+
+    Scoring metrics such as edit distance or ROUGE are CPU-bound and would
+    stall dispatch if run on the event loop. Jobs are collected and sent
+    to the pool in batches, when `batch_size` jobs are pending or at the
+    end of the current event loop iteration, which amortizes the
+    inter-process round trip. Worker processes are started on the first
+    job, so runs without scorers never start any.
+    """
+
+    def __init__(
+        self, workers: int | None = None, batch_size: int = SCORING_BATCH_SIZE
+    ) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Worker processes; None starts one per CPU, 0 scores on
+                the event loop instead.
+            batch_size: Maximum jobs per batch.
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: list[tuple[tuple[str, str, str], asyncio.Future[Score]]] = []
+        self._flush_scheduled = False
+        self._running: set[asyncio.Future[list[Score]]] = set()
+
+    async def __aenter__(self) -> "ScoringPool":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    def submit(self, scorer: str, output: str, expected: str) -> asyncio.Future[Score]:
+        """
+        Queue an output for scoring.
+
+        Args:
+            scorer: Scorer name (see SCORERS).
+            output: Model output.
+            expected: Expected value of the case.
+
+        Returns:
+            Future resolving to the score and the seconds spent on it.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Score] = loop.create_future()
+        self._pending.append(((scorer, output, expected), future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self) -> None:
+        """Send the pending jobs as one batch."""
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        jobs = [job for job, _ in batch]
+        futures = [future for _, future in batch]
+        if self.workers == 0:
+            _resolve(futures, score_batch(jobs))
+            return
+        if self._pool is None:
+            # Spawned workers are safe in a process running I/O threads,
+            # unlike forked ones
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        running = asyncio.get_running_loop().run_in_executor(
+            self._pool, score_batch, jobs
+        )
+        self._running.add(running)
+
+        def done(task: asyncio.Future[list[Score]]) -> None:
+            self._running.discard(task)
+            if task.cancelled():
+                for future in futures:
+                    future.cancel()
+                return
+            error = task.exception()
+            if error is None:
+                _resolve(futures, task.result())
+                return
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+
+        running.add_done_callback(done)
+
+    async def close(self) -> None:
+        """Score the pending jobs and stop the worker processes."""
+        self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _resolve(futures: list[asyncio.Future[Score]], scores: list[Score]) -> None:
+    """Set the results of scored jobs whose futures are still awaited."""
+    for future, score in zip(futures, scores):
+        if not future.done():
+            future.set_result(score)
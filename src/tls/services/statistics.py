@@ -0,0 +1,245 @@
+"""Statistical helpers for summarizing and comparing runs.
+
+Aggregates over large samples use NumPy when it is installed (the "stats"
+extra) and otherwise fall back to pure Python with the same results, up
+to resampling noise.
+"""
+
+import importlib
+import math
+import random
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from statistics import NormalDist, fmean, stdev
+from types import ModuleType
+from typing import Any
+
+# Default confidence level of confidence intervals
+CONFIDENCE = 0.95
+
+# Bootstrap resamples per confidence interval
+BOOTSTRAP_RESAMPLES = 1000
+
+# Samples with at most this many distinct values (e.g. pass/fail scores)
+# are resampled through the counts of each value, at a cost independent of
+# the sample size
+MULTINOMIAL_MAX_VALUES = 256
+
+# Largest samples of many distinct values resampled value by value, with
+# and without NumPy; beyond, the normal approximation the bootstrap
+# converges to is used
+BOOTSTRAP_MAX_SIZE = 100_000
+PURE_BOOTSTRAP_MAX_SIZE = 5_000
+
+# Resampled values drawn per NumPy chunk, bounding memory
+_CHUNK_ELEMENTS = 1 << 22
+
+
+@lru_cache(maxsize=1)
+def _numpy() -> ModuleType | None:
+    """NumPy if installed, else None."""
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        return None
+
+
+@dataclass
+class MeanEstimate:
+    """Sample mean with a bootstrap confidence interval."""
+
+    count: int
+    mean: float
+    low: float
+    high: float
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Compute a percentile with linear interpolation.
+
+    Args:
+        values: Sample values (need not be sorted).
+        q: Percentile in the range [0, 100].
+
+    Returns:
+        The interpolated percentile, or NaN for an empty sample.
+    """
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def percentiles(values: Sequence[float], qs: Sequence[float]) -> list[float]:
+    """
+    Compute several percentiles of a sample, sorting it only once.
+
+    Args:
+        values: Sample values (need not be sorted).
+        qs: Percentiles in the range [0, 100].
+
+    Returns:
+        The interpolated percentiles (as percentile()), or NaNs for an
+        empty sample.
+    """
+    if not values:
+        return [math.nan] * len(qs)
+    np = _numpy()
+    if np is not None:
+        return [float(v) for v in np.percentile(np.asarray(values, dtype=float), qs)]
+    ordered = sorted(values)
+    return [percentile(ordered, q) for q in qs]
+
+
+def estimate_mean(
+    values: Sequence[float],
+    confidence: float = CONFIDENCE,
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = 0,
+) -> MeanEstimate | None:
+    """
+    Estimate the mean of a sample with a percentile bootstrap interval.
+
+    Resampling is vectorized with NumPy when available. Samples of few
+    distinct values are resampled through multinomial draws of their
+    value counts, which is exact and takes the same time for a thousand
+    or a million values. Large samples of many distinct values use the
+    normal approximation instead.
+
+    Args:
+        values: Sample values.
+        confidence: Confidence level of the interval.
+        resamples: Number of bootstrap resamples.
+        seed: Seed of the resampling, so intervals are reproducible.
+
+    Returns:
+        The mean and its confidence interval, or None for an empty sample.
+    """
+    n = len(values)
+    if n == 0:
+        return None
+    mean = fmean(values)
+    if n == 1:
+        return MeanEstimate(count=1, mean=mean, low=mean, high=mean)
+
+    np = _numpy()
+    if np is not None:
+        means = _bootstrap_numpy(np, values, resamples, seed)
+    else:
+        means = _bootstrap_pure(values, resamples, seed)
+
+    alpha = 1 - confidence
+    if means is None:
+        margin = NormalDist().inv_cdf(1 - alpha / 2) * stdev(values) / math.sqrt(n)
+        return MeanEstimate(count=n, mean=mean, low=mean - margin, high=mean + margin)
+    ordered = sorted(means)
+    return MeanEstimate(
+        count=n,
+        mean=mean,
+        low=float(percentile(ordered, 100 * alpha / 2)),
+        high=float(percentile(ordered, 100 * (1 - alpha / 2))),
+    )
+
+
+def _bootstrap_numpy(
+    np: ModuleType, values: Sequence[float], resamples: int, seed: int
+) -> Any:
+    """Means of bootstrap resamples drawn with NumPy, or None if too large."""
+    data = np.asarray(values, dtype=float)
+    n = data.size
+    rng = np.random.default_rng(seed)
+    distinct, counts = np.unique(data, return_counts=True)
+    if distinct.size <= MULTINOMIAL_MAX_VALUES:
+        draws = rng.multinomial(n, counts / n, size=resamples)
+        return draws @ distinct / n
+    if n > BOOTSTRAP_MAX_SIZE:
+        return None
+    means = np.empty(resamples)
+    rows = max(1, _CHUNK_ELEMENTS // n)
+    for start in range(0, resamples, rows):
+        stop = min(start + rows, resamples)
+        indices = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = data[indices].mean(axis=1)
+    return means
+
+
+def _bootstrap_pure(
+    values: Sequence[float], resamples: int, seed: int
+) -> list[float] | None:
+    """Means of bootstrap resamples drawn in pure Python, or None if too large."""
+    n = len(values)
+    rng = random.Random(seed)
+    counts = list(Counter(values).items())
+    if len(counts) > MULTINOMIAL_MAX_VALUES:
+        if n > PURE_BOOTSTRAP_MAX_SIZE:
+            return None
+        return [fmean(rng.choices(values, k=n)) for _ in range(resamples)]
+
+    means = []
+    for _ in range(resamples):
+        # A multinomial draw of the value counts, as a chain of binomials
+        total = 0.0
+        remaining = n
+        left = n
+        for value, count in counts[:-1]:
+            drawn = rng.binomialvariate(remaining, count / left) if remaining else 0
+            total += value * drawn
+            remaining -= drawn
+            left -= count
+        total += counts[-1][0] * remaining
+        means.append(total / n)
+    return means
+
+
+def wilcoxon_signed_rank(differences: Sequence[float]) -> tuple[float, float]:
+    """
+    Paired Wilcoxon signed-rank test using the normal approximation.
+
+    Zero differences are dropped and tied absolute differences receive
+    their average rank, with the variance corrected for ties.
+
+    Args:
+        differences: Paired differences (b - a).
+
+    Returns:
+        Tuple of (z statistic, two-sided p-value). The p-value is 1.0 when
+        there are no non-zero differences.
+    """
+    nonzero = [d for d in differences if d != 0]
+    n = len(nonzero)
+    if n == 0:
+        return 0.0, 1.0
+
+    ordered = sorted(nonzero, key=abs)
+    w_plus = 0.0
+    tie_correction = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and abs(ordered[j + 1]) == abs(ordered[i]):
+            j += 1
+        # Ranks i+1..j+1 share their average
+        rank = (i + j + 2) / 2
+        for k in range(i, j + 1):
+            if ordered[k] > 0:
+                w_plus += rank
+        ties = j - i + 1
+        tie_correction += ties**3 - ties
+        i = j + 1
+
+    mean = n * (n + 1) / 4
+    variance = n * (n + 1) * (2 * n + 1) / 24 - tie_correction / 48
+    if variance <= 0:
+        return 0.0, 1.0
+
+    z = (w_plus - mean) / math.sqrt(variance)
+    p_value = math.erfc(abs(z) / math.sqrt(2))
+    return z, p_value
@@ -0,0 +1,139 @@
+"""Timing spans for the executor pipeline, exported as Chrome trace JSON."""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+
+class _NullSpan:
+    """Span that does nothing; shared by disabled tracers."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Span recording a complete ("X") event on exit."""
+
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(
+        self, tracer: "Tracer", name: str, category: str, args: dict[str, Any]
+    ) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.start, end, self.args)
+
+
+class Tracer:
+    """Collects timing spans and writes them in the Chrome trace event format.
+
+    The output loads in chrome://tracing, Perfetto and speedscope. When the
+    tracer is disabled, span() returns a shared no-op context manager so the
+    instrumented code pays only for a method call.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        """
+        Initialize the tracer.
+
+        Args:
+            enabled: Whether spans are recorded.
+        """
+        self.enabled = enabled
+        self.events: list[dict[str, Any]] = []
+        self._origin = time.perf_counter_ns()
+        self._lanes: dict[int, int] = {}
+
+    def span(self, name: str, category: str = "executor", **args: Any) -> Any:
+        """
+        Time a block of code.
+
+        Args:
+            name: Span name shown in the trace viewer.
+            category: Span category used for filtering.
+            **args: Extra attributes attached to the span.
+
+        Returns:
+            A context manager recording the span on exit.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start_ns: int,
+        end_ns: int,
+        args: dict[str, Any],
+    ) -> None:
+        """Record a completed span given perf_counter_ns timestamps."""
+        self.events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start_ns - self._origin) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": os.getpid(),
+                "tid": self._lane(),
+                "args": args,
+            }
+        )
+
+    def _lane(self) -> int:
+        """Map the current asyncio task to a small, stable thread id."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task is not None else 0
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = len(self._lanes)
+        return lane
+
+    def write(self, path: Path) -> None:
+        """
+        Write recorded spans as a Chrome trace JSON file.
+
+        Args:
+            path: Destination file path.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"traceEvents": self.events, "displayTimeUnit": "ms"})
+        )
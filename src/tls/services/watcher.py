@@ -0,0 +1,262 @@
+"""Incremental re-runs of changed cases while benchmark files are edited."""
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from tls.models.benchmark import EvaluationBlock
+from tls.models.report import RunEntry
+from tls.protocols.reporter import ReporterProtocol
+from tls.services.dataset import block_digest, case_hash, iter_cases
+from tls.services.executor import Executor
+from tls.services.history import HistoryStore, record_updated_run
+from tls.services.reporter import (
+    FileSystemReporter,
+    PatchReporter,
+    latest_run_dir,
+    read_entries,
+    rewrite_run,
+)
+
+# Seconds between two looks at the watched files
+POLL_INTERVAL = 0.5
+
+# Size and modification time of every watched file, by path
+Snapshot = dict[Path, tuple[int, int]]
+
+
+class BlockWatcher:
+    """Detects changes to benchmark files by polling their metadata.
+
+    Each poll only stats the block and dataset files (*.json, *.jsonl), so
+    watching costs next to nothing however large the datasets are, and
+    works the same on every platform and file system. A change is reported
+    once the files stayed unchanged for one more poll, so editors saving
+    in several steps trigger a single update.
+    """
+
+    def __init__(self, path: Path, interval: float = POLL_INTERVAL) -> None:
+        """
+        Initialize the watcher with the current state of the files.
+
+        Args:
+            path: Benchmark file or directory to watch (recursively).
+            interval: Seconds between polls.
+        """
+        self.path = path
+        self.interval = interval
+        self._last = self.snapshot()
+
+    def snapshot(self) -> Snapshot:
+        """Current size and modification time of the watched files."""
+        paths = [self.path] if self.path.is_file() else self.path.rglob("*.json*")
+        state: Snapshot = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            state[path] = (stat.st_size, stat.st_mtime_ns)
+        return state
+
+    async def wait(self) -> None:
+        """Wait until the watched files change and settle."""
+        current = self._last
+        while current == self._last:
+            await asyncio.sleep(self.interval)
+            current = self.snapshot()
+        while True:
+            await asyncio.sleep(self.interval)
+            settled = self.snapshot()
+            if settled == current:
+                break
+            current = settled
+        self._last = current
+
+
+@dataclass
+class BlockCases:
+    """Content hashes and IDs of a block's current cases, in dataset order."""
+
+    block_id: str
+    hashes: list[str]
+    ids: list[str | None]
+
+
+def scan_cases(block: EvaluationBlock) -> BlockCases:
+    """Hash the cases of a block (see case_hash)."""
+    digest = block_digest(block)
+    hashes: list[str] = []
+    ids: list[str | None] = []
+    for case in iter_cases(block):
+        hashes.append(case_hash(digest, case))
+        ids.append(case.id)
+    return BlockCases(block_id=block.metadata.id, hashes=hashes, ids=ids)
+
+
+def changed_cases(
+    current: list[BlockCases], entries: list[RunEntry]
+) -> dict[str, set[int]]:
+    """
+    Find the cases without an entry of identical content.
+
+    Args:
+        current: Cases of the blocks as they are now.
+        entries: Entries of the run to update.
+
+    Returns:
+        Indices of new or modified cases, per block ID with any.
+    """
+    known = {(e.block_id, e.case_hash) for e in entries if e.case_hash is not None}
+    changed: dict[str, set[int]] = {}
+    for block in current:
+        indices = {
+            idx
+            for idx, content in enumerate(block.hashes)
+            if (block.block_id, content) not in known
+        }
+        if indices:
+            changed[block.block_id] = indices
+    return changed
+
+
+def merge_cases(
+    current: list[BlockCases],
+) -> Callable[[list[RunEntry], list[RunEntry]], list[RunEntry]]:
+    """
+    Build the merge of re-executed entries into a run for the current cases.
+
+    The merged run has one entry per current case, in dataset order: the
+    re-executed entry, or else the earlier entry of identical content,
+    renumbered if the case moved. Entries of removed cases are dropped;
+    entries of blocks not among the current ones are kept as they are.
+
+    Args:
+        current: Cases of the blocks as they are now.
+
+    Returns:
+        A merge function for PatchReporter.
+    """
+
+    def merge(old: list[RunEntry], new: list[RunEntry]) -> list[RunEntry]:
+        executed = {(e.block_id, e.case_index): e for e in new}
+        reusable: dict[tuple[str, str], RunEntry] = {}
+        for entry in old:
+            if entry.case_hash is not None:
+                reusable.setdefault((entry.block_id, entry.case_hash), entry)
+        block_ids = {block.block_id for block in current}
+        merged = [e for e in old if e.block_id not in block_ids]
+        for block in current:
+            for idx, (content, case_id) in enumerate(zip(block.hashes, block.ids)):
+                entry = executed.get((block.block_id, idx))
+                if entry is None:
+                    entry = reusable.get((block.block_id, content))
+                    if entry is None:
+                        # Changed again while running; the next update runs it
+                        continue
+                    if (entry.case_index, entry.case_id) != (idx, case_id):
+                        entry = entry.model_copy(
+                            update={"case_index": idx, "case_id": case_id}
+                        )
+                merged.append(entry)
+        return merged
+
+    return merge
+
+
+@dataclass
+class RunUpdate:
+    """What an incremental update did for one model."""
+
+    model: str
+    run_dir: Path | None
+    executed: int = 0
+    failed: int = 0
+    removed: int = 0
+    full_run: bool = False
+
+
+async def update_runs(
+    make_executor: Callable[[ReporterProtocol], Executor],
+    reports_dir: Path,
+    blocks_dir: Path,
+    models: list[str],
+    target_file: Path | None = None,
+    compression: str = "none",
+    reporter: ReporterProtocol | None = None,
+    history: HistoryStore | None = None,
+) -> list[RunUpdate]:
+    """
+    Bring the latest run of every model up to date with the benchmark files.
+
+    Only new or modified cases are executed, and their entries are merged
+    into the model's latest run directory. Models without a run get a
+    full run, written with the given compression; updated runs keep
+    their own. Updates only rewrite the run directory (and its history,
+    if a store is given): other reporter backends receive full runs only,
+    as reporters have no way to patch a run they already finalized.
+
+    Args:
+        make_executor: Creates an executor writing to a reporter.
+        reports_dir: Base directory of the reports.
+        blocks_dir: Directory containing benchmark files.
+        models: Models to update.
+        target_file: Optional specific benchmark file.
+        compression: Compression of the reports of full runs.
+        reporter: Reporter of full runs; defaults to run directories
+            written with the given compression.
+        history: History store whose record of updated runs is replaced.
+
+    Returns:
+        One update per model.
+    """
+    executor = make_executor(reporter or FileSystemReporter(reports_dir, compression))
+    blocks, category = executor.select_blocks(blocks_dir, target_file)
+    current = [scan_cases(block) for block in blocks]
+    current_ids = {b.block_id for b in current}
+    current_hashes = {(b.block_id, h) for b in current for h in b.hashes}
+    merge = merge_cases(current)
+
+    updates = []
+    for model in models:
+        run_dir = latest_run_dir(reports_dir, category, model)
+        if run_dir is None:
+            summary = await executor.execute(blocks_dir, [model], target_file)
+            updates.append(
+                RunUpdate(
+                    model=model,
+                    run_dir=summary.models[0].run_dir,
+                    executed=summary.total_cases,
+                    failed=summary.failed_cases,
+                    full_run=True,
+                )
+            )
+            continue
+
+        entries = read_entries(run_dir)
+        update = RunUpdate(model=model, run_dir=run_dir)
+        update.removed = sum(
+            1
+            for e in entries
+            if e.block_id in current_ids
+            and (e.block_id, e.case_hash) not in current_hashes
+        )
+        changed = changed_cases(current, entries)
+        updated = bool(changed)
+        if changed:
+            patcher = make_executor(PatchReporter({model: run_dir}, merge))
+            summary = await patcher.execute(
+                blocks_dir, [model], target_file, only=changed
+            )
+            update.executed = summary.total_cases
+            update.failed = summary.failed_cases
+        else:
+            merged = merge(entries, [])
+            updated = merged != entries
+            if updated:
+                await rewrite_run(run_dir, merged)
+        if updated and history is not None:
+            await asyncio.to_thread(record_updated_run, history, run_dir)
+        updates.append(update)
+    return updates
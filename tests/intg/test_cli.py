@@ -1,11 +1,17 @@
 """Integration tests for CLI commands."""
 
+import json
+import re
 import tempfile
 from pathlib import Path
+from typing import Any
 
+import pytest
 from typer.testing import CliRunner
 
+from tls.errors import TlsError
 from tls.main import app
+from tls.services.executor import Executor
 
 
 class TestCLIIntegration:
@@ -86,3 +92,133 @@ class TestRunCommand:
                 )
             finally:
                 os.chdir(original_dir)
+
+
+class TestRunCommandExecution:
+    """Integration tests running benchmarks through the CLI."""
+
+    def test_run_records_unreachable_endpoint_errors(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A run against an unreachable endpoint completes with failed cases."""
+        monkeypatch.chdir(tmp_path)
+        assert cli_runner.invoke(app, ["init"]).exit_code == 0
+        config = (tmp_path / "telescope.ini").read_text()
+        config = re.sub(
+            r"^endpoint = .*$", "endpoint = http://127.0.0.1:9", config, flags=re.M
+        )
+        (tmp_path / "telescope.ini").write_text(config)
+
+        result = cli_runner.invoke(
+            app, ["run", "--model", "m1", "--timeout", "5", "--concurrency", "2"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Run Summary" in result.output
+        assert "Failed" in result.output
+        assert list((tmp_path / "reports").rglob("entries.jsonl"))
+
+    def test_run_writes_trace_when_run_fails(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The trace is written even if the run ends with an error."""
+        monkeypatch.chdir(tmp_path)
+        assert cli_runner.invoke(app, ["init"]).exit_code == 0
+
+        async def failing_execute(self: Executor, *args: Any, **kwargs: Any) -> None:
+            with self.tracer.span("load_blocks"):
+                pass
+            raise TlsError("endpoint went away")
+
+        monkeypatch.setattr(Executor, "execute", failing_execute)
+        trace = tmp_path / "trace.json"
+
+        result = cli_runner.invoke(app, ["run", "--model", "m1", "--trace", str(trace)])
+
+        assert result.exit_code == 1
+        assert "endpoint went away" in result.output
+        events = json.loads(trace.read_text())["traceEvents"]
+        assert any(e["name"] == "load_blocks" for e in events)
+
+    def test_run_plan_sends_nothing(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """--plan reports cases and estimates without contacting the endpoint."""
+        monkeypatch.chdir(tmp_path)
+        assert cli_runner.invoke(app, ["init"]).exit_code == 0
+
+        result = cli_runner.invoke(app, ["run", "--plan", "--model", "m1"])
+
+        assert result.exit_code == 0, result.output
+        assert "Run Plan" in result.output
+        assert "Prompt tokens" in result.output
+        assert "No previous runs" in result.output
+        assert not (tmp_path / "reports" / "history.sqlite3").exists()
+
+    def test_run_watch_rejects_single_case(
+        self, cli_runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Watch mode merges whole blocks, so --id is refused."""
+        monkeypatch.chdir(tmp_path)
+        assert cli_runner.invoke(app, ["init"]).exit_code == 0
+
+        result = cli_runner.invoke(app, ["run", "--watch", "--id", "c1"])
+
+        assert result.exit_code == 1
+        assert "--watch cannot be combined with --id" in result.output
+
+
+class TestCompareCommand:
+    """Integration tests for the compare command."""
+
+    def test_compare_reports_changes(self, cli_runner: CliRunner) -> None:
+        """Comparing two run directories lists changed outputs."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            run_dirs = []
+            for name, output in (("a", "old"), ("b", "new")):
+                run_dir = Path(tmpdir) / name
+                run_dir.mkdir()
+                entry = {
+                    "block_id": "block",
+                    "case_index": 0,
+                    "case_id": "c1",
+                    "input": "in",
+                    "output": output,
+                    "model": "m",
+                    "latency_seconds": 0.5,
+                }
+                (run_dir / "entries.jsonl").write_text(json.dumps(entry) + "\n")
+                run_dirs.append(str(run_dir))
+
+            result = cli_runner.invoke(app, ["compare", *run_dirs])
+
+            assert result.exit_code == 0
+            assert "Changed outputs: 1" in result.output
+            assert "block / c1" in result.output
+
+    def test_compare_missing_entries_shows_error(self, cli_runner: CliRunner) -> None:
+        """Directories without structured entries are rejected."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = cli_runner.invoke(app, ["compare", tmpdir, tmpdir])
+
+            assert result.exit_code == 1
+            assert "entries.jsonl" in result.output
+
+
+class TestHistoryCommand:
+    """Integration tests for the history command."""
+
+    def test_history_without_runs_shows_error(self, cli_runner: CliRunner) -> None:
+        """History without a store points the user at 'tls run'."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            import os
+
+            original_dir = os.getcwd()
+            try:
+                os.chdir(tmpdir)
+                result = cli_runner.invoke(app, ["history"])
+
+                assert result.exit_code == 1
+                assert "tls run" in result.output
+            finally:
+                os.chdir(original_dir)
@@ -0,0 +1,177 @@
+"""Unit tests for run comparison."""
+
+import gzip
+import json
+import random
+import time
+from pathlib import Path
+from statistics import stdev
+
+import pytest
+
+from tls.services import statistics
+from tls.services.comparer import compare_runs, load_run
+from tls.services.reporter import ENTRIES_FILENAME
+from tls.services.statistics import (
+    estimate_mean,
+    percentile,
+    percentiles,
+    wilcoxon_signed_rank,
+)
+
+
+def write_run(run_dir: Path, entries: list[dict[str, object]]) -> Path:
+    """Write a minimal entries.jsonl file for a run directory."""
+    run_dir.mkdir(parents=True, exist_ok=True)
+    lines = []
+    for entry in entries:
+        data = {"block_id": "b", "input": "in", "model": "m", **entry}
+        lines.append(json.dumps(data))
+    (run_dir / ENTRIES_FILENAME).write_text("\n".join(lines) + "\n")
+    return run_dir
+
+
+class TestStatistics:
+    """Tests for statistical helpers."""
+
+    def test_percentile_interpolates(self) -> None:
+        """Percentiles interpolate linearly between ranks."""
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+        assert percentile([5.0], 90) == 5.0
+
+    def test_wilcoxon_detects_consistent_shift(self) -> None:
+        """A consistent positive shift is significant."""
+        z, p = wilcoxon_signed_rank([0.1 * (i + 1) for i in range(30)])
+        assert z > 0
+        assert p < 0.001
+
+    def test_wilcoxon_without_differences(self) -> None:
+        """All-zero differences are not significant."""
+        assert wilcoxon_signed_rank([0.0, 0.0]) == (0.0, 1.0)
+
+    def test_percentiles_match_percentile(self) -> None:
+        """Several percentiles at once agree with one at a time."""
+        values = [random.Random(1).random() for _ in range(101)]
+        expected = [percentile(values, q) for q in (50, 90, 99)]
+        assert percentiles(values, (50, 90, 99)) == pytest.approx(expected)
+
+    def test_estimate_mean_brackets_mean(self) -> None:
+        """The interval contains the sample mean and is reproducible."""
+        rng = random.Random(2)
+        values = [rng.gauss(0.5, 0.1) for _ in range(500)]
+        estimate = estimate_mean(values)
+        assert estimate is not None
+        assert estimate.count == 500
+        assert estimate.low < estimate.mean < estimate.high
+        assert estimate.high - estimate.low == pytest.approx(
+            2 * 1.96 * 0.1 / 500**0.5, rel=0.25
+        )
+        assert estimate_mean(values) == estimate
+        assert estimate_mean([]) is None
+
+    @pytest.mark.parametrize("numpy", [True, False])
+    def test_estimate_mean_of_large_pass_fail_sample(
+        self, numpy: bool, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A million pass/fail scores are resampled through their counts."""
+        if not numpy:
+            monkeypatch.setattr(statistics, "_numpy", lambda: None)
+        elif statistics._numpy() is None:
+            pytest.skip("numpy is not installed")
+        values = [1.0] * 800_000 + [0.0] * 200_000
+
+        start = time.perf_counter()
+        estimate = estimate_mean(values)
+        assert time.perf_counter() - start < 10
+
+        assert estimate is not None
+        assert estimate.mean == pytest.approx(0.8)
+        # Standard error sqrt(0.8 * 0.2 / 1e6) = 0.0004
+        assert estimate.low == pytest.approx(0.8 - 0.00078, abs=0.0002)
+        assert estimate.high == pytest.approx(0.8 + 0.00078, abs=0.0002)
+
+    def test_estimate_mean_of_large_continuous_sample(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Too many distinct values for resampling use the normal approximation."""
+        monkeypatch.setattr(statistics, "_numpy", lambda: None)
+        values = [i / 10_000 for i in range(10_000)]
+        estimate = estimate_mean(values)
+        assert estimate is not None
+        margin = 1.959964 * stdev(values) / 100
+        assert estimate.low == pytest.approx(estimate.mean - margin)
+        assert estimate.high == pytest.approx(estimate.mean + margin)
+
+
+class TestCompareRuns:
+    """Tests for aligning and diffing runs."""
+
+    def test_aligns_by_case_id(self, tmp_path: Path) -> None:
+        """Entries are matched by case ID regardless of position."""
+        run_a = write_run(
+            tmp_path / "a",
+            [
+                {"case_id": "x", "case_index": 0, "output": "1", "score": 1.0},
+                {"case_id": "y", "case_index": 1, "output": "2", "score": 0.0},
+                {"case_id": "z", "case_index": 2, "output": "3"},
+            ],
+        )
+        run_b = write_run(
+            tmp_path / "b",
+            [
+                {"case_id": "y", "case_index": 0, "output": "2b", "score": 1.0},
+                {"case_id": "x", "case_index": 1, "output": "1", "score": 1.0},
+                {"case_id": "w", "case_index": 2, "output": "4", "error": "boom"},
+            ],
+        )
+
+        report = compare_runs(load_run(run_a), load_run(run_b))
+
+        assert report.matched == 2
+        assert report.changed_outputs == [("b", "y")]
+        assert report.only_a == [("b", "z")]
+        assert report.only_b == [("b", "w")]
+        assert report.score_deltas == {("b", "x"): 0.0, ("b", "y"): 1.0}
+        assert report.mean_score_delta == 0.5
+        delta = report.score_delta_estimate()
+        assert delta is not None
+        assert (delta.count, delta.mean) == (2, 0.5)
+        assert delta.low <= 0.5 <= delta.high
+        assert report.block_score_deltas() == {"b": delta}
+
+    def test_reads_compressed_runs(self, tmp_path: Path) -> None:
+        """Gzip-compressed entries are decompressed while loading."""
+        entries = [{"case_index": i, "output": str(i)} for i in range(3)]
+        run_a = write_run(tmp_path / "a", entries)
+        run_b = write_run(tmp_path / "b", entries[:2])
+        plain = run_b / ENTRIES_FILENAME
+        (run_b / f"{ENTRIES_FILENAME}.gz").write_bytes(
+            gzip.compress(plain.read_bytes())
+        )
+        plain.unlink()
+
+        report = compare_runs(load_run(run_a), load_run(run_b))
+
+        assert report.matched == 2
+        assert report.only_a == [("b", "#2")]
+        assert report.changed_outputs == []
+
+    def test_flags_latency_regression(self, tmp_path: Path) -> None:
+        """A significantly slower candidate is reported as a regression."""
+        entries_a = [
+            {"case_index": i, "output": "o", "latency_seconds": 1.0 + i * 0.01}
+            for i in range(40)
+        ]
+        entries_b = [
+            {"case_index": i, "output": "o", "latency_seconds": 1.5 + i * 0.01}
+            for i in range(40)
+        ]
+        report = compare_runs(
+            load_run(write_run(tmp_path / "a", entries_a)),
+            load_run(write_run(tmp_path / "b", entries_b)),
+        )
+
+        assert report.latency is not None
+        assert report.latency.pairs == 40
+        assert report.is_latency_regression(threshold=0.1)
+        assert not report.is_latency_regression(threshold=0.9)
@@ -0,0 +1,1431 @@
+"""Unit tests for the benchmark executor."""
+
+import asyncio
+import json
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+from mocks.llm import MockLlmClient
+from mocks.reporter import InMemoryReporter
+from rich.console import Console
+
+from tls.errors import ConfigError, NetworkError
+from tls.models.benchmark import OutputLimits, SamplingParams
+from tls.models.project_config import ReportsConfig
+from tls.models.report import RunEntry
+from tls.protocols.llm import Completion, Message
+from tls.protocols.reporter import ReporterProtocol
+from tls.services.executor import Executor, ModelSummary
+from tls.services.history import HistoryReporter, HistoryStore
+from tls.services.llm_client import LlmClient
+from tls.services.metrics import RunMetrics
+from tls.services.registry import create_reporter
+from tls.services.reporter import (
+    MANIFEST_FILENAME,
+    FileSystemReporter,
+    read_entries,
+    read_manifest,
+)
+from tls.services.retry import retry_failed_cases
+from tls.services.tracer import Tracer
+from tls.services.watcher import BlockWatcher, RunUpdate, update_runs
+
+
+def write_block(
+    blocks_dir: Path,
+    block_id: str,
+    inputs: list[str],
+    system: str = "You are a test assistant.",
+    contexts: list[str | None] | None = None,
+    turns: list[list[str] | None] | None = None,
+    **extra: Any,
+) -> Path:
+    """Write a minimal benchmark file and return its path."""
+    blocks_dir.mkdir(parents=True, exist_ok=True)
+    path = blocks_dir / f"{block_id}.json"
+    data = {
+        "metadata": {"id": block_id},
+        "prompts": {"system": system},
+        "dataset": [
+            {
+                "id": f"{block_id}-{i}",
+                "input": text,
+                "context": contexts[i] if contexts else None,
+                **({"turns": turns[i]} if turns and turns[i] else {}),
+            }
+            for i, text in enumerate(inputs)
+        ],
+        **extra,
+    }
+    path.write_text(json.dumps(data))
+    return path
+
+
+def make_executor(
+    client: MockLlmClient | None = None,
+    reporter: ReporterProtocol | None = None,
+    **kwargs: Any,
+) -> Executor:
+    """Create an executor with mock services and a silent console."""
+    return Executor(
+        client=client or MockLlmClient(),
+        reporter=reporter or InMemoryReporter(),
+        console=Console(quiet=True),
+        **kwargs,
+    )
+
+
+class TestExecutor:
+    """Tests for the executor run loop."""
+
+    @pytest.mark.asyncio
+    async def test_execute_writes_entries(self, tmp_path: Path) -> None:
+        """Every case produces a run entry for every model."""
+        write_block(tmp_path, "block-a", ["one", "two"])
+        reporter = InMemoryReporter()
+        executor = make_executor(reporter=reporter)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert summary.total_cases == 2
+        assert summary.successful_cases == 2
+        assert [e.input for e in reporter.entries["block-a"]] == ["one", "two"]
+
+    @pytest.mark.asyncio
+    async def test_execute_updates_metrics(self, tmp_path: Path) -> None:
+        """Live metrics track completed requests per model."""
+        write_block(tmp_path, "block-a", ["one", "two", "three"])
+        metrics = RunMetrics(endpoint="mock")
+        executor = make_executor(metrics=metrics)
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1", "m2"])
+
+        assert metrics.models["m1"].completed == 3
+        assert metrics.models["m2"].completed == 3
+        assert metrics.models["m1"].in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_execute_records_trace_spans(self, tmp_path: Path) -> None:
+        """Each pipeline phase is recorded as a span per case."""
+        write_block(tmp_path, "block-a", ["one", "two"])
+        tracer = Tracer()
+        executor = make_executor(tracer=tracer)
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        names = [event["name"] for event in tracer.events]
+        for phase in ("build_messages", "client.chat", "build_entry", "write_entry"):
+            assert names.count(phase) == 2
+        assert names.count("load_block") == 1
+
+    @pytest.mark.asyncio
+    async def test_execute_records_history(self, tmp_path: Path) -> None:
+        """Runs are recorded in the history store with summary metrics."""
+        write_block(tmp_path / "blocks", "block-a", ["one", "two"])
+        write_block(tmp_path / "blocks", "block-b", ["three"])
+        store = HistoryStore(tmp_path / "history.sqlite3")
+        executor = make_executor(
+            reporter=HistoryReporter(FileSystemReporter(tmp_path / "reports"), store)
+        )
+
+        await executor.execute(blocks_dir=tmp_path / "blocks", models=["m1"])
+        await executor.execute(blocks_dir=tmp_path / "blocks", models=["m1"])
+
+        runs = store.query_runs(model="m1")
+        assert len(runs) == 2
+        assert runs[0].total_cases == 3
+        assert runs[0].success_rate == 1.0
+        assert runs[0].p90_latency is not None
+
+        block_runs = store.query_runs(block_id="block-b", limit=1)
+        assert len(block_runs) == 1
+        assert block_runs[0].total_cases == 1
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_history_writes_leave_event_loop(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Batches and run summaries are written from worker threads."""
+        monkeypatch.setattr("tls.services.history._FLUSH_EVERY", 2)
+        write_block(tmp_path / "blocks", "block-a", ["one", "two", "three"])
+        store = HistoryStore(tmp_path / "history.sqlite3")
+        threads: list[int] = []
+        flush = store.flush
+
+        def record_flush() -> None:
+            threads.append(threading.get_ident())
+            flush()
+
+        monkeypatch.setattr(store, "flush", record_flush)
+        executor = make_executor(
+            reporter=HistoryReporter(FileSystemReporter(tmp_path / "reports"), store)
+        )
+
+        await executor.execute(blocks_dir=tmp_path / "blocks", models=["m1"])
+
+        # One full batch, then the rest when the run is finished
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+        (run,) = store.query_runs(model="m1")
+        assert run.total_cases == 3
+        store.close()
+
+
+class TestBatchedExecution:
+    """Tests for batched dispatch of cases sharing a system prompt."""
+
+    @pytest.mark.asyncio
+    async def test_batches_group_by_system_prompt(self, tmp_path: Path) -> None:
+        """Cases are grouped by effective system prompt and chunked."""
+        write_block(
+            tmp_path,
+            "block-a",
+            ["a", "b", "c", "d", "e"],
+            contexts=[None, "ctx", None, None, "ctx"],
+        )
+        client = MockLlmClient()
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter, batch_size=2)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert client.batch_sizes == [2, 1, 2]
+        assert summary.successful_cases == 5
+        entries = reporter.entries["block-a"]
+        assert [e.case_index for e in entries] == [0, 1, 2, 3, 4]
+        assert [e.input for e in entries] == ["a", "b", "c", "d", "e"]
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_marks_every_case(self, tmp_path: Path) -> None:
+        """A failed batch request fails all of its cases."""
+
+        class FailingBatchClient:
+            async def chat(self, model: str, messages: list[Message]) -> str:
+                return ""
+
+            async def complete(self, model: str, messages: list[Message]) -> Completion:
+                return Completion(content="")
+
+            async def complete_batch(
+                self,
+                model: str,
+                conversations: list[list[Message]],
+                sampling: SamplingParams | None = None,
+                limits: OutputLimits | None = None,
+            ) -> list[Completion]:
+                raise NetworkError("batch down")
+
+        write_block(tmp_path, "block-a", ["a", "b", "c"])
+        reporter = InMemoryReporter()
+        executor = make_executor(
+            client=FailingBatchClient(), reporter=reporter, batch_size=4
+        )
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert summary.failed_cases == 3
+        assert all(e.error == "batch down" for e in reporter.entries["block-a"])
+
+    @pytest.mark.asyncio
+    async def test_batching_requires_batch_client(self, tmp_path: Path) -> None:
+        """Batching with a client lacking complete_batch is a config error."""
+
+        class ChatOnlyClient:
+            async def chat(self, model: str, messages: list[Message]) -> str:
+                return ""
+
+            async def complete(self, model: str, messages: list[Message]) -> Completion:
+                return Completion(content="")
+
+        write_block(tmp_path, "block-a", ["a"])
+        executor = Executor(
+            client=ChatOnlyClient(),
+            reporter=InMemoryReporter(),
+            console=Console(quiet=True),
+            batch_size=2,
+        )
+
+        with pytest.raises(ConfigError):
+            await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+
+class TestPrefixOrdering:
+    """Tests for prefix-cache-friendly dispatch order."""
+
+    @pytest.mark.asyncio
+    async def test_prefix_order_groups_requests(self, tmp_path: Path) -> None:
+        """Requests sharing a context are sent together; reports keep order."""
+        write_block(
+            tmp_path,
+            "block-a",
+            ["q1", "q2", "q3", "q4"],
+            contexts=["doc-1", "doc-2", "doc-1", "doc-2"],
+        )
+        client = MockLlmClient()
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter, ordering="prefix")
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        sent = [messages[1].content for messages in client.requests]
+        assert sent == ["q1", "q3", "q2", "q4"]
+        entries = reporter.entries["block-a"]
+        assert [e.input for e in entries] == ["q1", "q2", "q3", "q4"]
+
+    def test_unknown_ordering_is_rejected(self) -> None:
+        """Only known orderings are accepted."""
+        with pytest.raises(ConfigError):
+            make_executor(ordering="random")
+
+
+class TestSampling:
+    """Tests for sampling parameters and multi-sample cases."""
+
+    @pytest.mark.asyncio
+    async def test_block_sampling_overrides_config(self, tmp_path: Path) -> None:
+        """Block sampling values take precedence over config defaults."""
+        write_block(tmp_path, "block-a", ["a"], sampling={"temperature": 0.2})
+        client = MockLlmClient()
+        executor = make_executor(
+            client=client, sampling=SamplingParams(temperature=1.0, seed=7)
+        )
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert client.sampling == [SamplingParams(temperature=0.2, seed=7)]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("native_n", [True, False])
+    async def test_samples_compute_pass_at_k(
+        self, tmp_path: Path, native_n: bool
+    ) -> None:
+        """All samples are stored per entry and pass@k is summarized."""
+        tmp_path.mkdir(exist_ok=True)
+        data = {
+            "metadata": {"id": "block-a"},
+            "prompts": {"system": "sys"},
+            "dataset": [
+                {"input": "q1", "expected": "mock", "samples": 3},
+                {"input": "q2", "expected": "other", "samples": 3},
+            ],
+        }
+        (tmp_path / "block-a.json").write_text(json.dumps(data))
+        client = MockLlmClient()
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter, native_n=native_n)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert len(client.requests) == (2 if native_n else 6)
+        entries = reporter.entries["block-a"]
+        assert entries[0].samples == ["Mock response"] * 3
+        assert [e.passed_samples for e in entries] == [3, 0]
+        assert summary.models[0].pass_at_k(1) == 0.5
+        assert summary.models[0].pass_at_k(3) == 0.5
+
+    @pytest.mark.asyncio
+    async def test_samples_pass_by_block_scorer(self, tmp_path: Path) -> None:
+        """Blocks with a scorer judge samples by score and pass threshold."""
+        data = {
+            "metadata": {"id": "block-a"},
+            "prompts": {"system": "sys"},
+            "scorer": "exact",
+            "dataset": [
+                {"input": "q1", "expected": "mock", "samples": 2},
+                {"input": "q2", "expected": "Mock response", "samples": 2},
+            ],
+        }
+        (tmp_path / "block-a.json").write_text(json.dumps(data))
+        reporter = InMemoryReporter()
+        executor = make_executor(reporter=reporter, scoring_workers=0)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        entries = reporter.entries["block-a"]
+        assert [e.passed_samples for e in entries] == [0, 2]
+        assert summary.models[0].pass_at_k(1) == 0.5
+
+
+class TestOutputLimits:
+    """Tests for output size and wall-time limits."""
+
+    @pytest.mark.asyncio
+    async def test_block_limits_truncate_output(self, tmp_path: Path) -> None:
+        """Outputs over max_chars are cut and marked on the entry."""
+        write_block(tmp_path, "block-a", ["a"], limits={"max_chars": 4})
+        reporter = InMemoryReporter()
+        executor = make_executor(
+            client=MockLlmClient("Mock response"),
+            reporter=reporter,
+            limits=OutputLimits(max_chars=100),
+        )
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        entry = reporter.entries["block-a"][0]
+        assert entry.output == "Mock"
+        assert entry.truncated == "max_chars"
+        assert summary.models[0].truncated_cases == 1
+
+    @pytest.mark.asyncio
+    async def test_stuck_request_times_out(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Requests running past max_seconds are abandoned as errors."""
+
+        class HangingClient:
+            async def chat(self, model: str, messages: list[Message]) -> str:
+                return ""
+
+            async def complete(
+                self,
+                model: str,
+                messages: list[Message],
+                sampling: SamplingParams | None = None,
+                n: int = 1,
+                limits: OutputLimits | None = None,
+                response_format: dict[str, Any] | None = None,
+            ) -> Completion:
+                await asyncio.sleep(10)
+                return Completion(content="")
+
+        monkeypatch.setattr("tls.services.executor.DEADLINE_GRACE_SECONDS", 0.0)
+        write_block(tmp_path, "block-a", ["a"])
+        reporter = InMemoryReporter()
+        executor = make_executor(
+            client=HangingClient(),
+            reporter=reporter,
+            limits=OutputLimits(max_seconds=0.05),
+        )
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert summary.failed_cases == 1
+        assert reporter.entries["block-a"][0].error == "Timed out after 0.05s"
+
+
+class TestConcurrency:
+    """Tests for concurrent dispatch."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_keep_entry_order(self, tmp_path: Path) -> None:
+        """Requests overlap up to the limit; entries stay in dataset order."""
+
+        class SlowClient:
+            def __init__(self) -> None:
+                self.in_flight = 0
+                self.peak = 0
+
+            async def chat(self, model: str, messages: list[Message]) -> str:
+                return ""
+
+            async def complete(
+                self,
+                model: str,
+                messages: list[Message],
+                sampling: SamplingParams | None = None,
+                n: int = 1,
+                limits: OutputLimits | None = None,
+                response_format: dict[str, Any] | None = None,
+            ) -> Completion:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+                # Earlier cases finish last
+                await asyncio.sleep(0.01 * (10 - int(messages[-1].content)))
+                self.in_flight -= 1
+                return Completion(content=messages[-1].content)
+
+        write_block(tmp_path, "block-a", [str(i) for i in range(8)])
+        client = SlowClient()
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter, concurrency=3)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert client.peak == 3
+        assert [e.output for e in reporter.entries["block-a"]] == [
+            str(i) for i in range(8)
+        ]
+        assert summary.models[0].concurrency_history == [(0.0, 3)]
+
+    def test_invalid_concurrency_raises(self) -> None:
+        """Unknown concurrency settings are rejected up front."""
+        with pytest.raises(ConfigError):
+            make_executor(concurrency="many")
+
+
+class TestWarmup:
+    """Tests for the per-model warmup phase."""
+
+    @pytest.mark.asyncio
+    async def test_warmup_requests_are_not_reported(self, tmp_path: Path) -> None:
+        """Warmup requests precede cases and stay out of entries and metrics."""
+        write_block(tmp_path, "block-a", ["a", "b"])
+        client = MockLlmClient()
+        reporter = InMemoryReporter()
+        metrics = RunMetrics(endpoint="http://llm")
+        executor = make_executor(
+            client=client, reporter=reporter, metrics=metrics, warmup=2
+        )
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1", "m2"])
+
+        # Two warmups, then two cases, per model
+        assert [m[-1].content for m in client.requests] == [
+            "Hello",
+            "Hello",
+            "a",
+            "b",
+        ] * 2
+        assert client.sampling[0] == SamplingParams(max_tokens=1)
+        assert [e.input for e in reporter.entries["block-a"]] == ["a", "b"]
+        assert len(summary.models[0].warmup_latencies) == 2
+        assert (
+            'tls_requests_total{model="m1",endpoint="http://llm",outcome="completed"} 2'
+            in metrics.render()
+        )
+        assert summary.total_cases == 4
+
+    def test_cold_start_detection(self) -> None:
+        """A slow first warmup request is reported as model load time."""
+        cold = ModelSummary(model="m", warmup_latencies=[5.0, 0.5, 0.7])
+        warm = ModelSummary(model="m", warmup_latencies=[0.6, 0.5, 0.7])
+        single = ModelSummary(model="m", warmup_latencies=[5.0])
+
+        assert cold.cold_start_seconds == pytest.approx(4.4)
+        assert warm.cold_start_seconds is None
+        assert single.cold_start_seconds is None
+
+
+class FastClient:
+    """Client answering instantly without any bookkeeping."""
+
+    async def chat(self, model: str, messages: list[Message]) -> str:
+        return "ok"
+
+    async def complete(
+        self,
+        model: str,
+        messages: list[Message],
+        sampling: SamplingParams | None = None,
+        n: int = 1,
+        limits: OutputLimits | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> Completion:
+        return Completion(content="ok")
+
+
+class CountingReporter:
+    """Reporter keeping only the entry count and whether entries came in order."""
+
+    def __init__(self, on_entry: Callable[[int], None] | None = None) -> None:
+        self.count = 0
+        self.last_index = -1
+        self.in_order = True
+        self.on_entry = on_entry
+
+    async def init_run(
+        self, category: str | None, model: str, block_ids: list[str]
+    ) -> Path:
+        return Path("/null")
+
+    async def write_entry(self, run_dir: Path, entry: RunEntry) -> None:
+        self.count += 1
+        self.in_order = self.in_order and entry.case_index == self.last_index + 1
+        self.last_index = entry.case_index
+        if self.on_entry is not None:
+            self.on_entry(self.count)
+
+    async def finalize_run(self, run_dir: Path) -> None:
+        pass
+
+
+def write_dataset_file(blocks_dir: Path, cases: int) -> None:
+    """Write a block whose cases live in a JSONL dataset file."""
+    blocks_dir.mkdir(parents=True, exist_ok=True)
+    with (blocks_dir / "cases.jsonl").open("w") as f:
+        for i in range(cases):
+            f.write(json.dumps({"id": f"case-{i}", "input": f"question {i}"}) + "\n")
+    (blocks_dir / "big.json").write_text(
+        json.dumps(
+            {
+                "metadata": {"id": "big"},
+                "prompts": {"system": "sys"},
+                "dataset_file": "cases.jsonl",
+            }
+        )
+    )
+
+
+class TestStreamingPipeline:
+    """Tests for the bounded streaming pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_dataset_file_cases_run_in_order(self, tmp_path: Path) -> None:
+        """Cases from a JSONL dataset file run lazily and in order."""
+        write_dataset_file(tmp_path, 500)
+        reporter = CountingReporter()
+        executor = make_executor(client=FastClient(), reporter=reporter, concurrency=8)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert summary.total_cases == 500
+        assert reporter.count == 500
+        assert reporter.in_order
+
+    @pytest.mark.asyncio
+    async def test_slow_head_case_bounds_dispatch(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Dispatch waits when results pile up behind a slow earlier case."""
+
+        class SlowFirstClient(FastClient):
+            def __init__(self) -> None:
+                self.sent = 0
+                self.sent_while_blocked = 0
+                self.blocked = True
+
+            async def complete(
+                self,
+                model: str,
+                messages: list[Message],
+                sampling: SamplingParams | None = None,
+                n: int = 1,
+                limits: OutputLimits | None = None,
+                response_format: dict[str, Any] | None = None,
+            ) -> Completion:
+                self.sent += 1
+                if messages[-1].content == "question 0":
+                    await asyncio.sleep(0.05)
+                    self.sent_while_blocked = self.sent
+                    self.blocked = False
+                return Completion(content="ok")
+
+        monkeypatch.setattr("tls.services.executor.REORDER_WINDOW", 10)
+        write_dataset_file(tmp_path, 50)
+        client = SlowFirstClient()
+        reporter = CountingReporter()
+        executor = make_executor(client=client, reporter=reporter, concurrency=4)
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert client.sent_while_blocked == 10
+        assert reporter.count == 50
+        assert reporter.in_order
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(
+        not Path("/proc/self/statm").exists(), reason="needs /proc RSS readings"
+    )
+    async def test_rss_stays_flat_over_a_million_cases(self, tmp_path: Path) -> None:
+        """Memory use does not grow with the number of cases."""
+        cases = 1_000_000
+        samples: list[float] = []
+
+        def sample_rss(count: int) -> None:
+            if count % (cases // 10) == 0:
+                pages = int(Path("/proc/self/statm").read_text().split()[1])
+                samples.append(pages * os.sysconf("SC_PAGE_SIZE") / 2**20)
+
+        write_dataset_file(tmp_path, cases)
+        reporter = CountingReporter(on_entry=sample_rss)
+        executor = make_executor(
+            client=FastClient(), reporter=reporter, concurrency=16, progress="none"
+        )
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert reporter.count == cases
+        # Compare against the first sample, taken once the pipeline is full
+        assert max(samples) - samples[0] < 25
+
+
+class RecordingClient(FastClient):
+    """Fast client recording the messages of every request."""
+
+    def __init__(self) -> None:
+        self.messages: list[list[Message]] = []
+
+    async def complete(
+        self,
+        model: str,
+        messages: list[Message],
+        sampling: SamplingParams | None = None,
+        n: int = 1,
+        limits: OutputLimits | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> Completion:
+        self.messages.append(messages)
+        await asyncio.sleep(0)
+        return Completion(content=f"answer to {messages[-1].content}")
+
+
+class TestCaseRepresentation:
+    """Tests for the compact per-case representation on the hot path."""
+
+    @pytest.mark.asyncio
+    async def test_system_message_is_shared_across_cases(self, tmp_path: Path) -> None:
+        """Cases with the same prompt and context share one system message."""
+
+        write_block(
+            tmp_path,
+            "shared",
+            ["a", "b", "c"],
+            contexts=[None, None, "Paris"],
+        )
+        client = RecordingClient()
+        executor = make_executor(client=client)
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        first, second, third = (messages[0] for messages in client.messages)
+        assert first is second
+        assert third is not first
+        assert third.content.endswith("Context:\nParis")
+
+    @pytest.mark.asyncio
+    async def test_entries_carry_aware_timestamps(self, tmp_path: Path) -> None:
+        """Run entries are stamped with timezone-aware UTC times."""
+        write_block(tmp_path, "stamped", ["a"])
+        reporter = InMemoryReporter()
+        executor = make_executor(reporter=reporter)
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        (entry,) = reporter.entries["stamped"]
+        assert entry.timestamp.utcoffset() is not None
+
+
+class TestDeduplication:
+    """Tests for sharing results of identical requests within a run."""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_are_sent_once(self, tmp_path: Path) -> None:
+        """Repeated cases across blocks share one request, marked on the entry."""
+        write_block(tmp_path, "a", ["smoke", "unique a"])
+        write_block(tmp_path, "b", ["smoke", "smoke", "unique b"])
+        client = RecordingClient()
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter, concurrency=4)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert len(client.messages) == 3
+        assert summary.models[0].deduplicated_cases == 2
+        assert summary.successful_cases == 5
+        shared = reporter.entries["b"][:2]
+        assert [e.output for e in shared] == ["answer to smoke"] * 2
+        assert [e.duplicate_of for e in shared] == ["a/a-0", "a/a-0"]
+        assert reporter.entries["a"][0].duplicate_of is None
+
+    @pytest.mark.asyncio
+    async def test_shared_requests_are_counted_once(self, tmp_path: Path) -> None:
+        """Latency and token usage of a shared request stay with its original."""
+        write_block(tmp_path, "a", ["smoke"])
+        write_block(tmp_path, "b", ["smoke"])
+        reporter = InMemoryReporter()
+        executor = make_executor(reporter=reporter)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        model = summary.models[0]
+        assert sum(len(b.latencies) for b in model.blocks) == 1
+        (original,) = reporter.entries["a"]
+        (duplicate,) = reporter.entries["b"]
+        assert original.latency_seconds is not None
+        assert original.completion_tokens
+        assert duplicate.duplicate_of == "a/a-0"
+        assert duplicate.output == original.output
+        assert (
+            duplicate.latency_seconds,
+            duplicate.prompt_tokens,
+            duplicate.completion_tokens,
+        ) == (None, None, None)
+
+    @pytest.mark.asyncio
+    async def test_differing_settings_are_not_shared(self, tmp_path: Path) -> None:
+        """Same input under another system prompt or sampling is sent again."""
+        write_block(tmp_path, "a", ["smoke"])
+        write_block(tmp_path, "b", ["smoke"], system="Another assistant.")
+        write_block(tmp_path, "c", ["smoke"], sampling={"temperature": 0.1})
+        client = RecordingClient()
+        executor = make_executor(client=client)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert len(client.messages) == 3
+        assert summary.models[0].deduplicated_cases == 0
+
+    @pytest.mark.asyncio
+    async def test_dedup_can_be_disabled(self, tmp_path: Path) -> None:
+        """With dedup off, every case is sent."""
+        write_block(tmp_path, "a", ["smoke", "smoke"])
+        client = RecordingClient()
+        executor = make_executor(client=client, dedup=False)
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert len(client.messages) == 2
+
+    @pytest.mark.asyncio
+    async def test_duplicates_within_a_batch_are_shared(self, tmp_path: Path) -> None:
+        """Batched units only send the first of identical prompts."""
+        write_block(tmp_path, "a", ["x", "y", "x", "x"])
+        client = MockLlmClient(response="ok")
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter, batch_size=4)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert client.batch_sizes == [2]
+        assert summary.models[0].deduplicated_cases == 2
+        assert [e.duplicate_of for e in reporter.entries["a"]] == [
+            None,
+            None,
+            "a/a-0",
+            "a/a-0",
+        ]
+
+
+class TestEndpoints:
+    """Tests for blocks targeting the completions and embeddings endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_embedding_inputs_are_batched(self, tmp_path: Path) -> None:
+        """Embedding cases are sent batch_size inputs per request."""
+        write_block(
+            tmp_path, "emb", ["a", "bb", "ccc"], system="", endpoint="embeddings"
+        )
+        client = MockLlmClient()
+        reporter = InMemoryReporter()
+        metrics = RunMetrics(endpoint="mock")
+        executor = make_executor(
+            client=client, reporter=reporter, metrics=metrics, batch_size=2
+        )
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["e1"])
+
+        assert client.embedding_batches == [["a", "bb"], ["ccc"]]
+        assert client.requests == []
+        entries = reporter.entries["emb"]
+        assert [e.endpoint for e in entries] == ["embeddings"] * 3
+        assert [e.dimensions for e in entries] == [4, 4, 4]
+        stats = summary.models[0].endpoints["embeddings"]
+        assert (stats.requests, stats.items, stats.prompt_tokens) == (2, 3, 3)
+        assert stats.items_per_second is not None
+        assert 'tls_embedding_vectors_total{model="e1",endpoint="mock"} 3' in (
+            metrics.render()
+        )
+
+    @pytest.mark.asyncio
+    async def test_completions_blocks_use_completions_endpoint(
+        self, tmp_path: Path
+    ) -> None:
+        """Completions blocks go through complete_batch even without batching."""
+        write_block(tmp_path, "text", ["a", "b"], endpoint="completions")
+        write_block(tmp_path, "talk", ["c"])
+        client = MockLlmClient(response="done")
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert client.batch_sizes == [1, 1]
+        assert reporter.entries["text"][0].endpoint == "completions"
+        assert reporter.entries["talk"][0].endpoint == "chat"
+        endpoints = summary.models[0].endpoints
+        assert endpoints["completions"].items == 2
+        assert endpoints["completions"].tokens_per_second is not None
+        assert endpoints["chat"].items == 1
+        assert endpoints["chat"].tokens_per_second is not None
+
+    @pytest.mark.asyncio
+    async def test_completions_usage_gives_tokens_per_second(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Usage reported for a whole completions batch feeds the rate."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            prompts = json.loads(request.content)["prompt"]
+            return httpx.Response(
+                200,
+                json={
+                    "choices": [{"index": i, "text": "x"} for i in range(len(prompts))],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 4},
+                },
+            )
+
+        real_client = httpx.AsyncClient
+
+        def factory(**kwargs: Any) -> httpx.AsyncClient:
+            return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+        monkeypatch.setattr(httpx, "AsyncClient", factory)
+        write_block(tmp_path, "text", ["a", "b"], endpoint="completions")
+        metrics = RunMetrics(endpoint="http://llm")
+        executor = Executor(
+            client=LlmClient(base_url="http://llm"),
+            reporter=InMemoryReporter(),
+            console=Console(quiet=True),
+            metrics=metrics,
+            batch_size=2,
+        )
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        stats = summary.models[0].endpoints["completions"]
+        assert (stats.prompt_tokens, stats.completion_tokens) == (10, 4)
+        assert stats.tokens_per_second is not None
+        assert metrics.models["m1"].completion_tokens == 4
+
+    @pytest.mark.asyncio
+    async def test_embeddings_require_capable_client(self, tmp_path: Path) -> None:
+        """Clients without embed() are rejected before any request."""
+        write_block(tmp_path, "emb", ["a"], endpoint="embeddings")
+        executor = make_executor(client=FastClient())
+
+        with pytest.raises(ConfigError, match="embeddings"):
+            await executor.execute(blocks_dir=tmp_path, models=["e1"])
+
+
+class TestMultiTurn:
+    """Tests for scripted multi-turn conversation cases."""
+
+    @pytest.mark.asyncio
+    async def test_replies_are_carried_into_next_turns(self, tmp_path: Path) -> None:
+        """Each turn resends the conversation so far with the model's replies."""
+        write_block(tmp_path, "chat", ["hi"], turns=[["more", "bye"]])
+        client = RecordingClient()
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert [(m.role, m.content) for m in client.messages[-1][1:]] == [
+            ("user", "hi"),
+            ("assistant", "answer to hi"),
+            ("user", "more"),
+            ("assistant", "answer to more"),
+            ("user", "bye"),
+        ]
+        (entry,) = reporter.entries["chat"]
+        assert entry.output == "answer to bye"
+        assert entry.turns is not None
+        assert [t.input for t in entry.turns] == ["hi", "more", "bye"]
+        assert entry.latency_seconds == pytest.approx(
+            sum(t.latency_seconds for t in entry.turns)
+        )
+        assert len(summary.models[0].mean_turn_latencies) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_turn_ends_conversation(self, tmp_path: Path) -> None:
+        """A failing turn stops the case and keeps the turns before it."""
+
+        class FailingClient(RecordingClient):
+            async def complete(
+                self,
+                model: str,
+                messages: list[Message],
+                sampling: SamplingParams | None = None,
+                n: int = 1,
+                limits: OutputLimits | None = None,
+                response_format: dict[str, Any] | None = None,
+            ) -> Completion:
+                if messages[-1].content == "more":
+                    raise NetworkError("boom")
+                return await super().complete(model, messages, sampling, n, limits)
+
+        write_block(tmp_path, "chat", ["hi"], turns=[["more", "bye"]])
+        reporter = InMemoryReporter()
+        executor = make_executor(client=FailingClient(), reporter=reporter)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        (entry,) = reporter.entries["chat"]
+        assert entry.error == "Turn 2: boom"
+        assert entry.turns is not None
+        assert [t.output for t in entry.turns] == ["answer to hi"]
+        assert summary.failed_cases == 1
+
+    @pytest.mark.asyncio
+    async def test_conversations_are_never_batched(self, tmp_path: Path) -> None:
+        """With batching on, multi-turn cases still use chat requests."""
+        write_block(tmp_path, "chat", ["a", "b", "c"], turns=[None, ["b2"], None])
+        client = MockLlmClient(response="ok")
+        executor = make_executor(client=client, batch_size=4)
+
+        await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert client.batch_sizes == [2]
+        assert len(client.requests) == 4
+
+
+ANSWER_SCHEMA = {
+    "type": "object",
+    "properties": {"answer": {"type": "string"}},
+    "required": ["answer"],
+    "additionalProperties": False,
+}
+
+
+class StructuredClient(FastClient):
+    """Fast client answering with JSON only when constrained by a schema."""
+
+    def __init__(self) -> None:
+        self.response_formats: list[dict[str, Any] | None] = []
+
+    async def complete(
+        self,
+        model: str,
+        messages: list[Message],
+        sampling: SamplingParams | None = None,
+        n: int = 1,
+        limits: OutputLimits | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> Completion:
+        self.response_formats.append(response_format)
+        await asyncio.sleep(0)
+        if response_format is None:
+            return Completion(content=f"The answer is {messages[-1].content}")
+        return Completion(content=json.dumps({"answer": messages[-1].content}))
+
+
+class TestStructuredOutput:
+    """Tests for blocks constraining outputs to a JSON Schema."""
+
+    @pytest.mark.asyncio
+    async def test_schema_is_sent_and_outputs_validated(self, tmp_path: Path) -> None:
+        """The block schema goes out as response_format; valid outputs count."""
+        write_block(tmp_path, "json", ["a", "b"], output_schema=ANSWER_SCHEMA)
+        client = StructuredClient()
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        (sent, _) = client.response_formats
+        assert sent is not None
+        assert sent["type"] == "json_schema"
+        assert sent["json_schema"] == {"name": "json", "schema": ANSWER_SCHEMA}
+        entries = reporter.entries["json"]
+        assert [(e.constrained, e.schema_valid) for e in entries] == [(True, True)] * 2
+        stats = summary.models[0].schema["constrained"]
+        assert (stats.cases, stats.valid, stats.validity_rate) == (2, 2, 1.0)
+
+    @pytest.mark.asyncio
+    async def test_compare_unconstrained_sends_each_case_twice(
+        self, tmp_path: Path
+    ) -> None:
+        """Compared blocks record the free output and both validity rates."""
+        write_block(
+            tmp_path,
+            "json",
+            ["a"],
+            output_schema=ANSWER_SCHEMA,
+            compare_unconstrained=True,
+        )
+        client = StructuredClient()
+        reporter = InMemoryReporter()
+        executor = make_executor(client=client, reporter=reporter)
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert sorted(f is None for f in client.response_formats) == [False, True]
+        (entry,) = reporter.entries["json"]
+        assert entry.schema_valid is True
+        assert entry.unconstrained is not None
+        assert entry.unconstrained.output == "The answer is a"
+        assert entry.unconstrained.schema_valid is False
+        schema = summary.models[0].schema
+        assert schema["constrained"].validity_rate == 1.0
+        assert schema["free"].validity_rate == 0.0
+
+    @pytest.mark.asyncio
+    async def test_outputs_validated_without_response_format(
+        self, tmp_path: Path
+    ) -> None:
+        """Endpoints without structured outputs still get their outputs checked."""
+        write_block(tmp_path, "json", ["a"], output_schema=ANSWER_SCHEMA)
+        client = StructuredClient()
+        reporter = InMemoryReporter()
+        executor = make_executor(
+            client=client, reporter=reporter, response_format=False
+        )
+
+        summary = await executor.execute(blocks_dir=tmp_path, models=["m1"])
+
+        assert client.response_formats == [None]
+        (entry,) = reporter.entries["json"]
+        assert (entry.constrained, entry.schema_valid) == (False, False)
+        assert entry.schema_error is not None
+        assert entry.schema_error.startswith("invalid JSON")
+        assert summary.models[0].schema["free"].cases == 1
+
+    @pytest.mark.asyncio
+    async def test_unsupported_schema_fails_before_sending(
+        self, tmp_path: Path
+    ) -> None:
+        """Schemas using unsupported keywords are rejected up front."""
+        write_block(tmp_path, "json", ["a"], output_schema={"$ref": "#/x"})
+        client = StructuredClient()
+        executor = make_executor(client=client)
+
+        with pytest.raises(ConfigError, match=r"\$ref"):
+            await executor.execute(blocks_dir=tmp_path, models=["m1"])
+        assert client.response_formats == []
+
+
+class TestIncrementalRuns:
+    """Tests for watch mode's incremental updates of the latest run."""
+
+    @staticmethod
+    def updater(client: MockLlmClient, tmp_path: Path) -> Callable[[], Any]:
+        """Function updating the latest run of model m1."""
+
+        def make(reporter: ReporterProtocol) -> Executor:
+            return make_executor(client=client, reporter=reporter)
+
+        async def update() -> list[RunUpdate]:
+            updates: list[RunUpdate] = await update_runs(
+                make, tmp_path / "reports", tmp_path / "blocks", ["m1"]
+            )
+            return updates
+
+        return update
+
+    @pytest.mark.asyncio
+    async def test_updates_reach_history(self, tmp_path: Path) -> None:
+        """Full runs and in-place updates are recorded in the history store."""
+        blocks = tmp_path / "blocks"
+        write_block(blocks, "a", ["one", "two"])
+        store = HistoryStore(tmp_path / "history.sqlite3")
+        reports = tmp_path / "reports"
+        reporter = HistoryReporter(FileSystemReporter(reports), store)
+
+        def make(reporter: ReporterProtocol) -> Executor:
+            return make_executor(reporter=reporter)
+
+        async def update() -> None:
+            await update_runs(
+                make, reports, blocks, ["m1"], reporter=reporter, history=store
+            )
+
+        await update()
+        write_block(blocks, "a", ["one", "two", "three"])
+        await update()
+
+        (run,) = store.query_runs(model="m1")
+        assert run.total_cases == 3
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_only_changed_cases_are_rerun(self, tmp_path: Path) -> None:
+        """Edited and added cases run again; the others keep their entries."""
+        blocks = tmp_path / "blocks"
+        write_block(blocks, "a", ["one", "two", "three"])
+        write_block(blocks, "b", ["four"])
+        client = MockLlmClient()
+        update = self.updater(client, tmp_path)
+
+        (first,) = await update()
+        assert first.full_run and first.executed == 4
+        write_block(blocks, "a", ["one", "TWO", "three", "five"])
+        client.requests.clear()
+
+        (second,) = await update()
+
+        assert [m[-1].content for m in client.requests] == ["TWO", "five"]
+        assert second.run_dir == first.run_dir
+        assert (second.executed, second.removed) == (2, 1)
+        entries = read_entries(second.run_dir)
+        assert [(e.block_id, e.case_index, e.input) for e in entries] == [
+            ("a", 0, "one"),
+            ("a", 1, "TWO"),
+            ("a", 2, "three"),
+            ("a", 3, "five"),
+            ("b", 0, "four"),
+        ]
+        report = (second.run_dir / "a.md").read_text()
+        assert "TWO" in report and "**Input**: two" not in report
+
+    @pytest.mark.asyncio
+    async def test_moved_and_removed_cases_are_not_rerun(self, tmp_path: Path) -> None:
+        """Reordering or deleting cases only rewrites the run."""
+        blocks = tmp_path / "blocks"
+        write_block(blocks, "a", ["one", "two", "three"])
+        client = MockLlmClient()
+        update = self.updater(client, tmp_path)
+        (first,) = await update()
+        write_block(blocks, "a", ["three", "one"])
+        client.requests.clear()
+
+        (second,) = await update()
+
+        assert client.requests == []
+        assert second.removed == 1
+        entries = read_entries(first.run_dir)
+        assert [(e.case_index, e.input) for e in entries] == [(0, "three"), (1, "one")]
+
+    @pytest.mark.asyncio
+    async def test_watcher_reports_settled_changes(self, tmp_path: Path) -> None:
+        """The watcher returns once a modified file stops changing."""
+        path = write_block(tmp_path, "a", ["one"])
+        watcher = BlockWatcher(tmp_path, interval=0.01)
+
+        waiting = asyncio.create_task(watcher.wait())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        write_block(tmp_path, "a", ["one", "two"])
+        await asyncio.wait_for(waiting, timeout=1)
+
+        assert watcher.snapshot()[path][0] == path.stat().st_size
+
+
+class FlakyClient(RecordingClient):
+    """Recording client failing the inputs listed in `failing`."""
+
+    def __init__(self, failing: set[str]) -> None:
+        super().__init__()
+        self.failing = failing
+
+    async def complete(
+        self,
+        model: str,
+        messages: list[Message],
+        sampling: SamplingParams | None = None,
+        n: int = 1,
+        limits: OutputLimits | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> Completion:
+        if messages[-1].content in self.failing:
+            raise NetworkError("boom")
+        return await super().complete(model, messages, sampling, n, limits)
+
+
+class TestRetryFailed:
+    """Tests for re-running the failed cases of a run."""
+
+    async def failed_run(self, tmp_path: Path, failing: set[str]) -> Path:
+        """Run blocks a and b with some failing inputs; return the run dir."""
+        write_block(tmp_path / "blocks", "a", ["one", "two", "three"])
+        write_block(tmp_path / "blocks", "b", ["four"])
+        executor = make_executor(
+            client=FlakyClient(failing),
+            reporter=FileSystemReporter(tmp_path / "reports"),
+        )
+        summary = await executor.execute(tmp_path / "blocks", ["m1"])
+        run_dir: Path = summary.models[0].run_dir
+        return run_dir
+
+    @pytest.mark.asyncio
+    async def test_failures_are_listed_in_manifest(self, tmp_path: Path) -> None:
+        """The run manifest records every failed case."""
+        run_dir = await self.failed_run(tmp_path, {"two"})
+
+        manifest = json.loads((run_dir / "run.json").read_text())
+        assert manifest["failures"] == [
+            {"block_id": "a", "case_index": 1, "case_id": "a-1", "error": "boom"}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_only_failed_cases_are_retried(self, tmp_path: Path) -> None:
+        """Failed entries are replaced in place; the others are not re-sent."""
+        run_dir = await self.failed_run(tmp_path, {"two", "four"})
+        client = FlakyClient({"four"})
+
+        def make(reporter: ReporterProtocol) -> Executor:
+            return make_executor(client=client, reporter=reporter)
+
+        retry = await retry_failed_cases(make, run_dir, tmp_path / "blocks")
+
+        # "four" fails again before being recorded
+        assert [m[-1].content for m in client.messages] == ["two"]
+        assert (retry.failed, retry.retried, retry.fixed) == (2, 2, 1)
+        entries = read_entries(run_dir)
+        assert [(e.input, e.error) for e in entries] == [
+            ("one", None),
+            ("two", None),
+            ("three", None),
+            ("four", "boom"),
+        ]
+        assert "answer to two" in (run_dir / "a.md").read_text()
+        manifest = json.loads((run_dir / "run.json").read_text())
+        assert [f["block_id"] for f in manifest["failures"]] == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_changed_cases_are_skipped(self, tmp_path: Path) -> None:
+        """A failed case edited since the run is not retried."""
+        run_dir = await self.failed_run(tmp_path, {"two"})
+        write_block(tmp_path / "blocks", "a", ["one", "TWO", "three"])
+        client = FlakyClient(set())
+
+        def make(reporter: ReporterProtocol) -> Executor:
+            return make_executor(client=client, reporter=reporter)
+
+        retry = await retry_failed_cases(make, run_dir, tmp_path / "blocks")
+
+        assert client.messages == []
+        assert retry.skipped == ["a/a-1"]
+        assert read_entries(run_dir)[1].error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_inactive_target_block_is_retried(self, tmp_path: Path) -> None:
+        """Blocks are taken from the run manifest, even inactive ones."""
+        path = write_block(tmp_path / "blocks", "a", ["one", "two"])
+        data = json.loads(path.read_text())
+        data["metadata"]["active"] = False
+        path.write_text(json.dumps(data))
+        executor = make_executor(
+            client=FlakyClient({"two"}),
+            reporter=FileSystemReporter(tmp_path / "reports"),
+        )
+        summary = await executor.execute(tmp_path / "blocks", ["m1"], path)
+        run_dir = summary.models[0].run_dir
+        client = FlakyClient(set())
+
+        def make(reporter: ReporterProtocol) -> Executor:
+            return make_executor(client=client, reporter=reporter)
+
+        retry = await retry_failed_cases(make, run_dir, tmp_path / "blocks")
+
+        assert [m[-1].content for m in client.messages] == ["two"]
+        assert (retry.retried, retry.fixed, retry.skipped) == (1, 1, [])
+
+    @pytest.mark.asyncio
+    async def test_single_case_run_is_retried(self, tmp_path: Path) -> None:
+        """A case run by ID records its dataset index, so it can be retried."""
+        write_block(tmp_path / "blocks", "a", ["one", "two", "three"])
+        executor = make_executor(
+            client=FlakyClient({"two"}),
+            reporter=FileSystemReporter(tmp_path / "reports"),
+        )
+        summary = await executor.execute(tmp_path / "blocks", ["m1"], target_id="a-1")
+        run_dir = summary.models[0].run_dir
+        assert [e.case_index for e in read_entries(run_dir)] == [1]
+        client = FlakyClient(set())
+
+        def make(reporter: ReporterProtocol) -> Executor:
+            return make_executor(client=client, reporter=reporter)
+
+        retry = await retry_failed_cases(make, run_dir, tmp_path / "blocks")
+
+        assert [m[-1].content for m in client.messages] == ["two"]
+        assert (retry.retried, retry.fixed, retry.skipped) == (1, 1, [])
+
+    @pytest.mark.asyncio
+    async def test_retry_updates_history(self, tmp_path: Path) -> None:
+        """The history record of the run is replaced with its current entries."""
+        run_dir = await self.failed_run(tmp_path, {"two", "four"})
+        store = HistoryStore(tmp_path / "history.sqlite3")
+
+        def make(reporter: ReporterProtocol) -> Executor:
+            return make_executor(client=FlakyClient({"four"}), reporter=reporter)
+
+        await retry_failed_cases(make, run_dir, tmp_path / "blocks", store)
+
+        (run,) = store.query_runs(model="m1")
+        assert run.run_id == str(run_dir)
+        assert (run.total_cases, run.failed_cases) == (4, 1)
+        store.close()
+
+
+class TestInterruptedRuns:
+    """Tests for runs stopped before all cases finished."""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run_writes_recorded_entries(self, tmp_path: Path) -> None:
+        """Queued entries are written and compressed reports completed."""
+
+        class StallingClient(FastClient):
+            async def complete(
+                self,
+                model: str,
+                messages: list[Message],
+                sampling: SamplingParams | None = None,
+                n: int = 1,
+                limits: OutputLimits | None = None,
+                response_format: dict[str, Any] | None = None,
+            ) -> Completion:
+                if messages[-1].content == "three":
+                    await asyncio.sleep(10)
+                return Completion(content="ok")
+
+        write_block(tmp_path / "blocks", "block-a", ["one", "two", "three"])
+        reports_dir = tmp_path / "reports"
+        executor = make_executor(
+            client=StallingClient(),
+            reporter=create_reporter(reports_dir, ReportsConfig(compression="gzip")),
+        )
+
+        task = asyncio.create_task(executor.execute(tmp_path / "blocks", ["m1"]))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        (run_dir,) = [p.parent for p in reports_dir.rglob(MANIFEST_FILENAME)]
+        assert [e.input for e in read_entries(run_dir)] == ["one", "two"]
+        assert "finished_at" in read_manifest(run_dir)
+
+    @pytest.mark.asyncio
+    async def test_finalize_error_keeps_original_error(self, tmp_path: Path) -> None:
+        """A reporter failing at finalize does not replace the run's error."""
+
+        class BrokenReporter:
+            async def init_run(
+                self, category: str | None, model: str, block_ids: list[str]
+            ) -> Path:
+                return tmp_path
+
+            async def write_entry(self, run_dir: Path, entry: RunEntry) -> None:
+                raise OSError("disk full")
+
+            async def finalize_run(self, run_dir: Path) -> None:
+                raise OSError("still full")
+
+        write_block(tmp_path / "blocks", "block-a", ["one"])
+        executor = make_executor(reporter=BrokenReporter())
+
+        with pytest.raises(ExceptionGroup) as caught:
+            await executor.execute(tmp_path / "blocks", ["m1"])
+
+        assert caught.group_contains(OSError, match="disk full", depth=None)
+        assert any("still full" in note for note in caught.value.__notes__)
+
+
+class TestScoring:
+    """Tests for the scoring stage."""
+
+    @pytest.mark.asyncio
+    async def test_scorer_fills_entry_scores(self, tmp_path: Path) -> None:
+        """Outputs of blocks with a scorer are scored against expected."""
+        blocks_dir = tmp_path / "blocks"
+        path = write_block(blocks_dir, "block-a", ["one", "two", "three"])
+        data = json.loads(path.read_text())
+        data["scorer"] = "edit"
+        data["dataset"][0]["expected"] = "answer to one"
+        data["dataset"][1]["expected"] = "answer to 2"
+        path.write_text(json.dumps(data))
+        reporter = InMemoryReporter()
+        executor = make_executor(
+            client=RecordingClient(), reporter=reporter, scoring_workers=0
+        )
+
+        summary = await executor.execute(blocks_dir, ["m1"])
+
+        scores = [e.score for e in reporter.entries["block-a"]]
+        assert scores == [1.0, pytest.approx(1 - 3 / 13), None]
+        model = summary.models[0]
+        assert model.scored_cases == 2
+        estimate = model.score_estimate()
+        assert estimate is not None
+        assert estimate.mean == pytest.approx((2 - 3 / 13) / 2)
+        assert estimate.low <= estimate.mean <= estimate.high
+        assert model.scoring_seconds > 0
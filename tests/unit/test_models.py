@@ -1,9 +1,12 @@
 """Unit tests for tls models."""
 
+import pytest
+
 from tls.models import (
     BlockMetadata,
     BlockPrompts,
     EvaluationBlock,
+    SamplingParams,
     TestCase,
     sanitize_model_name,
 )
@@ -67,3 +70,32 @@ class TestEvaluationBlock:
         assert case.expected is None
         assert case.context is None
         assert case.criteria is None
+        assert case.turns is None
+
+    def test_multi_turn_cases_need_one_sample_and_chat(self) -> None:
+        """Conversations cannot be sampled or sent to other endpoints."""
+        with pytest.raises(ValueError, match="several samples"):
+            TestCase(input="Hi", turns=["And then?"], samples=2)
+        with pytest.raises(ValueError, match="completions endpoint"):
+            EvaluationBlock(
+                metadata=BlockMetadata(id="b"),
+                prompts=BlockPrompts(system="sys"),
+                endpoint="completions",
+                dataset=[TestCase(input="Hi", turns=["And then?"])],
+            )
+
+
+class TestSamplingParams:
+    """Tests for SamplingParams."""
+
+    def test_merge_prefers_override_values(self) -> None:
+        """Non-None override values replace the base values."""
+        base = SamplingParams(temperature=1.0, seed=7)
+        merged = base.merge(SamplingParams(temperature=0.2, max_tokens=64))
+        assert merged == SamplingParams(temperature=0.2, seed=7, max_tokens=64)
+        assert base.merge(None) == base
+
+    def test_payload_omits_unset_values(self) -> None:
+        """Only set parameters are sent to the API."""
+        params = SamplingParams(temperature=0.0, seed=1)
+        assert params.to_payload() == {"temperature": 0.0, "seed": 1}
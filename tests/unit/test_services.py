@@ -1,13 +1,85 @@
 """Unit tests for tls services."""
 
+import asyncio
+import gzip
+import io
+import json
 import tempfile
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any
 
+import httpx
 import pytest
 from mocks.llm import MockLlmClient
+from mocks.reporter import InMemoryReporter
+from rich.console import Console
 
-from tls.protocols.llm import Message
+from tls.errors import ConfigError, NetworkError, ValidationError
+from tls.models import (
+    BlockMetadata,
+    BlockPrompts,
+    EvaluationBlock,
+    OutputLimits,
+    ReportsConfig,
+    RunEntry,
+    SamplingParams,
+    TestCase,
+)
+from tls.protocols.llm import Completion, Embeddings, Message
+from tls.services.dataset import count_cases, iter_cases, resolve_dataset_file
+from tls.services.history import HistoryStore
 from tls.services.initializer import Initializer
+from tls.services.limiter import (
+    AdaptiveLimiter,
+    ConcurrencyLimiter,
+    create_limiter,
+)
+from tls.services.llm_client import LlmClient
+from tls.services.metrics import MetricsServer, RunMetrics
+from tls.services.planner import estimate_tokens, plan_block, plan_run
+from tls.services.progress import RunProgress
+from tls.services.registry import available_reporters, create_reporter
+from tls.services.reporter import (
+    ENTRIES_FILENAME,
+    MANIFEST_FILENAME,
+    FanOutReporter,
+    FileSystemReporter,
+    read_entries,
+    rewrite_run,
+)
+from tls.services.scheduler import (
+    ReorderBuffer,
+    SharedRequests,
+    WorkItem,
+    dispatch_units,
+    order_by_prefix,
+    request_key,
+)
+from tls.services.schema import compile_schema, response_format, validate_output
+from tls.services.scoring import (
+    SCORERS,
+    pass_at_k,
+    passing_samples,
+    sample_passes,
+    score_batch,
+)
+from tls.services.scoring_pool import ScoringPool
+from tls.services.tracer import Tracer
+
+
+def patch_transport(
+    monkeypatch: pytest.MonkeyPatch,
+    handler: Callable[[httpx.Request], httpx.Response],
+) -> None:
+    """Route every httpx.AsyncClient through a mock transport."""
+    real_client = httpx.AsyncClient
+
+    def factory(**kwargs: Any) -> httpx.AsyncClient:
+        return real_client(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(httpx, "AsyncClient", factory)
 
 
 class TestMockLlmClient:
@@ -22,6 +94,262 @@ class TestMockLlmClient:
         assert result == "Test response"
 
 
+class TestLlmClient:
+    """Tests for the HTTP LLM client."""
+
+    @pytest.mark.asyncio
+    async def test_complete_batch_fans_out_choices(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Batched prompts are sent together and mapped back by index."""
+        requests: list[dict[str, Any]] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            return httpx.Response(
+                200,
+                json={
+                    "choices": [{"index": 1, "text": "B"}, {"index": 0, "text": "A"}],
+                    "usage": {"prompt_tokens": 6, "completion_tokens": 2},
+                },
+            )
+
+        patch_transport(monkeypatch, handler)
+        client = LlmClient(base_url="http://llm")
+        conversations = [
+            [Message(role="system", content="sys"), Message(role="user", content="a")],
+            [Message(role="system", content="sys"), Message(role="user", content="b")],
+        ]
+
+        batch = await client.complete_batch("m", conversations)
+
+        assert [c.content for c in batch.completions] == ["A", "B"]
+        assert (batch.prompt_tokens, batch.completion_tokens) == (6, 2)
+        assert requests[0]["prompt"] == ["sys\n\na", "sys\n\nb"]
+
+    @pytest.mark.asyncio
+    async def test_embed_maps_vectors_by_index(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Embedding inputs are sent together and vectors mapped back by index."""
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(
+                200,
+                json={
+                    "data": [
+                        {"index": 1, "embedding": [0.0, 1.0]},
+                        {"index": 0, "embedding": [1.0, 0.0]},
+                    ],
+                    "usage": {"prompt_tokens": 4},
+                },
+            )
+
+        patch_transport(monkeypatch, handler)
+        embeddings = await LlmClient(base_url="http://llm").embed("e", ["a", "b"])
+
+        assert embeddings == Embeddings(
+            vectors=[[1.0, 0.0], [0.0, 1.0]], prompt_tokens=4
+        )
+        assert requests[0].url.path == "/v1/embeddings"
+        assert json.loads(requests[0].content) == {"model": "e", "input": ["a", "b"]}
+
+    @pytest.mark.asyncio
+    async def test_embed_rejects_missing_vectors(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A response lacking vectors for some inputs is an error."""
+        patch_transport(
+            monkeypatch,
+            lambda request: httpx.Response(
+                200, json={"data": [{"index": 0, "embedding": [1.0]}]}
+            ),
+        )
+
+        with pytest.raises(NetworkError, match=r"inputs \[1\]"):
+            await LlmClient(base_url="http://llm").embed("e", ["a", "b"])
+
+    @pytest.mark.asyncio
+    async def test_complete_reads_usage(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Chat completions keep token usage and cached prompt tokens."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                json={
+                    "choices": [{"message": {"content": "hi"}}],
+                    "usage": {
+                        "prompt_tokens": 12,
+                        "completion_tokens": 3,
+                        "prompt_tokens_details": {"cached_tokens": 8},
+                    },
+                },
+            )
+
+        patch_transport(monkeypatch, handler)
+        completion = await LlmClient(base_url="http://llm").complete(
+            "m", [Message(role="user", content="Hello")]
+        )
+
+        assert completion == Completion(
+            content="hi", prompt_tokens=12, completion_tokens=3, cached_tokens=8
+        )
+
+    @pytest.mark.asyncio
+    async def test_complete_sends_sampling_and_n(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Sampling parameters and n are sent; all choices become samples."""
+        requests: list[dict[str, Any]] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            return httpx.Response(
+                200,
+                json={
+                    "choices": [
+                        {"index": 0, "message": {"content": "a"}},
+                        {"index": 1, "message": {"content": "b"}},
+                    ]
+                },
+            )
+
+        patch_transport(monkeypatch, handler)
+        completion = await LlmClient(base_url="http://llm").complete(
+            "m",
+            [Message(role="user", content="Hello")],
+            sampling=SamplingParams(temperature=0.8, seed=3),
+            n=2,
+        )
+
+        assert requests[0]["temperature"] == 0.8
+        assert requests[0]["seed"] == 3
+        assert requests[0]["n"] == 2
+        assert completion.outputs == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_complete_sends_response_format(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A response format is passed through to the request payload."""
+        requests: list[dict[str, Any]] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            return httpx.Response(
+                200, json={"choices": [{"message": {"content": "{}"}}]}
+            )
+
+        patch_transport(monkeypatch, handler)
+        client = LlmClient(base_url="http://llm")
+        fmt = response_format({"type": "object"}, "my block")
+        await client.complete("m", [Message(role="user", content="Hi")])
+        await client.complete(
+            "m", [Message(role="user", content="Hi")], response_format=fmt
+        )
+
+        assert "response_format" not in requests[0]
+        assert requests[1]["response_format"] == {
+            "type": "json_schema",
+            "json_schema": {"name": "my_block", "schema": {"type": "object"}},
+        }
+
+    @pytest.mark.asyncio
+    async def test_stream_stops_at_max_chars(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Streaming is abandoned once the output reaches max_chars."""
+        requests: list[dict[str, Any]] = []
+        sent: list[int] = []
+
+        async def chunks() -> AsyncIterator[bytes]:
+            for i in range(100):
+                sent.append(i)
+                chunk = {"choices": [{"delta": {"content": "abc"}}]}
+                yield f"data: {json.dumps(chunk)}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, content=chunks())
+
+        patch_transport(monkeypatch, handler)
+        completion = await LlmClient(base_url="http://llm").complete(
+            "m",
+            [Message(role="user", content="Hello")],
+            limits=OutputLimits(max_chars=7),
+        )
+
+        assert requests[0]["stream"] is True
+        assert completion.content == "abcabca"
+        assert completion.truncated == "max_chars"
+        assert len(sent) < 100
+
+    @pytest.mark.asyncio
+    async def test_stream_keeps_partial_output_on_timeout(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Output streamed before max_seconds is kept."""
+
+        async def chunks() -> AsyncIterator[bytes]:
+            chunk = {"choices": [{"delta": {"content": "partial"}}]}
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+            await asyncio.sleep(10)
+            yield b"data: [DONE]\n\n"
+
+        patch_transport(
+            monkeypatch, lambda request: httpx.Response(200, content=chunks())
+        )
+        completion = await LlmClient(base_url="http://llm").complete(
+            "m",
+            [Message(role="user", content="Hello")],
+            limits=OutputLimits(max_seconds=0.05),
+        )
+
+        assert completion.content == "partial"
+        assert completion.truncated == "max_seconds"
+
+    @pytest.mark.asyncio
+    async def test_length_finish_reason_marks_truncation(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Responses stopped by max_tokens are marked as truncated."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                200,
+                json={
+                    "choices": [
+                        {"message": {"content": "cut"}, "finish_reason": "length"}
+                    ]
+                },
+            )
+
+        patch_transport(monkeypatch, handler)
+        completion = await LlmClient(base_url="http://llm").complete(
+            "m", [Message(role="user", content="Hello")]
+        )
+
+        assert completion.truncated == "max_tokens"
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_response_signals_overload(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """429 responses raise NetworkError flagged as overload."""
+        patch_transport(monkeypatch, lambda request: httpx.Response(429, text="slow"))
+
+        with pytest.raises(NetworkError) as excinfo:
+            await LlmClient(base_url="http://llm").complete(
+                "m", [Message(role="user", content="Hello")]
+            )
+
+        assert excinfo.value.status_code == 429
+        assert excinfo.value.overloaded
+
+
 class TestInitializer:
     """Tests for the project initializer."""
 
@@ -70,3 +398,758 @@ class TestInitializer:
 
             # Second run should create fewer items
             assert len(report2.created_paths) == 0
+
+
+class TestRunMetrics:
+    """Tests for the live metrics registry and server."""
+
+    def test_render_counts_outcomes(self) -> None:
+        """Completed and failed requests are rendered per model."""
+        metrics = RunMetrics(endpoint="http://localhost:11434")
+        metrics.request_started("m1")
+        metrics.request_finished(
+            "m1",
+            0.3,
+            Completion(
+                content="ok", prompt_tokens=10, completion_tokens=5, cached_tokens=4
+            ),
+        )
+        metrics.request_started("m1")
+        metrics.request_finished("m1", 2.0, None)
+
+        text = metrics.render()
+        labels = 'model="m1",endpoint="http://localhost:11434"'
+        assert f'tls_requests_total{{{labels},outcome="completed"}} 1' in text
+        assert f'tls_requests_total{{{labels},outcome="failed"}} 1' in text
+        assert f"tls_requests_in_flight{{{labels}}} 0" in text
+        assert f'tls_request_latency_seconds_bucket{{{labels},le="0.5"}} 1' in text
+        assert f'tls_request_latency_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+        assert f"tls_cache_hit_rate{{{labels}}} 0.4000" in text
+
+    def test_rates_stop_when_model_is_idle(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Throughput is measured up to the last response, not to now."""
+        now = [100.0]
+        monkeypatch.setattr("tls.services.metrics.time.monotonic", lambda: now[0])
+        metrics = RunMetrics(endpoint="e")
+        metrics.request_started("m1")
+        model = metrics.models["m1"]
+        model.started_at = 100.0
+        now[0] = 102.0
+        metrics.request_finished(
+            "m1", 2.0, Completion(content="ok", completion_tokens=10)
+        )
+
+        now[0] = 200.0
+        assert model.tokens_per_second == 5.0
+
+        metrics.request_started("m1")
+        now[0] = 218.0
+        assert model.tokens_per_second == 10 / 118
+
+    @pytest.mark.asyncio
+    async def test_server_serves_metrics(self) -> None:
+        """The server answers scrapes on /metrics and 404s elsewhere."""
+        metrics = RunMetrics(endpoint="e")
+        metrics.request_started("m1")
+
+        async with MetricsServer(metrics, port=0) as server:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+            await writer.drain()
+            response = (await reader.read()).decode()
+            writer.close()
+
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(b"GET / HTTP/1.1\r\n\r\n")
+            await writer.drain()
+            missing = (await reader.read()).decode()
+            writer.close()
+
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert 'tls_requests_in_flight{model="m1",endpoint="e"} 1' in response
+        assert missing.startswith("HTTP/1.1 404")
+
+
+class TestTracer:
+    """Tests for the timing span tracer."""
+
+    def test_disabled_tracer_records_nothing(self) -> None:
+        """Spans of a disabled tracer are no-ops."""
+        tracer = Tracer(enabled=False)
+        with tracer.span("phase"):
+            pass
+        assert tracer.events == []
+
+    def test_write_chrome_trace(self, tmp_path: Path) -> None:
+        """Spans are written as complete events in a Chrome trace file."""
+        tracer = Tracer()
+        with tracer.span("phase", category="io", case_index=3):
+            pass
+
+        path = tmp_path / "trace.json"
+        tracer.write(path)
+
+        events = json.loads(path.read_text())["traceEvents"]
+        assert len(events) == 1
+        assert events[0]["name"] == "phase"
+        assert events[0]["ph"] == "X"
+        assert events[0]["cat"] == "io"
+        assert events[0]["args"] == {"case_index": 3}
+        assert events[0]["dur"] >= 0
+
+
+class TestFileSystemReporter:
+    """Tests for the file system reporter."""
+
+    @pytest.mark.asyncio
+    async def test_writes_markdown_and_structured_entries(self, tmp_path: Path) -> None:
+        """Entries are written to Markdown and to entries.jsonl."""
+        reporter = FileSystemReporter(reports_dir=tmp_path)
+        run_dir = await reporter.init_run("benchmarks", "qwen3:8b", ["block-a"])
+        entry = RunEntry(
+            block_id="block-a",
+            case_index=0,
+            case_id="c1",
+            input="Hello",
+            output="Hi",
+            model="qwen3:8b",
+            latency_seconds=0.25,
+        )
+        await reporter.write_entry(run_dir, entry)
+
+        assert run_dir.parent.name == "qwen3-8b"
+        assert "- **Output**: Hi" in (run_dir / "block-a.md").read_text()
+        manifest = json.loads((run_dir / MANIFEST_FILENAME).read_text())
+        assert manifest["block_ids"] == ["block-a"]
+        lines = (run_dir / ENTRIES_FILENAME).read_text().splitlines()
+        assert RunEntry.model_validate_json(lines[0]) == entry
+
+    @pytest.mark.asyncio
+    async def test_streams_gzip_compressed_reports(self, tmp_path: Path) -> None:
+        """Compressed reports are valid gzip streams, also after a rewrite."""
+        reporter = FileSystemReporter(tmp_path, compression="gzip")
+        run_dir = await reporter.init_run(None, "m", ["block-a"])
+        entries = [
+            RunEntry(
+                block_id="block-a",
+                case_index=i,
+                input=f"q{i}",
+                output=f"a{i}",
+                model="m",
+            )
+            for i in range(3)
+        ]
+        for entry in entries:
+            await reporter.write_entry(run_dir, entry)
+        await reporter.finalize_run(run_dir)
+
+        assert not (run_dir / ENTRIES_FILENAME).exists()
+        assert read_entries(run_dir) == entries
+        with gzip.open(run_dir / "block-a.md.gz", "rt") as f:
+            assert "- **Output**: a2" in f.read()
+        manifest = json.loads((run_dir / MANIFEST_FILENAME).read_text())
+        assert manifest["compression"] == "gzip"
+
+        await rewrite_run(run_dir, entries[:1])
+
+        assert read_entries(run_dir) == entries[:1]
+        assert not (run_dir / "block-a.md").exists()
+
+    def test_rejects_unknown_compression(self, tmp_path: Path) -> None:
+        """Unknown compressions fail when the reporter is created."""
+        with pytest.raises(ConfigError):
+            FileSystemReporter(tmp_path, compression="brotli")
+
+
+class FakeEntryPoint:
+    """Installed reporter plugin returning a fixed factory."""
+
+    def __init__(self, name: str, factory: Callable[..., Any]) -> None:
+        self.name = name
+        self.factory = factory
+
+    def load(self) -> Callable[..., Any]:
+        return self.factory
+
+
+class SlowReporter:
+    """Reporter whose writes wait until released."""
+
+    def __init__(self) -> None:
+        self.entries: list[RunEntry] = []
+        self.release = asyncio.Event()
+
+    async def init_run(
+        self, category: str | None, model: str, block_ids: list[str]
+    ) -> Path:
+        return Path("/slow")
+
+    async def write_entry(self, run_dir: Path, entry: RunEntry) -> None:
+        await self.release.wait()
+        self.entries.append(entry)
+
+    async def finalize_run(self, run_dir: Path) -> None:
+        pass
+
+
+class TestReporterRegistry:
+    """Tests for reporter backends and the fan-out reporter."""
+
+    @pytest.mark.asyncio
+    async def test_plugins_receive_every_entry(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Selected plugins get the entries; the first backend owns the run."""
+        memory = InMemoryReporter()
+        plugin = FakeEntryPoint("memory", lambda reports_dir, reports: memory)
+        monkeypatch.setattr(
+            "tls.services.registry.entry_points",
+            lambda group, name=None: [
+                ep for ep in [plugin] if name is None or ep.name == name
+            ],
+        )
+        reporter = create_reporter(
+            tmp_path, ReportsConfig(backends=["files", "memory"])
+        )
+        entry = RunEntry(block_id="b", case_index=0, input="q", output="a", model="m")
+
+        run_dir = await reporter.init_run(None, "m", ["b"])
+        await reporter.write_entry(run_dir, entry)
+        await reporter.finalize_run(run_dir)
+
+        assert available_reporters() == ["files", "memory"]
+        assert run_dir.parent.parent == tmp_path
+        assert read_entries(run_dir) == [entry]
+        assert memory.entries == {"b": [entry]}
+
+    def test_rejects_unknown_backend(self, tmp_path: Path) -> None:
+        """Selecting a backend nobody registered is a configuration error."""
+        with pytest.raises(ConfigError, match="available: files"):
+            create_reporter(tmp_path, ReportsConfig(backends=["nope"]))
+
+    @pytest.mark.asyncio
+    async def test_slow_backend_does_not_block_writes(self) -> None:
+        """Entries are queued for a slow backend and drained on finalize."""
+        slow = SlowReporter()
+        reporter = FanOutReporter([InMemoryReporter(), slow])
+        run_dir = await reporter.init_run(None, "m", ["b"])
+        entries = [
+            RunEntry(block_id="b", case_index=i, input="q", output="a", model="m")
+            for i in range(3)
+        ]
+
+        for entry in entries:
+            await asyncio.wait_for(reporter.write_entry(run_dir, entry), 1)
+        assert slow.entries == []
+
+        slow.release.set()
+        await reporter.finalize_run(run_dir)
+
+        assert slow.entries == entries
+
+    @pytest.mark.asyncio
+    async def test_full_queue_applies_backpressure(self) -> None:
+        """Writing waits once a backend falls queue_size entries behind."""
+        slow = SlowReporter()
+        reporter = FanOutReporter([slow], queue_size=2)
+        run_dir = await reporter.init_run(None, "m", ["b"])
+        entries = [
+            RunEntry(block_id="b", case_index=i, input="q", output="a", model="m")
+            for i in range(4)
+        ]
+
+        # The writer holds one entry while the queue fills up
+        for entry in entries[:3]:
+            await reporter.write_entry(run_dir, entry)
+        blocked = asyncio.create_task(reporter.write_entry(run_dir, entries[3]))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        slow.release.set()
+        await blocked
+        await reporter.finalize_run(run_dir)
+
+        assert slow.entries == entries
+
+    @pytest.mark.asyncio
+    async def test_failed_backend_raises_after_finalizing(self) -> None:
+        """A write error surfaces, and the other backends still finish."""
+
+        class BrokenReporter(SlowReporter):
+            async def write_entry(self, run_dir: Path, entry: RunEntry) -> None:
+                raise OSError("disk full")
+
+        memory = InMemoryReporter()
+        reporter = FanOutReporter([memory, BrokenReporter()])
+        run_dir = await reporter.init_run(None, "m", ["b"])
+        entry = RunEntry(block_id="b", case_index=0, input="q", output="a", model="m")
+
+        await reporter.write_entry(run_dir, entry)
+        with pytest.raises(OSError, match="disk full"):
+            await reporter.finalize_run(run_dir)
+
+        assert memory.entries == {"b": [entry]}
+
+
+class TestScheduler:
+    """Tests for request ordering helpers."""
+
+    @staticmethod
+    def make_items(specs: list[tuple[str, str]]) -> list[WorkItem]:
+        """Work items from (system prompt, input) pairs."""
+        block = EvaluationBlock(
+            metadata=BlockMetadata(id="b"),
+            prompts=BlockPrompts(system="sys"),
+            dataset=[],
+        )
+        return [
+            WorkItem(
+                seq=i,
+                block=block,
+                block_pos=0,
+                case_index=i,
+                case=TestCase(input=text),
+                messages=[
+                    Message(role="system", content=system),
+                    Message(role="user", content=text),
+                ],
+            )
+            for i, (system, text) in enumerate(specs)
+        ]
+
+    def test_order_by_prefix_groups_and_sorts(self) -> None:
+        """Items are grouped by system prompt, then sorted by input."""
+        items = self.make_items(
+            [("A", "zeta"), ("B", "beta"), ("A", "alpha"), ("B", "alpha")]
+        )
+
+        ordered = order_by_prefix(items)
+
+        assert [item.seq for item in ordered] == [2, 0, 3, 1]
+
+    def test_dispatch_units_plan_within_windows(self) -> None:
+        """Reordering and batching never cross window boundaries."""
+        items = self.make_items(
+            [("A", "b"), ("B", "x"), ("A", "a"), ("A", "d"), ("B", "y"), ("A", "c")]
+        )
+
+        ordered = list(dispatch_units(iter(items), 1, "prefix", window=3))
+        batched = list(dispatch_units(iter(items), 4, window=3))
+
+        assert [[i.seq for i in unit] for unit in ordered] == [
+            [2],
+            [0],
+            [1],
+            [5],
+            [3],
+            [4],
+        ]
+        assert [[i.seq for i in unit] for unit in batched] == [[0, 2], [1], [3, 5], [4]]
+
+    def test_batches_never_mix_blocks(self) -> None:
+        """Items of different blocks are batched apart despite a shared prompt."""
+        items = self.make_items([("A", "a"), ("A", "b"), ("A", "c")])
+        items[1].block_pos = 1
+
+        units = list(dispatch_units(iter(items), 4))
+
+        assert [[i.seq for i in unit] for unit in units] == [[0, 2], [1]]
+
+    def test_reorder_buffer_releases_in_sequence(self) -> None:
+        """Results are held back until all earlier results arrived."""
+        buffer: ReorderBuffer[str] = ReorderBuffer()
+        assert buffer.add(2, "c") == []
+        assert buffer.add(0, "a") == ["a"]
+        assert buffer.add(1, "b") == ["b", "c"]
+        assert len(buffer) == 0
+
+    def test_request_key_covers_messages_and_settings(self) -> None:
+        """Keys differ when any message part or setting differs."""
+        messages = [Message(role="system", content="S"), Message("user", "Q")]
+        key = request_key(messages, "t=0")
+
+        assert request_key(list(messages), "t=0") == key
+        assert request_key(messages, "t=1") != key
+        assert request_key([Message("system", "SQ"), Message("user", "")], "t=0") != key
+        assert request_key([Message("user", "S"), Message("user", "Q")], "t=0") != key
+
+    @pytest.mark.asyncio
+    async def test_shared_requests_forget_oldest(self) -> None:
+        """Lookups count hits and only the most recent requests are kept."""
+        shared: SharedRequests[str] = SharedRequests(size=2)
+        first = shared.register(b"a", "b/0")
+        shared.register(b"b", "b/1")
+
+        assert shared.lookup(b"a") == ("b/0", first)
+        shared.register(b"c", "b/2")
+
+        assert shared.lookup(b"a") is None
+        assert shared.lookup(b"c") is not None
+        assert shared.shared == 2
+
+    @pytest.mark.asyncio
+    async def test_shared_requests_bound_result_size(self) -> None:
+        """Finished results are forgotten once their outputs exceed the budget."""
+        shared: SharedRequests[str] = SharedRequests(max_chars=10, weigh=len)
+        first = shared.register(b"a", "b/0")
+        second = shared.register(b"b", "b/1")
+        first.set_result("x" * 6)
+        await asyncio.sleep(0)
+        assert shared.lookup(b"a") is not None
+
+        second.set_result("y" * 6)
+        await asyncio.sleep(0)
+
+        assert shared.lookup(b"a") is None
+        assert shared.lookup(b"b") == ("b/1", second)
+
+
+class TestSchema:
+    """Tests for precompiled JSON Schema validation."""
+
+    SCHEMA: dict[str, Any] = {
+        "type": "object",
+        "properties": {
+            "label": {"enum": ["yes", "no"]},
+            "score": {"type": "integer", "minimum": 0, "maximum": 10},
+            "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 2},
+        },
+        "required": ["label", "score"],
+        "additionalProperties": False,
+    }
+
+    def test_valid_output_passes(self) -> None:
+        """Outputs satisfying the schema have no error, fenced or not."""
+        validate = compile_schema(self.SCHEMA)
+
+        output = '{"label": "yes", "score": 3, "tags": ["a"]}'
+        assert validate_output(validate, output) is None
+        assert validate_output(validate, f"```json\n{output}\n```") is None
+
+    def test_first_violation_is_reported(self) -> None:
+        """Violations name the offending location."""
+        validate = compile_schema(self.SCHEMA)
+
+        assert validate_output(validate, '{"label": "yes"}') == (
+            "$: missing property 'score'"
+        )
+        assert validate_output(validate, '{"label": "maybe", "score": 1}') == (
+            "$.label: 'maybe' is not one of ['yes', 'no']"
+        )
+        assert validate_output(validate, '{"label": "no", "score": 11}') == (
+            "$.score: above 10"
+        )
+        assert validate_output(validate, '{"label": "no", "score": true}') == (
+            "$.score: expected integer"
+        )
+        assert validate_output(validate, '{"label": "no", "score": 1, "x": 0}') == (
+            "$: unexpected property 'x'"
+        )
+        error = validate_output(validate, "The label is yes")
+        assert error is not None
+        assert error.startswith("invalid JSON")
+
+    def test_unsupported_keyword_raises(self) -> None:
+        """Schemas the validator cannot enforce are rejected when compiled."""
+        with pytest.raises(ConfigError, match="'\\$ref' at \\$.a"):
+            compile_schema({"properties": {"a": {"$ref": "#/b"}}})
+
+
+class TestScoring:
+    """Tests for sample scoring helpers."""
+
+    def test_sample_passes_is_case_insensitive(self) -> None:
+        """Expected answers embedded in reasoning are found."""
+        assert sample_passes("Reasoning...\nFINAL ANSWER: yes", "Yes")
+        assert not sample_passes("FINAL ANSWER: no", "Yes")
+        assert not sample_passes("anything", "  ")
+
+    def test_passing_samples_use_scorer(self) -> None:
+        """Samples pass by containment, or by score with a scorer."""
+        outputs = ["Paris", "It is Paris.", "Rome"]
+        assert passing_samples(outputs, "paris") == 2
+        assert passing_samples(outputs, "Paris", "exact") == 1
+        assert passing_samples(outputs, "Paris!", "edit", threshold=0.8) == 1
+        assert passing_samples(outputs, "[", "regex") is None
+
+    def test_pass_at_k_estimator(self) -> None:
+        """pass@k follows the unbiased estimator."""
+        assert pass_at_k(n=5, c=0, k=1) == 0.0
+        assert pass_at_k(n=5, c=5, k=1) == 1.0
+        assert pass_at_k(n=4, c=2, k=1) == 0.5
+        assert pass_at_k(n=4, c=1, k=2) == 0.5
+        assert pass_at_k(n=4, c=3, k=2) == 1.0
+
+    @pytest.mark.parametrize(
+        ("scorer", "output", "expected", "score"),
+        [
+            ("exact", " Paris\n", "Paris", 1.0),
+            ("exact", "paris", "Paris", 0.0),
+            ("contains", "The answer is PARIS.", "paris", 1.0),
+            ("json", '```json\n{"a": [1, 2]}\n```', '{"a":[1,2]}', 1.0),
+            ("json", "not json", '{"a": 1}', 0.0),
+            ("regex", "Order #1234 shipped", r"#\d{4}\b", 1.0),
+            ("edit", "kitten", "sitting", 1 - 3 / 7),
+            ("edit", "", "", 1.0),
+            ("rouge", "the cat sat on the mat", "The cat is on the mat", 5 / 6),
+            ("rouge", "", "words", 0.0),
+        ],
+    )
+    def test_scorers(
+        self, scorer: str, output: str, expected: str, score: float
+    ) -> None:
+        """Every scorer maps an output to a score between 0 and 1."""
+        assert SCORERS[scorer](output, expected) == pytest.approx(score)
+
+    def test_unusable_expected_values_get_no_score(self) -> None:
+        """Invalid patterns and JSON expected values are not scored."""
+        results = score_batch([("regex", "x", "("), ("json", "{}", "{")])
+
+        assert [score for score, _ in results] == [None, None]
+        assert all(seconds >= 0 for _, seconds in results)
+
+    @pytest.mark.asyncio
+    async def test_scoring_pool_batches_jobs(self) -> None:
+        """Jobs submitted together are scored in worker processes."""
+        async with ScoringPool(workers=1, batch_size=2) as pool:
+            futures = [pool.submit("exact", output, "a") for output in ["a", "b", "a"]]
+            results = await asyncio.gather(*futures)
+
+        assert [score for score, _ in results] == [1.0, 0.0, 1.0]
+
+
+class TestLimiter:
+    """Tests for the concurrency limiters."""
+
+    @pytest.mark.asyncio
+    async def test_fixed_limiter_bounds_in_flight(self) -> None:
+        """No more than the limit is acquired at once."""
+        limiter = ConcurrencyLimiter(2)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        third = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not third.done()
+
+        await limiter.release(0.1)
+        await third
+        assert limiter.in_flight == 2
+        assert limiter.history == [(0.0, 2)]
+
+    @pytest.mark.asyncio
+    async def test_adaptive_limiter_grows_while_latency_is_stable(self) -> None:
+        """Stable latency raises the limit by one per round of requests."""
+        limiter = AdaptiveLimiter(max_limit=4)
+        for _ in range(20):
+            await limiter.acquire()
+            await limiter.release(0.1)
+        # Sequential requests never saturate limits above 1
+        assert limiter.limit == 2
+
+        for _ in range(30):
+            for _ in range(limiter.limit):
+                await limiter.acquire()
+            for _ in range(limiter.limit):
+                await limiter.release(0.1)
+        assert limiter.limit == 4
+        assert limiter.peak == 4
+
+    @pytest.mark.asyncio
+    async def test_adaptive_limiter_backs_off(self) -> None:
+        """Overload and latency growth cut the limit multiplicatively."""
+        limiter = AdaptiveLimiter(initial=8, max_limit=8)
+        await limiter.acquire()
+        await limiter.release(0.1, overloaded=True)
+        assert limiter.limit == 4
+
+        await limiter.acquire()
+        await limiter.release(0.1)
+        await limiter.acquire()
+        await limiter.release(0.5)
+        assert limiter.limit == 2
+        assert limiter.backoffs == 2
+        assert [limit for _, limit in limiter.history] == [8, 4, 2]
+
+    def test_create_limiter_validates_setting(self) -> None:
+        """Settings are a positive number or 'auto'."""
+        assert isinstance(create_limiter("auto"), AdaptiveLimiter)
+        assert create_limiter("3").limit == 3
+        with pytest.raises(ConfigError):
+            create_limiter("fast")
+        with pytest.raises(ConfigError):
+            create_limiter(0)
+
+
+class TestRunProgress:
+    """Tests for the coalesced progress display."""
+
+    @pytest.mark.asyncio
+    async def test_log_mode_prints_status_lines(self) -> None:
+        """Non-TTY output gets compact status lines instead of a bar."""
+        output = io.StringIO()
+        console = Console(file=output, force_terminal=False)
+        progress = RunProgress(console, total=3, log_interval=0.01)
+        assert progress.mode == "log"
+
+        async with progress:
+            progress.advance()
+            await asyncio.sleep(0.05)
+            progress.advance(2)
+
+        lines = output.getvalue().splitlines()
+        assert lines[0].startswith("Running benchmarks... 1/3 cases (33%)")
+        assert lines[-1].startswith("Finished 3/3 cases (100%)")
+        assert len(lines) == 2
+
+    @pytest.mark.asyncio
+    async def test_bar_renders_at_fixed_rate(self) -> None:
+        """Advancing does not render; the bar is redrawn by the ticker."""
+        output = io.StringIO()
+        console = Console(file=output, force_terminal=True)
+        tracer = Tracer()
+        progress = RunProgress(console, total=5000, tracer=tracer)
+        assert progress.mode == "bar"
+
+        async with progress:
+            for _ in range(5000):
+                progress.advance()
+
+        renders = [e for e in tracer.events if e["name"] == "progress"]
+        assert len(renders) == 1
+        assert "100%" in output.getvalue()
+
+    @pytest.mark.asyncio
+    async def test_none_mode_renders_nothing(self) -> None:
+        """Quiet runs produce no progress output."""
+        output = io.StringIO()
+        console = Console(file=output, force_terminal=True)
+        async with RunProgress(console, total=1, mode="none") as progress:
+            progress.advance()
+        assert output.getvalue() == ""
+
+    def test_unknown_mode_raises(self) -> None:
+        """Unknown modes are rejected."""
+        with pytest.raises(ConfigError):
+            RunProgress(Console(), total=1, mode="fancy")
+
+
+class TestDataset:
+    """Tests for lazy dataset access."""
+
+    def test_dataset_file_is_read_lazily(self, tmp_path: Path) -> None:
+        """Inline cases come first, then dataset file lines."""
+        (tmp_path / "cases.jsonl").write_text('{"input": "b"}\n\n{"input": "c"}\n')
+        block = EvaluationBlock(
+            metadata=BlockMetadata(id="b"),
+            prompts=BlockPrompts(system="sys"),
+            dataset=[TestCase(input="a")],
+            dataset_file=Path("cases.jsonl"),
+        )
+        resolve_dataset_file(block, tmp_path / "block.json")
+
+        assert count_cases(block) == 3
+        assert [c.input for c in iter_cases(block)] == ["a", "b", "c"]
+
+    def test_invalid_dataset_line_raises(self, tmp_path: Path) -> None:
+        """Invalid lines are reported with their line number."""
+        (tmp_path / "cases.jsonl").write_text('{"input": "a"}\n{"id": "x"}\n')
+        block = EvaluationBlock(
+            metadata=BlockMetadata(id="b"),
+            prompts=BlockPrompts(system="sys"),
+            dataset_file=tmp_path / "cases.jsonl",
+        )
+
+        with pytest.raises(ValidationError, match="cases.jsonl:2"):
+            list(iter_cases(block))
+
+    def test_multi_sample_cases_need_chat_endpoint(self, tmp_path: Path) -> None:
+        """Inline and file cases asking for samples from other endpoints fail."""
+        (tmp_path / "cases.jsonl").write_text('{"input": "a", "samples": 3}\n')
+        block = EvaluationBlock(
+            metadata=BlockMetadata(id="b"),
+            prompts=BlockPrompts(system=""),
+            endpoint="embeddings",
+            dataset_file=tmp_path / "cases.jsonl",
+        )
+
+        with pytest.raises(ValidationError, match="cases.jsonl:1"):
+            list(iter_cases(block))
+        with pytest.raises(ValueError, match="completions endpoint"):
+            EvaluationBlock(
+                metadata=BlockMetadata(id="b"),
+                prompts=BlockPrompts(system=""),
+                endpoint="completions",
+                dataset=[TestCase(input="a", samples=2)],
+            )
+
+    def test_block_requires_cases(self) -> None:
+        """A block needs a dataset or a dataset file."""
+        with pytest.raises(ValueError):
+            EvaluationBlock.model_validate(
+                {"metadata": {"id": "b"}, "prompts": {"system": "sys"}}
+            )
+
+
+class TestPlanner:
+    """Tests for dry-run planning."""
+
+    def test_plan_counts_requests_and_prompt_tokens(self) -> None:
+        """Samples and turns add requests; every request resends its prompt."""
+        block = EvaluationBlock(
+            metadata=BlockMetadata(id="b"),
+            prompts=BlockPrompts(system="12345678"),
+            dataset=[
+                TestCase(input="abcd"),
+                TestCase(input="abcd", samples=3),
+                TestCase(input="abcd", turns=["efgh"]),
+            ],
+        )
+
+        plan = plan_block(block)
+
+        assert estimate_tokens("abcde") == 2
+        # system 2 + 4 overhead, input 1 + 4 overhead
+        single = 2 + 4 + 1 + 4
+        assert (plan.cases, plan.requests) == (3, 6)
+        assert plan.prompt_tokens == single + 3 * single + single + (single + 5)
+        assert plan_block(block, native_n=True).requests == 4
+
+    def test_projection_uses_recent_throughput(self, tmp_path: Path) -> None:
+        """Duration and completion tokens follow the model's previous runs."""
+        store = HistoryStore(tmp_path / "history.sqlite3")
+        store.start_run(
+            "run-1", "m1", None, datetime.now(timezone.utc) - timedelta(seconds=10)
+        )
+        for i in range(20):
+            store.add_entry(
+                "run-1",
+                RunEntry(
+                    block_id="b",
+                    case_index=i,
+                    input="in",
+                    output="out",
+                    model="m1",
+                    latency_seconds=0.5,
+                    completion_tokens=30,
+                ),
+            )
+        store.finish_run("run-1")
+        block = EvaluationBlock(
+            metadata=BlockMetadata(id="b"),
+            prompts=BlockPrompts(system="sys"),
+            dataset=[TestCase(input=str(i)) for i in range(100)],
+        )
+
+        plan = plan_run([block], ["m1", "m2"], store)
+        store.close()
+
+        known, unknown = plan.models
+        assert known.throughput is not None
+        assert known.throughput.cases_per_second == pytest.approx(2.0, rel=0.05)
+        assert known.seconds == pytest.approx(50, rel=0.05)
+        assert known.completion_tokens == 3000
+        assert unknown.throughput is None
+        assert unknown.seconds is None